@@ -0,0 +1,78 @@
+"""
+ActionSet benchmark.
+
+Compares string sets with ActionSet bitmasks for expanding a NotAction
+statement, unioning statements, and memory held per expanded statement.
+
+    python benchmarks/bench_action_set.py [repeat]
+"""
+from __future__ import print_function
+
+import copy
+import sys
+import timeit
+
+from policyuniverse.action_set import ActionSet
+from policyuniverse.expander_minimizer import get_actions_from_statement
+
+NOT_ACTION = {"Effect": "Allow", "NotAction": ["iam:*", "s3:*"], "Resource": "*"}
+STATEMENTS = [
+    {"Action": ["s3:get*", "ec2:describe*"]},
+    {"NotAction": ["iam:*"]},
+    {"Action": ["*:list*"]},
+    {"Action": ["sqs:*", "sns:*", "lambda:invokefunction"]},
+]
+
+
+def main(repeat=20):
+    string_sets = [get_actions_from_statement(copy.deepcopy(s)) for s in STATEMENTS]
+    action_sets = [ActionSet.from_statement(s) for s in STATEMENTS]
+
+    def union_strings():
+        result = set()
+        for actions in string_sets:
+            result |= actions
+        return result
+
+    def union_action_sets():
+        result = ActionSet()
+        for actions in action_sets:
+            result = result | actions
+        return result
+
+    cases = [
+        (
+            "expand NotAction",
+            lambda: get_actions_from_statement(copy.deepcopy(NOT_ACTION)),
+            lambda: ActionSet.from_statement(NOT_ACTION),
+        ),
+        ("union 4 statements", union_strings, union_action_sets),
+        (
+            "intersect",
+            lambda: string_sets[1] & string_sets[2],
+            lambda: action_sets[1] & action_sets[2],
+        ),
+    ]
+
+    print("{:<20} {:>12} {:>12} {:>9}".format("case", "set us", "bitmap us", "speedup"))
+    for name, strings, bitmap in cases:
+        strings_time = min(timeit.repeat(strings, number=10, repeat=repeat)) / 10
+        bitmap_time = min(timeit.repeat(bitmap, number=10, repeat=repeat)) / 10
+        print(
+            "{:<20} {:12.1f} {:12.1f} {:8.1f}x".format(
+                name, strings_time * 1e6, bitmap_time * 1e6, strings_time / bitmap_time
+            )
+        )
+
+    not_action = get_actions_from_statement(copy.deepcopy(NOT_ACTION))
+    print(
+        "NotAction memory: {} actions, {} bytes for the set, {} bytes for the mask".format(
+            len(not_action),
+            sys.getsizeof(not_action),
+            sys.getsizeof(ActionSet.from_statement(NOT_ACTION).mask),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
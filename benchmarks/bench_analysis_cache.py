@@ -0,0 +1,67 @@
+"""
+On-disk analysis cache benchmark.
+
+Audits a synthetic corpus of unique policies three times: without a cache, with
+an empty AnalysisCache file, and again with the file from the previous run, like
+a nightly audit over mostly unchanged policies.
+
+    python benchmarks/bench_analysis_cache.py [policies]
+"""
+from __future__ import print_function
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_stream import synthetic_policy
+
+from policyuniverse.analysis_cache import AnalysisCache
+from policyuniverse.stream import audit
+
+
+def timed(records, path=None):
+    start = time.time()
+    if path is None:
+        for _ in audit(records):
+            pass
+        return time.time() - start, None
+    with AnalysisCache(path) as cache:
+        for _ in audit(records, cache=cache):
+            pass
+    return time.time() - start, cache.hit_rate()
+
+
+def main(policies=5000):
+    rng = random.Random(0)
+    records = [
+        ("policy-{}".format(number), synthetic_policy(rng))
+        for number in range(policies)
+    ]
+    next(audit(records[:1]))  # Load the universe first.
+
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, "cache.sqlite")
+    try:
+        plain, _ = timed(records)
+        cold, _ = timed(records, path)
+        warm, hit_rate = timed(records, path)
+        size = os.path.getsize(path) / (1024.0 * 1024.0)
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print("policies    {:10d}".format(policies))
+    print("no cache    {:10.0f} policies/s".format(policies / plain))
+    print("cold cache  {:10.0f} policies/s".format(policies / cold))
+    print(
+        "warm cache  {:10.0f} policies/s ({:.1%} hits)".format(
+            policies / warm, hit_rate
+        )
+    )
+    print("cache file  {:10.1f} MB".format(size))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
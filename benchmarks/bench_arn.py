@@ -0,0 +1,57 @@
+"""
+ARN parsing benchmark.
+
+Parses a synthetic audit stream of principals with heavy repetition, once
+constructing an ARN per input and once through ARN.parse_many().
+
+    python benchmarks/bench_arn.py [count]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from policyuniverse.arn import ARN
+from policyuniverse.arn import parse_cache
+
+
+def principals(count, distinct=5000, seed=0):
+    rng = random.Random(seed)
+    pool = []
+    for idx in range(distinct):
+        account = "{:012d}".format(rng.randrange(10**12))
+        pool.append(
+            rng.choice(
+                [
+                    "arn:aws:iam::{}:role/Role{}".format(account, idx),
+                    "arn:aws:iam::{}:root".format(account),
+                    "arn:aws:sts::{}:assumed-role/Role{}/session".format(account, idx),
+                    account,
+                    "lambda.amazonaws.com",
+                ]
+            )
+        )
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def main(count=200000):
+    inputs = principals(count)
+
+    start = time.time()
+    for input in inputs:
+        ARN(input)
+    one_by_one = time.time() - start
+
+    parse_cache.clear()
+    start = time.time()
+    ARN.parse_many(inputs)
+    many = time.time() - start
+
+    print("{} inputs, {} distinct".format(len(inputs), len(set(inputs))))
+    print("ARN() per input   {:8.1f} ms".format(one_by_one * 1000))
+    print("ARN.parse_many()  {:8.1f} ms  {}".format(many * 1000, parse_cache.stats()))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,81 @@
+"""
+Action category summary benchmark.
+
+Compares categories_for_actions with the previous per-action split and dict
+lookup, for string sets and for ActionSets.
+
+    python benchmarks/bench_categories.py [repeat]
+"""
+from __future__ import print_function
+
+import copy
+import sys
+import timeit
+from collections import defaultdict
+
+from policyuniverse.action_categories import categories_for_actions
+from policyuniverse.action_set import ActionSet
+from policyuniverse.expander_minimizer import get_actions_from_statement
+from policyuniverse.universe import get_universe
+
+STATEMENTS = {
+    "*": {"Action": "*"},
+    "NotAction iam:*": {"NotAction": "iam:*"},
+    "ec2:*": {"Action": "ec2:*"},
+    "10 actions": {
+        "Action": [
+            "s3:getobject",
+            "s3:putobject",
+            "s3:listbucket",
+            "iam:passrole",
+            "iam:getrole",
+            "ec2:describeinstances",
+            "ec2:runinstances",
+            "sqs:sendmessage",
+            "kms:decrypt",
+            "sts:assumerole",
+        ]
+    },
+}
+
+
+def split_lookup_categories(actions):
+    action_categories = get_universe().action_categories
+    groups = defaultdict(set)
+    for action in actions:
+        service = action.split(":")[0]
+        groups[service].add(action_categories.get(action))
+    return groups
+
+
+def main(repeat=20):
+    print(
+        "{:<18} {:>8} {:>12} {:>12} {:>12}".format(
+            "statement", "actions", "split us", "strings us", "ActionSet us"
+        )
+    )
+    for name, statement in STATEMENTS.items():
+        actions = get_actions_from_statement(copy.deepcopy(statement))
+        action_set = ActionSet.from_statement(statement)
+        assert categories_for_actions(actions) == split_lookup_categories(actions)
+        assert categories_for_actions(action_set) == split_lookup_categories(actions)
+
+        timings = [
+            min(timeit.repeat(lambda: summarize(argument), number=10, repeat=repeat))
+            / 10
+            * 1e6
+            for summarize, argument in [
+                (split_lookup_categories, actions),
+                (categories_for_actions, actions),
+                (categories_for_actions, action_set),
+            ]
+        ]
+        print(
+            "{:<18} {:8d} {:12.1f} {:12.1f} {:12.1f}".format(
+                name, len(actions), *timings
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
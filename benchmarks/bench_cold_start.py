@@ -0,0 +1,50 @@
+"""
+Cold start benchmark.
+
+Times fresh interpreters importing policyuniverse, with and without touching
+the permission universe, and checks that ``import policyuniverse.arn`` never
+reads data.json.
+
+    python benchmarks/bench_cold_start.py [runs]
+"""
+from __future__ import print_function
+
+import subprocess
+import sys
+import time
+
+SCENARIOS = [
+    ("python only", "pass"),
+    ("import policyuniverse.arn", "import policyuniverse.arn"),
+    (
+        "import + all_permissions",
+        "from policyuniverse import all_permissions; len(all_permissions)",
+    ),
+]
+
+
+def time_scenario(code, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call([sys.executable, "-c", code])
+        timings.append(time.time() - start)
+    return min(timings)
+
+
+def main(runs=10):
+    loaded = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import policyuniverse.arn, policyuniverse.universe as u; print(u.is_loaded())",
+        ]
+    )
+    assert loaded.strip() == b"False", "import policyuniverse.arn read data.json"
+
+    for name, code in SCENARIOS:
+        print("{:<28} {:8.1f} ms".format(name, time_scenario(code, runs) * 1000))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
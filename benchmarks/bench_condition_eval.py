@@ -0,0 +1,68 @@
+"""
+Condition evaluation benchmark.
+
+Evaluates a Condition block covering strings, ARNs, CIDRs, numbers, dates and
+set operators against random request contexts, once with the block compiled per
+evaluation and once with the statement's cached CompiledCondition.
+
+    python benchmarks/bench_condition_eval.py [contexts]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from policyuniverse.condition import CompiledCondition, request_context
+from policyuniverse.statement import Statement
+
+CONDITION = {
+    "StringLike": {"s3:prefix": ["home/${aws:username}/*", "public/*"]},
+    "ArnLike": {"aws:SourceArn": "arn:aws:sns:*:012345678910:topic-*"},
+    "IpAddress": {"aws:SourceIp": ["10.0.0.0/8", "192.168.0.0/16", "2001:db8::/32"]},
+    "NumericLessThanEquals": {"s3:max-keys": "100"},
+    "DateLessThan": {"aws:CurrentTime": "2030-01-01T00:00:00Z"},
+    "ForAllValues:StringEquals": {"aws:TagKeys": ["env", "team", "owner"]},
+    "BoolIfExists": {"aws:MultiFactorAuthPresent": "true"},
+}
+
+
+def random_context(rng):
+    return request_context(
+        {
+            "aws:username": rng.choice(["alice", "bob"]),
+            "s3:prefix": rng.choice(["home/alice/a", "home/bob/b", "public/x", "etc"]),
+            "aws:SourceArn": "arn:aws:sns:us-east-1:012345678910:topic-{}".format(
+                rng.randrange(10)
+            ),
+            "aws:SourceIp": "10.{}.{}.{}".format(
+                rng.randrange(256), rng.randrange(256), rng.randrange(256)
+            ),
+            "s3:max-keys": str(rng.randrange(200)),
+            "aws:CurrentTime": "2019-0{}-01T00:00:00Z".format(rng.randrange(1, 10)),
+            "aws:TagKeys": rng.sample(["env", "team", "owner", "cost"], 2),
+        }
+    )
+
+
+def main(contexts=100000):
+    rng = random.Random(0)
+    batch = [random_context(rng) for _ in range(contexts)]
+    statement = Statement({"Effect": "Allow", "Action": "s3:*", "Condition": CONDITION})
+
+    start = time.time()
+    expected = [CompiledCondition(CONDITION).evaluate(context) for context in batch]
+    uncached = time.time() - start
+
+    start = time.time()
+    results = [statement.compiled_condition.evaluate(context) for context in batch]
+    cached = time.time() - start
+    assert results == expected
+
+    print("contexts    {:10d} ({} met)".format(contexts, sum(results)))
+    print("uncached    {:10.0f} contexts/s".format(contexts / uncached))
+    print("cached      {:10.0f} contexts/s".format(contexts / cached))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,99 @@
+"""
+Condition operator benchmark.
+
+Times extracting condition entries from condition-heavy S3 bucket policy
+statements with the module-level operator table, against the previous
+approach that compiled three regexes per statement.
+
+    python benchmarks/bench_conditions.py [repeat]
+"""
+from __future__ import print_function
+
+import re
+import sys
+import timeit
+
+from policyuniverse.statement import ConditionTuple
+from policyuniverse.statement import Statement
+
+STATEMENT = {
+    "Effect": "Allow",
+    "Principal": "*",
+    "Action": ["s3:GetObject", "s3:PutObject"],
+    "Resource": "arn:aws:s3:::bucket/*",
+    "Condition": {
+        "StringEquals": {
+            "aws:SourceVpce": ["vpce-1a2b3c4d", "vpce-4d3c2b1a"],
+            "s3:x-amz-acl": "bucket-owner-full-control",
+        },
+        "StringLike": {"aws:SourceArn": "arn:aws:iam::012345678910:role/*"},
+        "ForAnyValue:StringEqualsIfExists": {"aws:PrincipalOrgID": ["o-xxxxxxxxxx"]},
+        "IpAddress": {"aws:SourceIp": ["10.0.0.0/8", "192.168.0.0/16"]},
+        "NotIpAddress": {"aws:SourceIp": "10.1.0.0/16"},
+        "StringNotEquals": {"aws:SourceAccount": "210987654321"},
+        "ArnLikeIfExists": {"aws:SourceArn": "arn:aws:sns:*:012345678910:*"},
+        "Bool": {"aws:SecureTransport": "true"},
+        "NumericLessThanEquals": {"s3:max-keys": "10"},
+        "DateGreaterThan": {"aws:CurrentTime": "2019-01-01T00:00:00Z"},
+    },
+}
+
+
+def regex_condition_entries(statement):
+    conditions = list()
+    condition = statement.get("Condition")
+    key_mapping = {
+        "aws:sourcearn": "arn",
+        "aws:sourceowner": "account",
+        "aws:sourceaccount": "account",
+        "aws:principalorgid": "org-id",
+        "kms:calleraccount": "account",
+        "aws:userid": "userid",
+        "aws:sourceip": "cidr",
+        "aws:sourcevpc": "vpc",
+        "aws:sourcevpce": "vpce",
+    }
+    relevant_condition_operators = [
+        re.compile(
+            "((ForAllValues|ForAnyValue):)?ARN(Equals|Like)(IfExists)?", re.IGNORECASE
+        ),
+        re.compile(
+            "((ForAllValues|ForAnyValue):)?String(Equals|Like)(IgnoreCase)?(IfExists)?",
+            re.IGNORECASE,
+        ),
+        re.compile("((ForAllValues|ForAnyValue):)?IpAddress(IfExists)?", re.IGNORECASE),
+    ]
+    for condition_operator in condition.keys():
+        if any(
+            regex.match(condition_operator) for regex in relevant_condition_operators
+        ):
+            for key, value in condition[condition_operator].items():
+                if not isinstance(
+                    value, list
+                ) and condition_operator.lower().startswith("for"):
+                    continue
+                if key.lower() in key_mapping:
+                    values = value if isinstance(value, list) else [value]
+                    for v in values:
+                        conditions.append(
+                            ConditionTuple(value=v, category=key_mapping[key.lower()])
+                        )
+    return conditions
+
+
+def main(repeat=5, number=2000):
+    statement = Statement(STATEMENT)
+    assert regex_condition_entries(STATEMENT) == statement.condition_entries
+
+    cases = [
+        ("regexes", lambda: regex_condition_entries(STATEMENT)),
+        ("operator table", statement._condition_entries),
+        ("Statement()", lambda: Statement(STATEMENT)),
+    ]
+    for name, case in cases:
+        elapsed = min(timeit.repeat(case, number=number, repeat=repeat)) / number
+        print("{:<16} {:8.2f} us".format(name, elapsed * 1e6))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,68 @@
+"""
+Effective actions benchmark.
+
+Computes allow-minus-deny for a synthetic corpus with Policy.effective_actions()
+and with string-set differences over the expanded actions, and reports policies
+per second. Use 100000 for a 100k-policy corpus.
+
+    python benchmarks/bench_effective_actions.py [policies]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from bench_stream import synthetic_policy
+
+from policyuniverse.policy import Policy, _denies_everywhere
+
+
+def string_sets(policy):
+    allowed = set()
+    denied = set()
+    for statement in policy.statements:
+        if statement.effect == "Allow":
+            allowed |= statement.actions_expanded
+        elif _denies_everywhere(statement):
+            denied |= statement.actions_expanded
+    return allowed - denied
+
+
+def corpus(count, seed=0):
+    rng = random.Random(seed)
+    documents = []
+    while len(documents) < count:
+        document = synthetic_policy(rng)
+        documents.extend(document.get("rolepolicies", {"": document}).values())
+    for document in documents[::10]:
+        # Some unconditional denies, including NotAction ones.
+        document["Statement"].append(
+            {"Effect": "Deny", "NotAction": ["s3:*", "sqs:*"], "Resource": "*"}
+        )
+    return documents[:count]
+
+
+def timed(documents, function):
+    # Fresh Policy objects, so nothing is reused between runs.
+    policies = [Policy(document) for document in documents]
+    start = time.time()
+    results = [function(policy) for policy in policies]
+    return time.time() - start, results
+
+
+def main(policies=10000):
+    documents = corpus(policies)
+    Policy(documents[0]).effective_actions()  # Load the universe first.
+
+    sets_time, expected = timed(documents, string_sets)
+    effective_time, results = timed(documents, Policy.effective_actions)
+    assert results == expected
+
+    print("policies           {:10d}".format(policies))
+    print("string sets        {:10.0f} policies/s".format(policies / sets_time))
+    print("effective_actions  {:10.0f} policies/s".format(policies / effective_time))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,52 @@
+"""
+Wildcard expansion benchmark.
+
+Compares the indexed ActionIndex.expand() with the previous linear fnmatch
+scan over all_permissions.
+
+    python benchmarks/bench_expand.py [repeat]
+"""
+from __future__ import print_function
+
+import fnmatch
+import sys
+import timeit
+
+from policyuniverse import all_permissions
+from policyuniverse.universe import get_universe
+
+PATTERNS = ["s3:get*", "ec2:describe*", "iam:*role*", "s3:*", "*:get*", "*"]
+
+
+def linear_scan(pattern):
+    return [
+        permission.lower()
+        for permission in all_permissions
+        if fnmatch.fnmatchcase(permission.lower(), pattern)
+    ]
+
+
+def main(repeat=50):
+    index = get_universe().action_index
+    print(
+        "{:<16} {:>12} {:>12} {:>8}".format(
+            "pattern", "linear us", "index us", "speedup"
+        )
+    )
+    for pattern in PATTERNS:
+        assert sorted(linear_scan(pattern)) == sorted(index.expand(pattern))
+        linear = min(
+            timeit.repeat(lambda: linear_scan(pattern), number=1, repeat=repeat)
+        )
+        indexed = min(
+            timeit.repeat(lambda: index.expand(pattern), number=1, repeat=repeat)
+        )
+        print(
+            "{:<16} {:>12.1f} {:>12.1f} {:>7.1f}x".format(
+                pattern, linear * 1e6, indexed * 1e6, linear / indexed
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
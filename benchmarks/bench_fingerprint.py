@@ -0,0 +1,65 @@
+"""
+Fingerprint cache benchmark.
+
+Audits a synthetic multi-account corpus, where each account attaches a copy of
+a small set of shared policies with its keys shuffled, with and without a
+PolicyCache, and reports the speedup and the cache hit rate.
+
+    python benchmarks/bench_fingerprint.py [accounts] [unique policies]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from bench_stream import synthetic_policy
+
+from policyuniverse.fingerprint import PolicyCache
+from policyuniverse.stream import audit
+
+
+def shuffled(document, rng):
+    # Same policy, different key order, like exports from different accounts.
+    if isinstance(document, dict):
+        items = list(document.items())
+        rng.shuffle(items)
+        return dict((key, shuffled(value, rng)) for key, value in items)
+    return document
+
+
+def corpus(accounts, unique, seed=0):
+    rng = random.Random(seed)
+    policies = [synthetic_policy(rng) for _ in range(unique)]
+    records = []
+    for account in range(accounts):
+        for number, policy in enumerate(policies):
+            source = "{:012d}/policy-{}".format(account, number)
+            records.append((source, shuffled(policy, rng)))
+    return records
+
+
+def timed(records, cache=None):
+    start = time.time()
+    for _ in audit(records, cache=cache):
+        pass
+    return time.time() - start
+
+
+def main(accounts=200, unique=20):
+    records = corpus(accounts, unique)
+    next(audit(records[:1]))  # Load the universe first.
+
+    plain = timed(records)
+    cache = PolicyCache()
+    cached = timed(records, cache)
+
+    print("policies    {:10d} ({} unique)".format(len(records), unique))
+    print("no cache    {:10.0f} policies/s".format(len(records) / plain))
+    print("cache       {:10.0f} policies/s".format(len(records) / cached))
+    print("speedup     {:10.1f}x".format(plain / cached))
+    print("hit rate    {:10.1%}".format(cache.hit_rate()))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,100 @@
+"""
+Minimizer benchmark.
+
+Times minimize_statement_actions on expanded ec2:* sized statements against
+the previous approach, which built the prefixes of every non-desired action.
+
+    python benchmarks/bench_minimize.py [repeat]
+"""
+from __future__ import print_function
+
+import contextlib
+import copy
+import os
+import sys
+import timeit
+
+from policyuniverse.expander_minimizer import _get_desired_actions_from_statement
+from policyuniverse.expander_minimizer import _get_prefixes_for_action
+from policyuniverse.expander_minimizer import all_permissions
+from policyuniverse.expander_minimizer import expand_policy
+from policyuniverse.expander_minimizer import minimize_statement_actions
+
+STATEMENTS = {
+    "ec2:*": ["ec2:*"],
+    "ec2:describe*": ["ec2:describe*"],
+    "s3:get* + iam:list*": ["s3:get*", "iam:list*"],
+}
+
+
+def denied_prefix_minimize(statement):
+    desired_actions = _get_desired_actions_from_statement(statement)
+    denied_prefixes = set()
+    for denied_action in all_permissions.difference(desired_actions):
+        denied_prefixes.update(_get_prefixes_for_action(denied_action))
+
+    minimized_actions = set()
+    for action in desired_actions:
+        if action in denied_prefixes:
+            minimized_actions.add(action)
+            continue
+        for prefix in _get_prefixes_for_action(action):
+            if prefix not in denied_prefixes:
+                if prefix not in desired_actions:
+                    prefix = "{}*".format(prefix)
+                minimized_actions.add(prefix)
+                break
+    return sorted(minimized_actions)
+
+
+@contextlib.contextmanager
+def quiet():
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        yield
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def main(repeat=10):
+    print(
+        "{:<22} {:>8} {:>11} {:>9} {:>8}".format(
+            "statement", "actions", "before ms", "trie ms", "speedup"
+        )
+    )
+    for name, actions in STATEMENTS.items():
+        policy = {
+            "Statement": [{"Effect": "Allow", "Action": actions, "Resource": "*"}]
+        }
+        statement = expand_policy(policy)["Statement"][0]
+        with quiet():
+            assert denied_prefix_minimize(
+                copy.deepcopy(statement)
+            ) == minimize_statement_actions(copy.deepcopy(statement))
+            before = min(
+                timeit.repeat(
+                    lambda: denied_prefix_minimize(statement), number=1, repeat=repeat
+                )
+            )
+            after = min(
+                timeit.repeat(
+                    lambda: minimize_statement_actions(statement),
+                    number=1,
+                    repeat=repeat,
+                )
+            )
+        print(
+            "{:<22} {:>8} {:>11.2f} {:>9.2f} {:>7.1f}x".format(
+                name,
+                len(statement["Action"]),
+                before * 1000,
+                after * 1000,
+                before / after,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
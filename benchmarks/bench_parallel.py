@@ -0,0 +1,48 @@
+"""
+Parallel audit scaling benchmark.
+
+Audits the same synthetic policies (see bench_stream.py) with
+policyuniverse.parallel at 1 to N worker processes and reports the speedup
+over one process.
+
+    python benchmarks/bench_parallel.py [policies] [max workers] [chunksize]
+"""
+from __future__ import print_function
+
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+from bench_stream import synthetic_policy
+from policyuniverse.parallel import audit_parallel
+from policyuniverse.universe import get_universe
+
+
+def main(count=2000, max_workers=None, chunksize=64):
+    max_workers = max_workers or multiprocessing.cpu_count()
+    rng = random.Random(0)
+    records = [
+        ("policy{}".format(idx), json.dumps(synthetic_policy(rng)))
+        for idx in range(count)
+    ]
+    # Loaded before forking, so workers start with the universe in memory.
+    get_universe().action_index
+
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        start = time.time()
+        for _ in audit_parallel(records, workers=workers, chunksize=chunksize):
+            pass
+        elapsed = time.time() - start
+        baseline = baseline or elapsed
+        print(
+            "{:3d} workers {:8.0f} policies/s {:6.2f}x".format(
+                workers, count / elapsed, baseline / elapsed
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,107 @@
+"""
+Policy aggregate benchmark.
+
+Times reading every Policy aggregate on policies with 1, 100 and 1,000
+statements, against the previous approach that rebuilt each aggregate with
+"x = x.union(y)" on every call.
+
+    python benchmarks/bench_policy.py [repeat]
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+from collections import defaultdict
+
+from policyuniverse.policy import Policy
+
+SIZES = [1, 100, 1000]
+
+
+def synthetic_policy(count):
+    return {
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"AWS": "arn:aws:iam::{:012d}:root".format(idx)},
+                "Action": ["s3:get*", "sqs:sendmessage"],
+                "Resource": "*",
+                "Condition": {
+                    "StringEquals": {"aws:SourceVpc": "vpc-{:08x}".format(idx)}
+                },
+            }
+            for idx in range(count)
+        ]
+    }
+
+
+def union_aggregates(policy):
+    principals = set()
+    condition_entries = set()
+    action_categories = defaultdict(set)
+    actions = set()
+    allowed = set()
+    for statement in policy.statements:
+        principals = principals.union(statement.principals)
+    for statement in policy.statements:
+        condition_entries = condition_entries.union(statement.condition_entries)
+    for statement in policy.statements:
+        for service, groups in statement.action_summary().items():
+            action_categories[service] = action_categories[service].union(groups)
+    for statement in policy.statements:
+        if statement.is_internet_accessible():
+            actions = actions.union(statement.actions)
+    for statement in policy.statements:
+        if statement.effect == "Allow":
+            allowed = allowed.union(statement.whos_allowed())
+    return principals, condition_entries, action_categories, actions, allowed
+
+
+def policy_aggregates(policy):
+    return (
+        policy.principals,
+        policy.condition_entries,
+        policy.action_summary(),
+        policy.internet_accessible_actions(),
+        policy.whos_allowed(),
+    )
+
+
+def main(repeat=5):
+    print(
+        "{:>10} {:>14} {:>14} {:>14}".format(
+            "statements", "union ms", "first read ms", "cached ms"
+        )
+    )
+    for size in SIZES:
+        document = synthetic_policy(size)
+        # Fresh Policy objects with warm statements, so both approaches only
+        # pay for aggregation.
+        policies = [Policy(document) for _ in range(repeat)]
+        for policy in policies:
+            union_aggregates(policy)
+        assert union_aggregates(policies[0]) == policy_aggregates(policies[0])
+
+        union_time = min(
+            timeit.repeat(
+                lambda: union_aggregates(policies[0]), number=1, repeat=repeat
+            )
+        )
+        first_time = min(
+            timeit.timeit(lambda: policy_aggregates(policy), number=1)
+            for policy in policies[1:]
+        )
+        cached_time = min(
+            timeit.repeat(
+                lambda: policy_aggregates(policies[0]), number=1, repeat=repeat
+            )
+        )
+        print(
+            "{:10d} {:14.2f} {:14.2f} {:14.2f}".format(
+                size, union_time * 1e3, first_time * 1e3, cached_time * 1e3
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
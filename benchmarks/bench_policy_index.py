@@ -0,0 +1,89 @@
+"""
+PolicyIndex benchmark.
+
+Indexes a synthetic corpus of role policies, saves and loads the index, and
+times queries like "who can iam:PassRole" against re-expanding every policy
+with get_actions_from_statement(). Use 80000 for an 80k-role corpus.
+
+    python benchmarks/bench_policy_index.py [roles]
+"""
+from __future__ import print_function
+
+import fnmatch
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_stream import synthetic_policy
+
+from policyuniverse.expander_minimizer import get_actions_from_statement
+from policyuniverse.policy_index import PolicyIndex
+
+QUERIES = ["iam:passrole", "kms:decrypt*", "s3:putobject", "sqs:*"]
+
+
+def expand_everything(documents, pattern):
+    policies = set()
+    for policy_id, document in documents:
+        for statement in document["Statement"]:
+            if statement["Effect"] != "Allow":
+                continue
+            actions = get_actions_from_statement(statement)
+            if fnmatch.filter(actions, pattern):
+                policies.add(policy_id)
+    return policies
+
+
+def main(roles=20000):
+    rng = random.Random(0)
+    documents = []
+    while len(documents) < roles:
+        document = synthetic_policy(rng)
+        for policy in document.get("rolepolicies", {"": document}).values():
+            documents.append(("role-{}".format(len(documents)), policy))
+
+    start = time.time()
+    index = PolicyIndex()
+    for policy_id, document in documents:
+        index.add_policy(policy_id, document)
+    build_time = time.time() - start
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, "index.sqlite")
+        start = time.time()
+        index.save(path)
+        save_time = time.time() - start
+        size = os.path.getsize(path) / (1024.0 * 1024.0)
+        start = time.time()
+        index = PolicyIndex.load(path)
+        load_time = time.time() - start
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print("roles       {:10d} ({} statements)".format(len(documents), len(index)))
+    print("build       {:10.2f} s".format(build_time))
+    print("save        {:10.2f} s ({:.1f} MB)".format(save_time, size))
+    print("load        {:10.2f} s".format(load_time))
+    for pattern in QUERIES:
+        start = time.time()
+        policies = index.policies_for(pattern)
+        query_time = time.time() - start
+        # Re-expanding is slow, so it runs on a sample and is scaled up.
+        sample = documents[:1000]
+        start = time.time()
+        expected = expand_everything(sample, pattern)
+        expand_time = (time.time() - start) * len(documents) / len(sample)
+        assert expected == set(p for p in policies if p in dict(sample))
+        print(
+            "{:14} {:7d} roles in {:8.2f} ms (expanding: {:8.0f} ms)".format(
+                pattern, len(policies), query_time * 1e3, expand_time * 1e3
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,107 @@
+"""
+PrincipalIndex benchmark.
+
+Indexes synthetic bucket policies that admit random accounts, org ids and CIDRs,
+then times "which buckets can this account touch" as an index lookup against a
+scan of every policy's whos_allowed().
+
+    python benchmarks/bench_principal_index.py [policies]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from policyuniverse.policy import Policy
+from policyuniverse.principal_index import PrincipalIndex
+
+
+def account(rng):
+    return "{:012d}".format(rng.randrange(1000))
+
+
+def bucket_policy(rng, bucket):
+    resource = "arn:aws:s3:::{}/*".format(bucket)
+    return {
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {
+                    "AWS": [
+                        "arn:aws:iam::{}:root".format(account(rng))
+                        for _ in range(rng.randint(1, 3))
+                    ]
+                },
+                "Action": "s3:GetObject",
+                "Resource": resource,
+            },
+            {
+                "Effect": "Allow",
+                "Principal": "*",
+                "Action": "s3:GetObject",
+                "Resource": resource,
+                "Condition": {
+                    "StringEquals": {
+                        "aws:PrincipalOrgID": "o-{}".format(rng.randrange(50))
+                    },
+                    "IpAddress": {
+                        "aws:SourceIp": "10.{}.0.0/16".format(rng.randrange(256))
+                    },
+                },
+            },
+        ]
+    }
+
+
+def scan(policies, wanted):
+    found = set()
+    for policy_id, policy in policies:
+        for who in Policy(policy).whos_allowed():
+            if who.value == wanted or who.value == "arn:aws:iam::{}:root".format(
+                wanted
+            ):
+                found.add(policy_id)
+    return found
+
+
+def main(policies=20000):
+    rng = random.Random(0)
+    corpus = [
+        (
+            "arn:aws:s3:::bucket-{}".format(number),
+            bucket_policy(rng, "bucket-{}".format(number)),
+        )
+        for number in range(policies)
+    ]
+
+    start = time.time()
+    index = PrincipalIndex()
+    for policy_id, policy in corpus:
+        index.add_policy(policy_id, policy)
+    build_time = time.time() - start
+
+    wanted = "{:012d}".format(7)
+    start = time.time()
+    found = index.policies_for("account", wanted)
+    lookup_time = time.time() - start
+    start = time.time()
+    addresses = index.policies_for_ip("10.7.1.1")
+    ip_time = time.time() - start
+
+    start = time.time()
+    assert scan(corpus, wanted) == found
+    scan_time = time.time() - start
+
+    print("policies    {:10d} indexed in {:.2f}s".format(policies, build_time))
+    print(
+        "account     {:10d} buckets in {:.3f} ms".format(len(found), lookup_time * 1e3)
+    )
+    print(
+        "ip          {:10d} buckets in {:.3f} ms".format(len(addresses), ip_time * 1e3)
+    )
+    print("full scan   {:10.0f} ms".format(scan_time * 1e3))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
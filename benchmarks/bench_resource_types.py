@@ -0,0 +1,77 @@
+"""
+Resource type classification benchmark.
+
+Classifies a synthetic CloudTrail-like stream of ARNs with ResourceTypeIndex,
+and a small sample with one match_arn_pattern call per resource type per ARN.
+
+    python benchmarks/bench_resource_types.py [count]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from policyuniverse.pattern import match_arn_pattern
+from policyuniverse.universe import get_universe
+
+TEMPLATES = [
+    "arn:aws:iam::{account}:role/service-role/Role{n}",
+    "arn:aws:iam::{account}:user/user{n}",
+    "arn:aws:s3:::bucket-{n}",
+    "arn:aws:s3:::bucket-{n}/logs/{n}.gz",
+    "arn:aws:ec2:us-east-1:{account}:instance/i-{n:017x}",
+    "arn:aws:lambda:us-west-2:{account}:function:handler-{n}",
+    "arn:aws:sqs:us-east-1:{account}:queue-{n}",
+    "arn:aws:kms:us-east-1:{account}:key/{n:08x}-0000-0000-0000-000000000000",
+    "arn:aws:dynamodb:us-east-1:{account}:table/table-{n}",
+    "arn:aws:sns:us-east-1:{account}:topic-{n}",
+]
+
+
+def arns(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(
+            account="{:012d}".format(rng.randrange(50)), n=rng.randrange(100000)
+        )
+        for _ in range(count)
+    ]
+
+
+def naive_classify(resource_types, arn):
+    matches = []
+    for resource_type in resource_types:
+        try:
+            if match_arn_pattern(resource_type.arn_format, arn):
+                matches.append(resource_type)
+        except ValueError:
+            pass
+    return matches
+
+
+def main(count=100000):
+    universe = get_universe()
+    index = universe.resource_type_index
+    resource_types = universe.action_table.resource_types
+    inputs = arns(count)
+
+    start = time.time()
+    index.classify_many(inputs)
+    indexed = (time.time() - start) / len(inputs)
+
+    sample = inputs[:200]
+    start = time.time()
+    for arn in sample:
+        naive_classify(resource_types, arn)
+    naive = (time.time() - start) / len(sample)
+
+    print("ResourceTypeIndex   {:8.2f} us/arn".format(indexed * 1e6))
+    print("match_arn_pattern   {:8.2f} us/arn".format(naive * 1e6))
+    print(
+        "1M ARNs: {:.1f} s indexed, {:.0f} s naive".format(indexed * 1e6, naive * 1e6)
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
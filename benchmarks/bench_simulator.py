@@ -0,0 +1,97 @@
+"""
+Policy simulator benchmark.
+
+Loads identity policies for a set of roles and bucket policies for a set of
+buckets, then answers a batch of random (principal, action, resource) queries
+and reports queries per second and per minute.
+
+    python benchmarks/bench_simulator.py [roles] [buckets] [queries]
+"""
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from policyuniverse.simulator import Simulator
+
+ACTIONS = ["s3:GetObject", "s3:PutObject", "s3:ListBucket", "s3:DeleteObject"]
+
+
+def role_arn(number):
+    return "arn:aws:iam::{:012d}:role/role-{}".format(number % 50, number)
+
+
+def bucket_arn(number):
+    return "arn:aws:s3:::bucket-{}".format(number)
+
+
+def build(roles, buckets, rng):
+    simulator = Simulator()
+    for number in range(roles):
+        resources = [
+            bucket_arn(rng.randrange(buckets)) + "/*" for _ in range(rng.randint(1, 5))
+        ]
+        simulator.add_identity_policy(
+            role_arn(number),
+            {
+                "Statement": [
+                    {"Effect": "Allow", "Action": "s3:Get*", "Resource": resources},
+                    {"Effect": "Allow", "Action": "s3:ListBucket", "Resource": "*"},
+                    {"Effect": "Deny", "Action": "s3:*", "Resource": resources[0]},
+                ]
+            },
+        )
+    for number in range(buckets):
+        simulator.add_resource_policy(
+            bucket_arn(number),
+            {
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Principal": {"AWS": "{:012d}".format(number % 50)},
+                        "Action": ["s3:PutObject", "s3:GetObject"],
+                        "Resource": bucket_arn(number) + "/*",
+                    },
+                    {
+                        "Effect": "Deny",
+                        "Principal": "*",
+                        "Action": "s3:DeleteObject",
+                        "Resource": bucket_arn(number) + "/*",
+                    },
+                ]
+            },
+        )
+    return simulator
+
+
+def main(roles=1000, buckets=1000, queries=200000):
+    rng = random.Random(0)
+    start = time.time()
+    simulator = build(roles, buckets, rng)
+    load_time = time.time() - start
+
+    batch = [
+        (
+            role_arn(rng.randrange(roles)),
+            rng.choice(ACTIONS),
+            bucket_arn(rng.randrange(buckets)) + "/key-{}".format(rng.randrange(100)),
+        )
+        for _ in range(queries)
+    ]
+    start = time.time()
+    decisions = {}
+    for decision in simulator.simulate_many(batch):
+        decisions[decision.decision] = decisions.get(decision.decision, 0) + 1
+    elapsed = time.time() - start
+
+    print("policies    {:10d} loaded in {:.2f}s".format(roles + buckets, load_time))
+    print("queries     {:10d} {}".format(queries, decisions))
+    print("throughput  {:10.0f} queries/s".format(queries / elapsed))
+    print(
+        "            {:10.1f} million queries/minute".format(queries / elapsed * 60e-6)
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
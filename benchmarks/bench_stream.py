@@ -0,0 +1,90 @@
+"""
+Streaming audit benchmark.
+
+Writes a synthetic JSON Lines dump of roughly the given size, then audits it
+with policyuniverse.stream and reports throughput and peak memory. Peak memory
+should stay flat as the dump grows; use 1024 for a 1 GB dump.
+
+    python benchmarks/bench_stream.py [megabytes]
+"""
+from __future__ import print_function
+
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from policyuniverse.stream import audit_json_lines
+
+ACTIONS = ["s3:get*", "s3:putobject", "ec2:describe*", "iam:passrole", "sqs:*", "*"]
+PRINCIPALS = ["*", {"AWS": "arn:aws:iam::012345678910:root"}, {"Service": "ec2.amazonaws.com"}]
+
+
+def synthetic_policy(rng):
+    statements = []
+    for _ in range(rng.randint(1, 4)):
+        statement = {
+            "Effect": rng.choice(["Allow", "Allow", "Deny"]),
+            "Principal": rng.choice(PRINCIPALS),
+            "Action": rng.sample(ACTIONS, rng.randint(1, 3)),
+            "Resource": "arn:aws:s3:::bucket-{}/*".format(rng.randrange(1000)),
+        }
+        if rng.random() < 0.3:
+            statement["Condition"] = {
+                "StringEquals": {
+                    "aws:SourceAccount": "{:012d}".format(rng.randrange(50))
+                }
+            }
+        statements.append(statement)
+    if rng.random() < 0.2:
+        return {"rolepolicies": {"inline": {"Statement": statements}}}
+    return {"Version": "2012-10-17", "Statement": statements}
+
+
+def write_dump(path, size, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w") as dump:
+        while dump.tell() < size:
+            dump.write(json.dumps(synthetic_policy(rng)) + "\n")
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main(megabytes=64):
+    fd, path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    try:
+        write_dump(path, megabytes * 1024 * 1024)
+        size = os.path.getsize(path) / (1024.0 * 1024.0)
+
+        # Load the universe first so its memory is not counted against the stream.
+        next(audit_json_lines(path))
+        rss_before = peak_rss_mb()
+
+        start = time.time()
+        count = 0
+        for _ in audit_json_lines(path):
+            count += 1
+        elapsed = time.time() - start
+    finally:
+        os.remove(path)
+
+    print("dump        {:10.1f} MB".format(size))
+    print("policies    {:10d}".format(count))
+    print("throughput  {:10.1f} MB/s".format(size / elapsed))
+    print("            {:10.0f} policies/s".format(count / elapsed))
+    print(
+        "peak rss    {:10.1f} MB (+{:.1f} MB while streaming)".format(
+            peak_rss_mb(), peak_rss_mb() - rss_before
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -20,6 +20,12 @@
 
 """
 
+from bisect import bisect_left
+import fnmatch
+import re
+
+_WILDCARD_CHARS = "*?["
+
 
 def build_service_actions_from_service_data(service_data):
     permissions = set()
@@ -31,5 +37,105 @@ def build_service_actions_from_service_data(service_data):
     return permissions
 
 
+def build_service_actions_from_action_table(action_table):
+    return set(action_table.actions)
+
+
+class ActionIndex(object):
+    """
+    Sorted index of "prefix:action" permissions.
+
+    Expanding a wildcard only looks at the permissions that share the pattern's
+    literal prefix: "s3:get*" is a range lookup, "s3:*object*" scans the s3
+    actions, and only patterns with a wildcard in the service prefix (like
+    "*:get*") scan more than one service.
+
+    The position of a permission in the sorted list is its bit in an ActionSet
+    bitmask. Permissions sharing a prefix have consecutive positions, so the
+    mask of "s3:get*" is a single run of bits.
+    """
+
+    def __init__(self, permissions):
+        self._permissions = sorted(permissions)
+        self._positions = dict(
+            (permission, position)
+            for position, permission in enumerate(self._permissions)
+        )
+        self.all_mask = (1 << len(self._permissions)) - 1
+
+    def __len__(self):
+        return len(self._permissions)
+
+    def __contains__(self, permission):
+        return permission in self._positions
+
+    def position(self, permission):
+        """
+        :return: bit position of the permission, or None if it is unknown.
+        """
+        return self._positions.get(permission)
+
+    def permission(self, position):
+        return self._permissions[position]
+
+    def expand(self, pattern):
+        """
+        :param pattern: lowercase fnmatch pattern, like 'autoscaling:*'
+        :return: list of all permissions matching the pattern
+        """
+        start, stop, positions = self._match(pattern)
+        if positions is None:
+            return self._permissions[start:stop]
+        return [self._permissions[position] for position in positions]
+
+    def mask(self, pattern):
+        """
+        :param pattern: lowercase fnmatch pattern, like 'autoscaling:*'
+        :return: int with the bit of every permission matching the pattern set
+        """
+        start, stop, positions = self._match(pattern)
+        if positions is None:
+            return ((1 << (stop - start)) - 1) << start
+        mask = 0
+        for position in positions:
+            mask |= 1 << position
+        return mask
+
+    def _match(self, pattern):
+        """
+        :return: (start, stop, positions). positions is None when every permission
+            from start to stop matches, otherwise it lists the matching positions.
+        """
+        literal_end = len(pattern)
+        for char in _WILDCARD_CHARS:
+            idx = pattern.find(char, 0, literal_end)
+            if idx >= 0:
+                literal_end = idx
+        literal = pattern[:literal_end]
+
+        if literal_end == len(pattern):
+            position = self._positions.get(pattern)
+            return 0, 0, [] if position is None else [position]
+
+        start, stop = _prefix_run(self._permissions, literal)
+        if literal_end == len(pattern) - 1 and pattern[-1] == "*":
+            return start, stop, None
+
+        match = re.compile(fnmatch.translate(pattern)).match
+        permissions = self._permissions
+        positions = [
+            position for position in range(start, stop) if match(permissions[position])
+        ]
+        return start, stop, positions
+
+
+def _prefix_run(sorted_names, prefix):
+    """Returns the start and stop index of the names that start with prefix."""
+    if not prefix:
+        return 0, len(sorted_names)
+    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return bisect_left(sorted_names, prefix), bisect_left(sorted_names, upper_bound)
+
+
 # TODO: Helper Action class
 # May also want to create a service.py
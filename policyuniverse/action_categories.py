@@ -1,7 +1,10 @@
 import json
 import os
+from array import array
+from bisect import bisect_right
 from collections import defaultdict
-from policyuniverse import _action_categories
+from policyuniverse.action_set import ActionSet
+from policyuniverse.universe import get_universe
 
 
 def translate_aws_action_groups(groups):
@@ -58,11 +61,141 @@ def build_action_categories_from_service_data(service_data):
     return action_categories
 
 
+def build_action_categories_from_action_table(action_table):
+    category_names = action_table.category_names
+    return dict(
+        zip(
+            action_table.actions,
+            [
+                category_names[category]
+                for category in bytearray(action_table.categories)
+            ],
+        )
+    )
+
+
+class ActionCategoryIndex(object):
+    """
+    Action categories as small integers, in the same order as the ActionIndex.
+
+    Each action gets one code for its (service, category) pair. Summarizing a set
+    of actions collects its distinct codes, then decodes the few distinct codes
+    back into names. For strings that is a C-level map() over a dict. For an
+    ActionSet, each run of positions that spans whole services takes their
+    precomputed codes, and only the ends of a run are sliced from the code array.
+    """
+
+    def __init__(self, action_table, actions=None):
+        """
+        :param action_table: ActionTable with the category of each action
+        :param actions: sorted actions, in the order of the ActionIndex. Defaults
+            to the actions of the table. Actions that are not in the table, like
+            those added to all_permissions, have a None category.
+        """
+        category_names = action_table.category_names + (None,)
+        categories = bytearray(action_table.categories)
+        if actions is None:
+            actions = action_table.actions
+        else:
+            table_categories = dict(zip(action_table.actions, categories))
+            no_category = len(category_names) - 1
+            categories = [
+                table_categories.get(action, no_category) for action in actions
+            ]
+        services = []
+        service_starts = []
+        codes = array("H")
+        for position, (action, category) in enumerate(zip(actions, categories)):
+            service = action.partition(":")[0]
+            if not services or services[-1] != service:
+                services.append(service)
+                service_starts.append(position)
+            codes.append((len(services) - 1) * len(category_names) + category)
+
+        self._codes = codes
+        self._code_by_action = dict(zip(actions, codes))
+        self._pairs = [
+            (service, category) for service in services for category in category_names
+        ]
+        # Actions are sorted, so each service is one block of positions.
+        self._service_starts = service_starts
+        self._service_stops = service_starts[1:] + [len(codes)]
+        self._service_codes = [
+            frozenset(codes[start:stop])
+            for start, stop in zip(self._service_starts, self._service_stops)
+        ]
+
+        # Reverse indexes for actions_for_category() and actions_for_service_category().
+        actions_by_code = defaultdict(list)
+        for action, code in zip(actions, codes):
+            actions_by_code[code].append(action)
+        actions_by_category = defaultdict(list)
+        self._actions_by_service_category = dict()
+        for code, actions in actions_by_code.items():
+            service, category = self._pairs[code]
+            actions_by_category[category].extend(actions)
+            self._actions_by_service_category[(service, category)] = frozenset(actions)
+        self._actions_by_category = dict(
+            (category, frozenset(actions))
+            for category, actions in actions_by_category.items()
+        )
+
+    def actions_for_category(self, category):
+        """:return: frozenset of the actions in category"""
+        return self._actions_by_category.get(category, frozenset())
+
+    def actions_for_service_category(self, service, category):
+        """:return: frozenset of the service's actions in category"""
+        return self._actions_by_service_category.get((service, category), frozenset())
+
+    def summarize(self, actions):
+        """
+        :param actions: iterable of actions, or an ActionSet
+        :return: {service: {categories}} like categories_for_actions()
+        """
+        if isinstance(actions, ActionSet):
+            codes = set()
+            for start, stop in actions.runs():
+                self._update_codes_in_run(codes, start, stop)
+            unknown = actions.unknown
+        else:
+            if iter(actions) is actions:
+                actions = list(actions)
+            codes = set(map(self._code_by_action.get, actions))
+            unknown = ()
+            if None in codes:
+                codes.discard(None)
+                unknown = [
+                    action for action in actions if action not in self._code_by_action
+                ]
+
+        groups = defaultdict(set)
+        for code in codes:
+            service, category = self._pairs[code]
+            groups[service].add(category)
+        for action in unknown:
+            groups[action.split(":")[0]].add(None)
+        return groups
+
+    def _update_codes_in_run(self, codes, start, stop):
+        service = bisect_right(self._service_starts, start) - 1
+        while start < stop:
+            service_stop = self._service_stops[service]
+            if start == self._service_starts[service] and stop >= service_stop:
+                codes.update(self._service_codes[service])
+            else:
+                codes.update(self._codes[start : min(stop, service_stop)])
+            start = service_stop
+            service += 1
+
+
 def categories_for_actions(actions):
     """
     Given an iterable of actions, return a mapping of action groups.
+    Actions that are not in the service data get a None category.
     
     actions: {'ec2:authorizesecuritygroupingress', 'iam:putrolepolicy', 'iam:listroles'}
+        or an ActionSet
     
     Returns:
         {
@@ -70,11 +203,7 @@ def categories_for_actions(actions):
             'iam': {'Permissions', 'List'})
         }
     """
-    groups = defaultdict(set)
-    for action in actions:
-        service = action.split(":")[0]
-        groups[service].add(_action_categories.get(action))
-    return groups
+    return get_universe().category_index.summarize(actions)
 
 
 def actions_for_category(category):
@@ -87,8 +216,19 @@ def actions_for_category(category):
     Returns:
         set of matching actions
     """
-    actions = set()
-    for action, action_category in _action_categories.items():
-        if action_category == category:
-            actions.add(action)
-    return actions
+    return set(get_universe().category_index.actions_for_category(category))
+
+
+def actions_for_service_category(service, category):
+    """
+    Returns the actions of one service in one category.
+
+    Param:
+        service: service prefix, like 'iam'
+        category must be in {'Permissions', 'List', 'Read', 'Tagging', 'Write'}
+
+    Returns:
+        frozenset of matching actions, shared between calls
+    """
+    category_index = get_universe().category_index
+    return category_index.actions_for_service_category(service, category)
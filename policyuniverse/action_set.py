@@ -0,0 +1,278 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.action_set
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import binascii
+
+from policyuniverse.cache import LRUCache
+from policyuniverse.universe import get_universe, on_reload
+
+# (mask, unknown actions) keyed by the lowercased action pattern.
+mask_cache = LRUCache(maxsize=4096)
+on_reload(mask_cache.clear)
+
+if hasattr(int, "from_bytes"):
+
+    def _int_from_bytes(buf):
+        return int.from_bytes(bytes(buf), "little")
+
+else:  # Python 2.7
+
+    def _int_from_bytes(buf):
+        return int(binascii.hexlify(bytes(buf[::-1])), 16)
+
+
+class ActionSet(object):
+    """
+    Immutable set of "prefix:action" names, stored as a bitmask over the positions
+    of an ActionIndex (see ActionIndex.position()). Names that are not in the index,
+    like actions of unknown services, are kept in the unknown frozenset.
+
+    Union, intersection and difference are integer operations, so combining the
+    ~5,800 actions of a NotAction statement with others costs about as much as
+    combining a handful of strings. Both operands must use the same index, mixing
+    sets from before and after a universe reload raises ValueError. Plain
+    iterables of names are converted with from_actions() first.
+    """
+
+    __slots__ = ("index", "mask", "unknown")
+
+    def __init__(self, mask=0, unknown=(), index=None):
+        """
+        :param mask: int with a bit set at the position of each known action
+        :param unknown: names that are not in the index
+        :param index: ActionIndex, defaults to the universe's action_index
+        """
+        self.index = index or get_universe().action_index
+        self.mask = mask
+        self.unknown = frozenset(unknown)
+
+    @classmethod
+    def from_actions(cls, actions, index=None):
+        """
+        :param actions: iterable of "prefix:action" names, used as-is
+        """
+        index = index or get_universe().action_index
+        positions = []
+        unknown = []
+        for action in actions:
+            position = index.position(action)
+            if position is None:
+                unknown.append(action)
+            else:
+                positions.append(position)
+        return cls(_mask_from_positions(positions), unknown, index)
+
+    @classmethod
+    def from_patterns(cls, patterns, index=None):
+        """
+        Expands action patterns the way get_actions_from_statement() does.
+        A wildcard that matches nothing, and a name that is not in the index, is
+        kept as an unknown action.
+
+        :param patterns: iterable of action patterns, like ['s3:get*', 'iam:passrole']
+        """
+        if index is None:
+            index = get_universe().action_index
+            expand = _cached_pattern_mask
+        else:
+            expand = _pattern_mask
+
+        mask = 0
+        unknown = set()
+        for pattern in patterns:
+            pattern_mask, pattern_unknown = expand(pattern.lower(), index)
+            mask |= pattern_mask
+            unknown.update(pattern_unknown)
+        return cls(mask, unknown, index)
+
+    @classmethod
+    def from_statement(cls, statement, index=None):
+        """
+        :param statement: statement dict
+        :return: ActionSet of the actions the statement applies to. NotAction is
+            inverted against every action in the index. The statement is not modified.
+        """
+        action_set = cls.from_patterns(_as_list(statement.get("Action", [])), index)
+        inverted = cls.from_patterns(_as_list(statement.get("NotAction", [])), index)
+        if inverted:
+            action_set = action_set | inverted.complement()
+        return action_set
+
+    def complement(self):
+        """
+        :return: ActionSet of every action in the index that is not in this set.
+            Unknown actions are dropped.
+        """
+        return ActionSet(self.index.all_mask & ~self.mask, (), self.index)
+
+    def _coerce(self, other):
+        if not isinstance(other, ActionSet):
+            return ActionSet.from_actions(other, self.index)
+        if other.index is not self.index:
+            raise ValueError("Cannot combine ActionSets built from different indexes.")
+        return other
+
+    def union(self, *others):
+        mask = self.mask
+        unknown = set(self.unknown)
+        for other in others:
+            other = self._coerce(other)
+            mask |= other.mask
+            unknown.update(other.unknown)
+        return ActionSet(mask, unknown, self.index)
+
+    def intersection(self, *others):
+        mask = self.mask
+        unknown = set(self.unknown)
+        for other in others:
+            other = self._coerce(other)
+            mask &= other.mask
+            unknown.intersection_update(other.unknown)
+        return ActionSet(mask, unknown, self.index)
+
+    def difference(self, *others):
+        mask = self.mask
+        unknown = set(self.unknown)
+        for other in others:
+            other = self._coerce(other)
+            mask &= ~other.mask
+            unknown.difference_update(other.unknown)
+        return ActionSet(mask, unknown, self.index)
+
+    def issubset(self, other):
+        other = self._coerce(other)
+        return self.mask & ~other.mask == 0 and self.unknown <= other.unknown
+
+    def isdisjoint(self, other):
+        other = self._coerce(other)
+        return self.mask & other.mask == 0 and self.unknown.isdisjoint(other.unknown)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+    __le__ = issubset
+
+    def popcount(self):
+        """Number of known actions in the set."""
+        return bin(self.mask).count("1")
+
+    def runs(self):
+        """
+        :return: generator of (start, stop) ranges of consecutive positions in the mask
+        """
+        bits = _reversed_bits(self.mask)
+        start = bits.find("1")
+        while start >= 0:
+            stop = bits.find("0", start)
+            if stop < 0:
+                stop = len(bits)
+            yield start, stop
+            start = bits.find("1", stop)
+
+    def to_set(self):
+        """:return: set of action names"""
+        return set(self)
+
+    def __iter__(self):
+        index = self.index
+        for position in _positions_from_mask(self.mask):
+            yield index.permission(position)
+        for action in sorted(self.unknown):
+            yield action
+
+    def __len__(self):
+        return self.popcount() + len(self.unknown)
+
+    def __bool__(self):
+        return bool(self.mask or self.unknown)
+
+    __nonzero__ = __bool__
+
+    def __contains__(self, action):
+        position = self.index.position(action)
+        if position is None:
+            return action in self.unknown
+        return bool(self.mask >> position & 1)
+
+    def __eq__(self, other):
+        if isinstance(other, ActionSet):
+            return (
+                self.index is other.index
+                and self.mask == other.mask
+                and self.unknown == other.unknown
+            )
+        # Plain sets hash differently, so they are compared with to_set() instead.
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash((self.mask, self.unknown))
+
+    def __repr__(self):
+        return "<ActionSet of {} actions>".format(len(self))
+
+
+def _as_list(actions):
+    if isinstance(actions, list):
+        return actions
+    return [actions]
+
+
+def _pattern_mask(pattern, index):
+    if "*" in pattern:
+        mask = index.mask(pattern)
+    else:
+        position = index.position(pattern)
+        mask = 0 if position is None else 1 << position
+    # Like expand_action(), a pattern that matches nothing is kept as-is.
+    return mask, frozenset() if mask else frozenset([pattern])
+
+
+def _cached_pattern_mask(pattern, index):
+    expanded = mask_cache.get(pattern)
+    if expanded is None:
+        expanded = _pattern_mask(pattern, index)
+        mask_cache.put(pattern, expanded)
+    return expanded
+
+
+def _mask_from_positions(positions):
+    if not positions:
+        return 0
+    buf = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        buf[position >> 3] |= 1 << (position & 7)
+    return _int_from_bytes(buf)
+
+
+def _reversed_bits(mask):
+    # Bit 0 first: 0b1010 -> "0101".
+    return bin(mask)[:1:-1]
+
+
+def _positions_from_mask(mask):
+    bits = _reversed_bits(mask)
+    position = bits.find("1")
+    while position >= 0:
+        yield position
+        position = bits.find("1", position + 1)
@@ -0,0 +1,218 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.action_table
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+Compact action table compiled from data.json.
+
+data.json stays the source of truth. The table only keeps what the hot paths
+need: the sorted "prefix:action" names, one category per action, and each
+service's resource types. It is written to data.idx with the layout below
+(little endian) so it can be memory mapped and sliced without parsing:
+
+    header          see _HEADER: magic, format version, sha256 of data.json,
+                    action count and the byte size of each string section
+    categories      one byte per action, an index into the category names
+    actions         newline separated, sorted "prefix:action" names
+    category names  newline separated
+    resource types  newline separated "prefix<TAB>name<TAB>arn_format" records
+
+Rebuild it after updating data.json:
+
+    python -m policyuniverse.action_table
+"""
+from __future__ import print_function
+
+import binascii
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+
+from policyuniverse.universe import service_data_path
+
+action_table_path = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "data.idx"
+)
+
+_MAGIC = b"PUAT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sH32sIIII")
+
+ResourceType = namedtuple("ResourceType", "prefix name arn_format")
+
+
+class ActionTable(object):
+    def __init__(self, digest, actions, categories, category_names, resource_types):
+        """
+        :param digest: hex sha256 of the data.json this table was compiled from.
+        :param actions: sorted tuple of "prefix:action" names.
+        :param categories: bytes-like, one index into category_names per action.
+        :param category_names: tuple of category names.
+        :param resource_types: tuple of ResourceType.
+        """
+        self.digest = digest
+        self.actions = actions
+        self.categories = categories
+        self.category_names = category_names
+        self.resource_types = resource_types
+
+    def __len__(self):
+        return len(self.actions)
+
+
+def service_data_digest(path=None):
+    with open(path or service_data_path, "rb") as service_data_file:
+        return hashlib.sha256(service_data_file.read()).hexdigest()
+
+
+def compile_action_table(service_data, digest):
+    """
+    Builds an ActionTable from the parsed contents of data.json.
+    """
+    action_groups = dict()
+    resource_types = []
+    for service_name in service_data:
+        service_body = service_data[service_name]
+        prefix = service_body["prefix"]
+        for service_action, service_action_body in service_body["actions"].items():
+            key = "{}:{}".format(prefix, service_action.lower())
+            action_groups[key] = service_action_body["calculated_action_group"]
+        for name, resource_body in service_body.get("resource_types", {}).items():
+            resource_types.append(
+                ResourceType(prefix, name, resource_body["arn_format"])
+            )
+
+    actions = tuple(sorted(action_groups))
+    category_names = tuple(sorted(set(action_groups.values())))
+    category_ids = dict((name, idx) for idx, name in enumerate(category_names))
+    categories = bytearray(category_ids[action_groups[action]] for action in actions)
+    return ActionTable(
+        digest,
+        actions,
+        bytes(categories),
+        category_names,
+        tuple(sorted(resource_types)),
+    )
+
+
+def write_action_table(table, path=None):
+    actions = "\n".join(table.actions).encode("utf-8")
+    category_names = "\n".join(table.category_names).encode("utf-8")
+    resource_types = "\n".join(
+        "\t".join(resource_type) for resource_type in table.resource_types
+    ).encode("utf-8")
+
+    with open(path or action_table_path, "wb") as table_file:
+        table_file.write(
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                binascii.unhexlify(table.digest),
+                len(table.actions),
+                len(actions),
+                len(category_names),
+                len(resource_types),
+            )
+        )
+        table_file.write(bytes(table.categories))
+        table_file.write(actions)
+        table_file.write(category_names)
+        table_file.write(resource_types)
+
+
+def read_action_table(path=None):
+    """
+    Reads an ActionTable written by write_action_table().
+    Raises ValueError if the file is not a compatible action table.
+    """
+    with open(path or action_table_path, "rb") as table_file:
+        buf = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if len(buf) < _HEADER.size:
+            raise ValueError("Action table is truncated.")
+        (
+            magic,
+            version,
+            digest,
+            action_count,
+            actions_size,
+            category_names_size,
+            resource_types_size,
+        ) = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Unsupported action table format.")
+
+        offset = _HEADER.size
+        end = offset + action_count + actions_size
+        end += category_names_size + resource_types_size
+        if len(buf) != end:
+            raise ValueError("Action table is truncated.")
+
+        categories = buf[offset : offset + action_count]
+        offset += action_count
+        actions = _split(buf[offset : offset + actions_size])
+        offset += actions_size
+        category_names = _split(buf[offset : offset + category_names_size])
+        offset += category_names_size
+        resource_types = tuple(
+            ResourceType(*record.split("\t"))
+            for record in _split(buf[offset : offset + resource_types_size])
+        )
+    finally:
+        buf.close()
+
+    if len(actions) != action_count:
+        raise ValueError("Action table is corrupt.")
+    digest = binascii.hexlify(digest).decode("ascii")
+    return ActionTable(digest, actions, categories, category_names, resource_types)
+
+
+def _split(data):
+    if not data:
+        return ()
+    return tuple(data.decode("utf-8").split("\n"))
+
+
+def main(argv=None):
+    """
+    Compiles data.json into data.idx.
+    With --check, only reports whether data.idx is stale and exits non-zero if so.
+    """
+    from policyuniverse.universe import load_service_data
+
+    argv = sys.argv[1:] if argv is None else argv
+    digest = service_data_digest()
+
+    if "--check" in argv:
+        try:
+            stale = read_action_table().digest != digest
+        except (IOError, OSError, ValueError):
+            stale = True
+        print("{} is {}.".format(action_table_path, "stale" if stale else "current"))
+        return 1 if stale else 0
+
+    table = compile_action_table(load_service_data(), digest)
+    write_action_table(table)
+    print("Wrote {} actions to {}.".format(len(table), action_table_path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.analysis_cache
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+On-disk cache of policy analysis results, in a SQLite file.
+
+Results are keyed by the policy fingerprint (see fingerprint.fingerprint()) and
+the digest of the data.json they were computed with, so a rerun over mostly
+unchanged policies is answered from the file, and a new data.json misses every
+old entry. Old entries are kept until prune() removes them:
+
+    with AnalysisCache("audit-cache.sqlite") as cache:
+        for result in audit(read_paths(["policies/"]), cache=cache):
+            ...
+"""
+import json
+import sqlite3
+import zlib
+
+from policyuniverse.fingerprint import analyze_policy, fingerprint
+from policyuniverse.stream import PolicyResult
+from policyuniverse.universe import get_universe
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    fingerprint TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    result BLOB NOT NULL,
+    PRIMARY KEY (fingerprint, digest)
+)
+"""
+
+
+class AnalysisCache(object):
+    """
+    Policy analysis results stored in a SQLite file, keyed by fingerprint and the
+    data.json digest. Has the same get() as fingerprint.PolicyCache, so either one
+    can be passed to stream.audit().
+
+    New results are committed every commit_every writes, and by flush(), close()
+    or leaving a with block. A connection must only be used by the thread that
+    opened it; worker processes should each open their own.
+    """
+
+    def __init__(self, path, commit_every=256):
+        """
+        :param path: SQLite file, created when missing. ":memory:" for a cache that
+            is not kept.
+        :param commit_every: number of new results to write per transaction
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        self._commit_every = commit_every
+        self._uncommitted = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, policy):
+        """
+        :param policy: policy dict
+        :return: compact PolicyResult without a source or name, see
+            fingerprint.analyze_policy()
+        """
+        key = fingerprint(policy)
+        digest = get_universe().digest
+        row = self._connection.execute(
+            "SELECT result FROM results WHERE fingerprint = ? AND digest = ?",
+            (key, digest),
+        ).fetchone()
+        if row is not None:
+            self.hits += 1
+            return _load_result(row[0])
+
+        self.misses += 1
+        result = analyze_policy(policy)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+            (key, digest, _dump_result(result)),
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self._commit_every:
+            self.flush()
+        return result
+
+    def prune(self):
+        """
+        Deletes results computed with any other data.json than the loaded one.
+
+        :return: number of results deleted
+        """
+        deleted = self._connection.execute(
+            "DELETE FROM results WHERE digest != ?", (get_universe().digest,)
+        ).rowcount
+        self.flush()
+        return deleted
+
+    def flush(self):
+        """Commits the results written since the last commit."""
+        self._connection.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def hit_rate(self):
+        """:return: fraction of get() calls answered from the file"""
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _dump_result(result):
+    # Summaries of wildcard policies list hundreds of services, and compress ~5x.
+    text = json.dumps(
+        [result.internet_accessible, result.whos_allowed, result.action_summary],
+        separators=(",", ":"),
+    )
+    return sqlite3.Binary(zlib.compress(text.encode("utf-8"), 1))
+
+
+def _load_result(blob):
+    # JSON arrays come back as lists, compact results hold tuples.
+    text = zlib.decompress(bytes(blob)).decode("utf-8")
+    internet_accessible, whos_allowed, action_summary = json.loads(text)
+    return PolicyResult(
+        None,
+        None,
+        internet_accessible,
+        tuple(tuple(who) for who in whos_allowed),
+        tuple((service, tuple(categories)) for service, categories in action_summary),
+        None,
+    )
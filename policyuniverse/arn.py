@@ -20,41 +20,62 @@
 
 """
 from policyuniverse import logger
+from policyuniverse.cache import LRUCache
 import re
 
+_ARN_MATCH = re.compile(
+    r"^arn:([^:]*):([^:]*):([^:]*):(|\*|[\d]{12}|cloudfront|aws):(.+)$"
+).search
+_ARN_ACCOUNT_MATCH = re.compile(r"(|\*|[\d]{12}|cloudfront|aws)\Z").match
+_ACCOUNT_NUMBER_MATCH = re.compile(r"^(\d{12})+$").search
+_AWS_SERVICE_MATCH = re.compile(r"^(([^.]+)(.[^.]+)?)\.amazon(aws)?\.com$").search
+_AWS_INTERNAL_SERVICE_MATCH = re.compile(r"^([^.]+).aws.internal$").search
+
+# Parsed ARNs shared by ARN.parse_many(), keyed by the input string.
+parse_cache = LRUCache(maxsize=65536)
+
 
 class ARN(object):
-    tech = None
-    region = None
-    account_number = None
-    name = None
-    partition = None
-    error = False
-    root = False
-    service = False
+    __slots__ = (
+        "tech",
+        "region",
+        "account_number",
+        "name",
+        "partition",
+        "error",
+        "root",
+        "service",
+    )
 
     def __init__(self, input):
-        arn_match = re.search(
-            r"^arn:([^:]*):([^:]*):([^:]*):(|\*|[\d]{12}|cloudfront|aws):(.+)$", input
-        )
-        if arn_match:
-            if arn_match.group(2) == "iam" and arn_match.group(5) == "root":
+        self.tech = None
+        self.region = None
+        self.account_number = None
+        self.name = None
+        self.partition = None
+        self.error = False
+        self.root = False
+        self.service = False
+
+        arn_parts = _split_arn(input)
+        if arn_parts:
+            if arn_parts[1] == "iam" and arn_parts[4] == "root":
                 self.root = True
 
-            self._from_arn(arn_match, input)
+            self._from_arn(arn_parts)
             return
 
-        acct_number_match = re.search(r"^(\d{12})+$", input)
+        acct_number_match = _ACCOUNT_NUMBER_MATCH(input)
         if acct_number_match:
             self._from_account_number(input)
             return
 
-        aws_service_match = re.search(r"^(([^.]+)(.[^.]+)?)\.amazon(aws)?\.com$", input)
+        aws_service_match = _AWS_SERVICE_MATCH(input)
         if aws_service_match:
             self._from_aws_service(input, aws_service_match.group(1))
             return
 
-        aws_service_match = re.search(r"^([^.]+).aws.internal$", input)
+        aws_service_match = _AWS_INTERNAL_SERVICE_MATCH(input)
         if aws_service_match:
             self._from_aws_service(input, aws_service_match.group(1))
             return
@@ -62,12 +83,33 @@ class ARN(object):
         self.error = True
         logger.warning("ARN Could not parse [{}].".format(input))
 
-    def _from_arn(self, arn_match, input):
-        self.partition = arn_match.group(1)
-        self.tech = arn_match.group(2)
-        self.region = arn_match.group(3)
-        self.account_number = arn_match.group(4)
-        self.name = arn_match.group(5)
+    @classmethod
+    def parse_many(cls, inputs):
+        """
+        Parses an iterable of ARNs, account numbers and service principals.
+
+        Repeated inputs are served from parse_cache, so they share one ARN object
+        (treat it as read-only) and a parse failure is only logged the first time.
+
+        Returns a list of ARN objects in input order.
+        """
+        arns = []
+        for input in inputs:
+            arn = parse_cache.get(input)
+            if arn is None:
+                arn = cls(input)
+                parse_cache.put(input, arn)
+            arns.append(arn)
+        return arns
+
+    def _from_arn(self, arn_parts):
+        (
+            self.partition,
+            self.tech,
+            self.region,
+            self.account_number,
+            self.name,
+        ) = arn_parts
 
     def _from_account_number(self, input):
         self.account_number = input
@@ -75,3 +117,21 @@ class ARN(object):
     def _from_aws_service(self, input, service):
         self.tech = service
         self.service = True
+
+
+def _split_arn(input):
+    """
+    Returns the (partition, tech, region, account_number, name) of an ARN,
+    or None if input is not an ARN.
+    """
+    if input.startswith("arn:") and "\n" not in input:
+        # Same result as _ARN_MATCH, without running the regex on every ARN.
+        arn_parts = input.split(":", 5)
+        if len(arn_parts) == 6 and arn_parts[5] and _ARN_ACCOUNT_MATCH(arn_parts[4]):
+            return arn_parts[1:]
+        return None
+
+    arn_match = _ARN_MATCH(input)
+    if arn_match:
+        return arn_match.groups()
+    return None
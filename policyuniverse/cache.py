@@ -0,0 +1,93 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.cache
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheStats = namedtuple("CacheStats", "hits misses evictions size maxsize")
+
+if hasattr(OrderedDict, "move_to_end"):
+    _move_to_end = OrderedDict.move_to_end
+else:  # Python 2.7
+
+    def _move_to_end(entries, key):
+        entries[key] = entries.pop(key)
+
+
+class LRUCache(object):
+    """
+    Thread-safe, bounded least-recently-used cache that counts hits, misses and evictions.
+    A maxsize of 0 disables caching.
+    """
+
+    def __init__(self, maxsize=1024):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def resize(self, maxsize):
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            _move_to_end(self._entries, key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drops every entry. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return CacheStats(
+            self.hits, self.misses, self.evictions, len(self._entries), self._maxsize
+        )
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,500 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.condition
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+Evaluates Condition blocks against request contexts.
+
+A Condition block is compiled once into one test per (operator, key), with the
+policy values already parsed: patterns into a regex, CIDRs into integer ranges,
+numbers and dates into floats. Evaluating a request context then only parses the
+request's own values:
+
+    condition = CompiledCondition(statement["Condition"])
+    condition.evaluate(request_context({"aws:SourceIp": "10.0.0.1"}))
+
+Request contexts map condition keys to a value or a list of values. Keys are
+case-insensitive, request_context() lowercases them once so that every compiled
+condition can look them up directly.
+"""
+import binascii
+import calendar
+import datetime
+import operator as _operator
+import re
+import socket
+from collections import namedtuple
+
+from policyuniverse import logger
+from policyuniverse.cache import LRUCache
+from policyuniverse.pattern import arn_pattern_to_regex, pattern_to_regex
+
+ConditionOperator = namedtuple(
+    "ConditionOperator",
+    "name family test negated ignore_case if_exists set_operator",
+)
+
+_CONDITION_OPERATOR_FAMILIES = [
+    "String",
+    "Numeric",
+    "Date",
+    "Bool",
+    "Binary",
+    "IpAddress",
+    "Arn",
+]
+
+_BASE_CONDITION_OPERATORS = [
+    "StringEquals",
+    "StringNotEquals",
+    "StringEqualsIgnoreCase",
+    "StringNotEqualsIgnoreCase",
+    "StringLike",
+    "StringNotLike",
+    "NumericEquals",
+    "NumericNotEquals",
+    "NumericLessThan",
+    "NumericLessThanEquals",
+    "NumericGreaterThan",
+    "NumericGreaterThanEquals",
+    "DateEquals",
+    "DateNotEquals",
+    "DateLessThan",
+    "DateLessThanEquals",
+    "DateGreaterThan",
+    "DateGreaterThanEquals",
+    "Bool",
+    "BinaryEquals",
+    "IpAddress",
+    "NotIpAddress",
+    "ArnEquals",
+    "ArnLike",
+    "ArnNotEquals",
+    "ArnNotLike",
+]
+
+
+def _build_condition_operators():
+    """
+    Every IAM condition operator: the base operators, each with and without
+    IfExists and the ForAllValues:/ForAnyValue: set operators, plus Null.
+    Keyed by the lowercased operator name.
+    """
+    operators = dict()
+    for base in _BASE_CONDITION_OPERATORS:
+        negated = "Not" in base
+        rest = base[3:] if base.startswith("Not") else base
+        for family in _CONDITION_OPERATOR_FAMILIES:
+            if rest.startswith(family):
+                break
+        test = rest[len(family) :].replace("Not", "", 1)
+        ignore_case = test.endswith("IgnoreCase")
+        if ignore_case:
+            test = test[: -len("IgnoreCase")]
+        for set_operator in [None, "ForAllValues", "ForAnyValue"]:
+            for if_exists in [False, True]:
+                name = base + ("IfExists" if if_exists else "")
+                if set_operator:
+                    name = "{}:{}".format(set_operator, name)
+                operators[name.lower()] = ConditionOperator(
+                    name, family, test, negated, ignore_case, if_exists, set_operator
+                )
+    operators["null"] = ConditionOperator("Null", "Null", "", False, False, False, None)
+    return operators
+
+
+# Lowercased operator name -> ConditionOperator, e.g.
+# condition_operators["forallvalues:stringlikeifexists"]
+condition_operators = _build_condition_operators()
+
+_COMPARISONS = {
+    "Equals": _operator.eq,
+    "LessThan": _operator.lt,
+    "LessThanEquals": _operator.le,
+    "GreaterThan": _operator.gt,
+    "GreaterThanEquals": _operator.ge,
+}
+
+_VARIABLE_REGEX = re.compile(r"\$\{([^}]*)\}")
+_VARIABLE_FINDALL = _VARIABLE_REGEX.findall
+_VARIABLE_SUB = _VARIABLE_REGEX.sub
+_SPECIAL_VARIABLES = ("*", "?", "$")
+
+_DATE_MATCH = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(\.\d*)?)?)?"
+    r"(Z|[+-]\d{2}:?\d{2})?\Z"
+).match
+
+# Matchers for policy values with their variables substituted, keyed by
+# (family, test, ignore_case, substituted value).
+substituted_matchers = LRUCache(maxsize=4096)
+
+
+def request_context(values):
+    """
+    :param values: mapping of condition key -> value or list of values
+    :return: dict with lowercased keys, as CompiledCondition.evaluate() expects
+    """
+    return dict((key.lower(), value) for key, value in values.items())
+
+
+class CompiledCondition(object):
+    """
+    A Condition block compiled into one test per (operator, key). Every test must
+    pass, and a test passes when the request value matches any of its policy
+    values, as IAM evaluates them.
+    """
+
+    __slots__ = ("tests",)
+
+    def __init__(self, condition):
+        """
+        :param condition: the Condition of a statement, may be None or empty
+        """
+        self.tests = []
+        for operator_name, block in (condition or {}).items():
+            operator = condition_operators.get(operator_name.lower())
+            if operator is None or not isinstance(block, dict):
+                # IAM rejects these policies, so the condition is never met.
+                logger.debug("Unknown condition operator {}.".format(operator_name))
+                self.tests.append(_never)
+                continue
+            for key, values in block.items():
+                try:
+                    test = _compile_test(operator, key.lower(), values)
+                except (TypeError, ValueError) as e:
+                    # Values of the wrong type, like a dict, never match.
+                    logger.debug("Cannot compile condition {}: {}".format(key, e))
+                    test = _never
+                self.tests.append(test)
+
+    def evaluate(self, context):
+        """
+        :param context: dict from request_context()
+        :return: True if the request context meets every condition
+        """
+        for test in self.tests:
+            if not test(context):
+                return False
+        return True
+
+
+def _never(context):
+    return False
+
+
+def _compile_test(operator, key, values):
+    values = _as_list(values)
+    if operator.family == "Null":
+        absent = not values or _string(values[0]).lower() == "true"
+
+        def test(context):
+            return _is_absent(context.get(key)) == absent
+
+        return test
+
+    matches = _compile_matcher(operator, values)
+    negated = operator.negated
+    if_exists = operator.if_exists
+
+    if operator.set_operator == "ForAllValues":
+
+        def test(context):
+            request = context.get(key)
+            if _is_absent(request):
+                return True
+            for value in _as_list(request):
+                if matches(value, context) == negated:
+                    return False
+            return True
+
+    elif operator.set_operator == "ForAnyValue":
+
+        def test(context):
+            request = context.get(key)
+            if _is_absent(request):
+                return if_exists
+            for value in _as_list(request):
+                if matches(value, context) != negated:
+                    return True
+            return False
+
+    else:
+
+        def test(context):
+            request = context.get(key)
+            if _is_absent(request):
+                # A missing key never matches, which meets a negated operator.
+                return if_exists or negated
+            for value in _as_list(request):
+                if matches(value, context):
+                    return not negated
+            return negated
+
+    return test
+
+
+def _compile_matcher(operator, values):
+    """
+    :return: function(request value, context) -> True if the value matches any of
+        the policy values
+    """
+    family = operator.family
+    if family in ("String", "Arn") and any(map(has_variables, values)):
+        return _variable_matcher(operator, values)
+
+    if family == "String" and operator.test == "Like" or family == "Arn":
+        to_regex = pattern_to_regex if family == "String" else arn_pattern_to_regex
+        regex = _union_regex(to_regex, values)
+        if regex is None:
+            return _never_matches
+        match = regex.match
+        return lambda value, context: match(_string(value)) is not None
+
+    if family in ("String", "Binary", "Bool"):
+        if operator.ignore_case or family == "Bool":
+            policy_values = frozenset(_string(value).lower() for value in values)
+            return lambda value, context: _string(value).lower() in policy_values
+        policy_values = frozenset(_string(value) for value in values)
+        return lambda value, context: _string(value) in policy_values
+
+    if family in ("Numeric", "Date"):
+        parse = _number if family == "Numeric" else _date
+        compare = _COMPARISONS[operator.test]
+        policy_values = [number for number in map(parse, values) if number is not None]
+
+        def matches(value, context):
+            number = parse(value)
+            if number is None:
+                return False
+            for policy_value in policy_values:
+                if compare(number, policy_value):
+                    return True
+            return False
+
+        return matches
+
+    if family == "IpAddress":
+        ranges = [ip_range for ip_range in map(parse_cidr, values) if ip_range]
+
+        def matches(value, context):
+            address = parse_ip(value)
+            if address is None:
+                return False
+            version, number = address
+            for range_version, low, high in ranges:
+                if version == range_version and low <= number <= high:
+                    return True
+            return False
+
+        return matches
+
+    return _never_matches
+
+
+def _never_matches(value, context):
+    return False
+
+
+def _union_regex(to_regex, patterns):
+    expressions = []
+    for pattern in patterns:
+        try:
+            expressions.append(to_regex(_string(pattern)))
+        except (TypeError, ValueError) as e:
+            logger.debug("Cannot compile condition value {}: {}".format(pattern, e))
+    if not expressions:
+        return None
+    return re.compile("(?:" + "|".join(expressions) + r")\Z", re.DOTALL)
+
+
+def _variable_matcher(operator, values):
+    # Patterns escape the substituted text, so a "*" in a user name is literal.
+    escape = operator.test == "Like" or operator.family == "Arn"
+
+    def matches(value, context):
+        for policy_value in values:
+            substituted = substitute_variables(_string(policy_value), context, escape)
+            if substituted is None:
+                continue
+            key = (operator.family, operator.test, operator.ignore_case, substituted)
+            matcher = substituted_matchers.get(key)
+            if matcher is None:
+                matcher = _compile_matcher(operator, [substituted])
+                substituted_matchers.put(key, matcher)
+            if matcher(value, context):
+                return True
+        return False
+
+    return matches
+
+
+def has_variables(value):
+    """
+    :return: True if value is a string with a policy variable like ${aws:username}.
+        The escapes ${*}, ${?} and ${$} are not variables.
+    """
+    text = _string(value)
+    if not hasattr(text, "strip"):
+        return False
+    return any(name not in _SPECIAL_VARIABLES for name in _VARIABLE_FINDALL(text))
+
+
+class _MissingVariable(Exception):
+    pass
+
+
+def substitute_variables(value, context, escape=False):
+    """
+    :param value: policy string, like "arn:aws:s3:::bucket/${aws:username}/*"
+    :param context: request context, see request_context()
+    :param escape: keep the substituted text literal in a pattern, by writing its
+        "*", "?" and "$" as ${*}, ${?} and ${$}
+    :return: value with each ${key} replaced by the context's value, or None if
+        a key is missing or has several values
+    """
+
+    def replace(match):
+        name = match.group(1)
+        if name in _SPECIAL_VARIABLES:
+            return match.group(0) if escape else name
+        request = context.get(name.lower())
+        if request is None or isinstance(request, list):
+            raise _MissingVariable(name)
+        text = _string(request)
+        if escape:
+            text = text.replace("$", "${$}").replace("*", "${*}")
+            text = text.replace("?", "${?}")
+        return text
+
+    try:
+        return _VARIABLE_SUB(replace, value)
+    except _MissingVariable:
+        return None
+
+
+def _as_list(value):
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _is_absent(value):
+    return value is None or value == []
+
+
+def _string(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _date(value):
+    """
+    :param value: datetime, ISO 8601 text, or seconds since the epoch
+    :return: seconds since the epoch, or None
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None) - value.utcoffset()
+        return calendar.timegm(value.timetuple()) + value.microsecond / 1e6
+    if isinstance(value, datetime.date):
+        return float(calendar.timegm(value.timetuple()))
+
+    number = _number(value)
+    if number is not None:
+        return number
+
+    match = _DATE_MATCH(_string(value)) if hasattr(value, "strip") else None
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    seconds = calendar.timegm(
+        (
+            int(year),
+            int(month),
+            int(day),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0),
+            0,
+            0,
+            0,
+        )
+    )
+    seconds += float(fraction or 0)
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        digits = offset[1:].replace(":", "")
+        seconds -= sign * (int(digits[:2]) * 3600 + int(digits[2:]) * 60)
+    return seconds
+
+
+def parse_ip(value):
+    """
+    :param value: IPv4 or IPv6 address, like "203.0.113.7"
+    :return: (version, address as int), or None if value is not an address
+    """
+    text = _string(value)
+    if not hasattr(text, "strip"):
+        return None
+    for family, version in ((socket.AF_INET, 4), (socket.AF_INET6, 6)):
+        try:
+            packed = socket.inet_pton(family, text.strip())
+        except (socket.error, ValueError):
+            continue
+        return version, int(binascii.hexlify(packed), 16)
+    return None
+
+
+def parse_cidr(cidr):
+    """
+    :param cidr: IPv4 or IPv6 network, like "203.0.113.0/24". A lone address is
+        a network of one.
+    :return: (version, lowest address, highest address) as ints, or None if cidr
+        is not a network
+    """
+    text = _string(cidr)
+    if not hasattr(text, "partition"):
+        return None
+    address, _, bits = text.partition("/")
+    parsed = parse_ip(address)
+    if parsed is None:
+        return None
+    version, number = parsed
+    width = 32 if version == 4 else 128
+    try:
+        bits = int(bits) if bits else width
+    except ValueError:
+        return None
+    if not 0 <= bits <= width:
+        return None
+    host_mask = (1 << (width - bits)) - 1
+    low = number & ~host_mask
+    return version, low, low | host_mask
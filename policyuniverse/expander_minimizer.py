@@ -21,13 +21,20 @@
 """
 from __future__ import print_function
 from policyuniverse import all_permissions
+from policyuniverse.cache import LRUCache
+from policyuniverse.universe import get_universe, on_reload
+from collections import defaultdict
 import json
-import fnmatch
 import sys
 import copy
 
 policy_headers = ["rolepolicies", "grouppolicies", "userpolicies", "policy"]
 
+# Expanded actions keyed by the lowercased action pattern.
+# Resize with expansion_cache.resize(maxsize); expansion_cache.stats() reports hit rates.
+expansion_cache = LRUCache(maxsize=4096)
+on_reload(expansion_cache.clear)
+
 
 def expand_minimize_over_policies(policies, activity, **kwargs):
     for header in policy_headers:
@@ -69,19 +76,33 @@ def _expand_wildcard_action(action):
         return expanded_actions
 
     else:
-        if "*" in action:
-            expanded = [
-                expanded_action.lower()
-                for expanded_action in all_permissions
-                if fnmatch.fnmatchcase(expanded_action.lower(), action.lower())
-            ]
+        return list(expand_action(action))
+
+
+def expand_action(action):
+    """
+    :param action: 'autoscaling:*'
+    :return: frozenset of all autoscaling permissions matching the wildcard.
+        Results are memoized in expansion_cache.
+    """
+    action = action.lower()
+    expanded = expansion_cache.get(action)
+    if expanded is None:
+        expanded = _expand_action(action)
+        expansion_cache.put(action, expanded)
+    return expanded
+
+
+def _expand_action(action):
+    if "*" in action:
+        expanded = get_universe().action_index.expand(action)
 
-            # if we get a wildcard for a tech we've never heard of, just return the wildcard
-            if not expanded:
-                return [action.lower()]
+        # if we get a wildcard for a tech we've never heard of, just return the wildcard
+        if not expanded:
+            return frozenset([action])
 
-            return expanded
-        return [action.lower()]
+        return frozenset(expanded)
+    return frozenset([action])
 
 
 def _get_desired_actions_from_statement(statement):
@@ -98,14 +119,65 @@ def _get_desired_actions_from_statement(statement):
     return desired_actions
 
 
-def _get_denied_prefixes_from_desired(desired_actions):
-    denied_actions = all_permissions.difference(desired_actions)
-    denied_prefixes = set()
-    for denied_action in denied_actions:
-        for denied_prefix in _get_prefixes_for_action(denied_action):
-            denied_prefixes.add(denied_prefix)
+class _TrieNode(object):
+    __slots__ = ("count", "children")
 
-    return denied_prefixes
+    def __init__(self):
+        # Number of permissions at or below this node.
+        self.count = 0
+        self.children = {}
+
+
+# Prefix tries of each service's permissions, built on first use. The action_index
+# holds the same permissions as all_permissions, which desired actions are checked
+# against, and changing all_permissions clears the tries.
+_service_tries = {}
+on_reload(_service_tries.clear)
+
+
+def _get_service_trie(technology):
+    """
+    :param technology: iam
+    :return: root node of a trie holding the action names of every iam permission.
+    """
+    trie = _service_tries.get(technology)
+    if trie is None:
+        trie = _TrieNode()
+        for permission in get_universe().action_index.expand("{}:*".format(technology)):
+            node = trie
+            node.count += 1
+            for char in permission.split(":")[1]:
+                node = node.children.setdefault(char, _TrieNode())
+                node.count += 1
+        _service_tries[technology] = trie
+    return trie
+
+
+def _get_trie_path(action):
+    """
+    :param action: iam:cat
+    :return: the trie nodes for [ "iam:", "iam:c", "iam:ca", "iam:cat" ]
+    """
+    (technology, permission) = action.split(":")
+    node = _get_service_trie(technology)
+    path = [node]
+    for char in permission:
+        node = node.children[char]
+        path.append(node)
+    return path
+
+
+def _get_desired_counts(desired_actions):
+    """
+    Counts how many desired actions sit at or below each trie node they pass through.
+    A prefix is safe to wildcard when every permission below it is desired,
+    i.e. when its desired count equals its node count.
+    """
+    desired_counts = defaultdict(int)
+    for action in desired_actions:
+        for node in _get_trie_path(action):
+            desired_counts[node] += 1
+    return desired_counts
 
 
 def _check_min_permission_length(permission, minchars=None):
@@ -127,23 +199,24 @@ def minimize_statement_actions(statement, minchars=None):
         raise Exception("Minification does not currently work on Deny statements.")
 
     desired_actions = _get_desired_actions_from_statement(statement)
-    denied_prefixes = _get_denied_prefixes_from_desired(desired_actions)
+    desired_counts = _get_desired_counts(desired_actions)
 
     for action in desired_actions:
-        if action in denied_prefixes:
+        path = _get_trie_path(action)
+        if path[-1].count != desired_counts[path[-1]]:
             print("Action is a denied prefix. Action: {}".format(action))
             minimized_actions.add(action)
             continue
 
         found_prefix = False
         prefixes = _get_prefixes_for_action(action)
-        for prefix in prefixes:
+        for prefix, node in zip(prefixes, path):
 
             permission = prefix.split(":")[1]
             if _check_min_permission_length(permission, minchars=minchars):
                 continue
 
-            if prefix not in denied_prefixes:
+            if node.count == desired_counts[node]:
                 if prefix not in desired_actions:
                     prefix = "{}*".format(prefix)
                 minimized_actions.add(prefix)
@@ -162,28 +235,31 @@ def minimize_statement_actions(statement, minchars=None):
 
 
 def get_actions_from_statement(statement):
+    """
+    :param statement: statement dict, it is not modified.
+    :return: set of the actions the statement applies to, with NotAction inverted.
+    """
     allowed_actions = set()
-
-    if not type(statement.get("Action", [])) == list:
-        statement["Action"] = [statement["Action"]]
-
-    for action in statement.get("Action", []):
-        allowed_actions = allowed_actions.union(set(_expand_wildcard_action(action)))
-
-    if not type(statement.get("NotAction", [])) == list:
-        statement["NotAction"] = [statement["NotAction"]]
+    for action in _as_list(statement.get("Action", [])):
+        allowed_actions.update(expand_action(action))
 
     inverted_actions = set()
-    for action in statement.get("NotAction", []):
-        inverted_actions = inverted_actions.union(set(_expand_wildcard_action(action)))
+    for action in _as_list(statement.get("NotAction", [])):
+        inverted_actions.update(expand_action(action))
 
     if inverted_actions:
         actions = _invert_actions(inverted_actions)
-        allowed_actions = allowed_actions.union(actions)
+        allowed_actions.update(actions)
 
     return allowed_actions
 
 
+def _as_list(actions):
+    if not type(actions) == list:
+        return [actions]
+    return actions
+
+
 def _invert_actions(actions):
     from policyuniverse import all_permissions
 
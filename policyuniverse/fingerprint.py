@@ -0,0 +1,183 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.fingerprint
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+Fingerprints of policy documents, and a cache of analysis results keyed by them.
+
+Two documents get the same fingerprint when they only differ in ways the analysis
+ignores: key order, a single value versus a list holding it, the order of and
+duplicates in Action, Resource, Principal and Condition value lists, and the case
+of actions. Statement order, Sid and Effect are kept as they are.
+"""
+import hashlib
+import json
+
+from policyuniverse.cache import LRUCache
+from policyuniverse.stream import audit_policy, compact_result
+
+_ACTION_KEYS = ("Action", "NotAction")
+_RESOURCE_KEYS = ("Resource", "NotResource")
+_PRINCIPAL_KEYS = ("Principal", "NotPrincipal")
+
+
+def canonicalize(policy):
+    """
+    :param policy: policy dict, it is not modified.
+    :return: a new policy dict in canonical form, see the module docstring.
+    """
+    statements = policy.get("Statement", [])
+    if not isinstance(statements, list):
+        statements = [statements]
+    canonical = dict(policy)
+    canonical["Statement"] = [
+        _canonical_statement(statement) for statement in statements
+    ]
+    return canonical
+
+
+def fingerprint(policy):
+    """
+    :param policy: policy dict
+    :return: hex sha256 of the canonical form of the policy.
+    """
+    canonical = json.dumps(
+        canonicalize(policy), sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def _canonical_statement(statement):
+    if not isinstance(statement, dict):
+        return statement
+    canonical = dict()
+    for key, value in statement.items():
+        if key in _ACTION_KEYS:
+            value = _sorted_unique([_lower(action) for action in _as_list(value)])
+        elif key in _RESOURCE_KEYS:
+            value = _sorted_unique(_as_list(value))
+        elif key in _PRINCIPAL_KEYS and isinstance(value, dict):
+            value = dict(
+                (principal_type, _sorted_unique(_as_list(principals)))
+                for principal_type, principals in value.items()
+            )
+        elif key == "Condition" and isinstance(value, dict):
+            value = dict(
+                (operator, _canonical_condition_block(operator, block))
+                for operator, block in value.items()
+            )
+        canonical[key] = value
+    return canonical
+
+
+def _canonical_condition_block(operator, block):
+    if not isinstance(block, dict):
+        return block
+    # ForAllValues and ForAnyValue ignore values that are not a list, so a single
+    # value is not the same as a list there. Statement._condition_entries skips them.
+    set_operator = operator.lower().startswith("for")
+    return dict(
+        (
+            key,
+            (
+                values
+                if set_operator and not isinstance(values, list)
+                else _sorted_unique(_as_list(values))
+            ),
+        )
+        for key, values in block.items()
+    )
+
+
+def _as_list(value):
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _lower(action):
+    try:
+        return action.lower()
+    except AttributeError:
+        return action
+
+
+def _sorted_unique(values):
+    try:
+        return sorted(set(values))
+    except TypeError:
+        # Unhashable or mixed types, like a dict in a list, are left in place.
+        return values
+
+
+def analyze_policy(policy):
+    """
+    The default PolicyCache analysis.
+
+    :return: compact PolicyResult (see stream.compact_result) without a source or name
+    """
+    return compact_result(audit_policy(policy))
+
+
+class PolicyCache(object):
+    """
+    Bounded LRU cache of policy analysis results, keyed by fingerprint, so that
+    a policy attached in thousands of accounts is analyzed once.
+
+        cache = PolicyCache(maxsize=10000)
+        result = cache.get(policy)
+        cache.hit_rate()
+    """
+
+    def __init__(self, maxsize=4096, analyze=analyze_policy):
+        """
+        :param maxsize: number of unique policies to keep
+        :param analyze: function(policy dict) -> result to cache. Results are shared
+            between every caller with the same fingerprint, so they should be
+            immutable.
+        """
+        self._cache = LRUCache(maxsize=maxsize)
+        self._analyze = analyze
+
+    def get(self, policy):
+        """
+        :param policy: policy dict
+        :return: the analysis result for the policy's fingerprint
+        """
+        key = fingerprint(policy)
+        results = self._cache.get(key)
+        if results is None:
+            # Wrapped in a tuple so that a None result is cached too.
+            results = (self._analyze(policy),)
+            self._cache.put(key, results)
+        return results[0]
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        """:return: CacheStats(hits, misses, evictions, size, maxsize)"""
+        return self._cache.stats()
+
+    def hit_rate(self):
+        """:return: fraction of get() calls answered from the cache"""
+        stats = self.stats()
+        lookups = stats.hits + stats.misses
+        return float(stats.hits) / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._cache)
@@ -10,7 +10,20 @@ def intersect(pattern1, pattern2, start1=0, start2=0):
     :type start1: int
     :type start2: int
     :returns: A Match object with the matching wildcard values from pattern1 if the patterns intersect; otherwise, None.
+
+    Results for each pair of start indexes are memoized, so the worst case is
+    polynomial in the pattern lengths rather than exponential in the number of
+    Kleene stars.
     """
+    return _intersect(pattern1, pattern2, start1, start2, {})
+
+def _intersect(pattern1, pattern2, start1, start2, memo):
+    key = (start1, start2)
+    if key not in memo:
+        memo[key] = _intersect_from(pattern1, pattern2, start1, start2, memo)
+    return memo[key]
+
+def _intersect_from(pattern1, pattern2, start1, start2, memo):
     idx1, len1 = start1, len(pattern1)
     idx2, len2 = start2, len(pattern2)
 
@@ -33,7 +46,7 @@ def intersect(pattern1, pattern2, start1=0, start2=0):
 
             idx2_kleene_start = idx2
             while idx2 < len2:
-                match = intersect(pattern1, pattern2, idx1 + 1, idx2)
+                match = _intersect(pattern1, pattern2, idx1 + 1, idx2, memo)
                 if match:
                     idx2_kleene_end = idx2 + 1 if pattern2[idx2] == '*' else idx2
                     matched_groups.append(("*", pattern2[idx2_kleene_start:idx2_kleene_end]))
@@ -51,7 +64,7 @@ def intersect(pattern1, pattern2, start1=0, start2=0):
                 return Match(matched_groups)
                             
             while idx1 < len1:
-                match = intersect(pattern1, pattern2, idx1, idx2 + 1)
+                match = _intersect(pattern1, pattern2, idx1, idx2 + 1, memo)
                 if match:
                     # If we matched on a double Kleene star, add the star back to the results.
                     if pattern1[idx1] == '*' and pattern2[idx2] == '*' and len(match.grouplist) > 0:
@@ -0,0 +1,110 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.parallel
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+Runs the policyuniverse.stream audit across worker processes.
+
+Records are sent to the workers in chunks, and each worker loads the permission
+universe once when it starts. Workers send back compact results (see
+stream.compact_result()), and results are yielded in input order. Only a few
+chunks per worker are in flight at a time, so memory stays bounded for any
+size of input:
+
+    from policyuniverse.stream import read_paths
+
+    for result in audit_parallel(read_paths(["policies/"]), workers=8):
+        ...
+
+Worker processes need concurrent.futures with pool initializers (Python 3.7+).
+On older versions records are audited in the calling process.
+"""
+import collections
+import itertools
+import multiprocessing
+import sys
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:  # Python 2.7 without the futures backport
+    ProcessPoolExecutor = None
+
+from policyuniverse import logger
+from policyuniverse.stream import PolicyResult
+from policyuniverse.stream import audit
+from policyuniverse.stream import compact_result
+from policyuniverse.universe import get_universe
+
+# Chunks submitted per worker before waiting on the oldest one.
+_CHUNKS_IN_FLIGHT = 2
+
+# ProcessPoolExecutor takes an initializer since Python 3.7.
+_HAS_POOL_INITIALIZER = ProcessPoolExecutor is not None and sys.version_info >= (3, 7)
+
+
+def audit_parallel(records, workers=None, chunksize=64):
+    """
+    :param records: iterable of (source, document) pairs, see stream.audit()
+    :param workers: number of worker processes. Defaults to the CPU count.
+        With 1, or before Python 3.7, records are audited in this process.
+    :param chunksize: records sent to a worker per task
+    :return: generator of compact PolicyResult, in input order
+    """
+    if not _HAS_POOL_INITIALIZER:
+        if workers and workers > 1:
+            logger.warning(
+                "Worker processes need Python 3.7+, auditing in this process instead."
+            )
+        workers = 1
+    workers = workers or multiprocessing.cpu_count()
+    chunks = _chunks(records, chunksize)
+
+    if workers == 1:
+        for chunk in chunks:
+            for result in _audit_chunk(chunk):
+                yield PolicyResult._make(result)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_audit_chunk, chunk))
+            if len(pending) >= workers * _CHUNKS_IN_FLIGHT:
+                for result in pending.popleft().result():
+                    yield PolicyResult._make(result)
+        while pending:
+            for result in pending.popleft().result():
+                yield PolicyResult._make(result)
+
+
+def _chunks(records, chunksize):
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker():
+    # Forked workers inherit a loaded universe, spawned ones load it here.
+    universe = get_universe()
+    universe.action_index
+
+
+def _audit_chunk(records):
+    return [tuple(compact_result(result)) for result in audit(records)]
@@ -1,6 +1,7 @@
 import re
 from policyuniverse.glob import intersect as glob_intersect
 from policyuniverse.glob import Match
+from policyuniverse.cache import LRUCache
 
 _VARIABLE_NAME_MATCH = re.compile("^[A-Za-z][A-Za-z0-9]*$").match
 
@@ -114,33 +115,184 @@ def pattern_to_glob(pattern, variables_as_wildcards=True):
     return (glob, groups)    
 
 def match_arn_pattern(arn_pattern, resource):
-    if resource == "*":
-        resource = "arn:*:*:*:*:*"
+    return compile_arn_pattern(arn_pattern).match(resource)
 
-    if not arn_pattern.startswith("arn:"):
-        raise ValueError("ARN pattern does not begin with 'arn:'.")
+def compile_arn_pattern(arn_pattern):
+    """
+    Returns the CompiledArnPattern for an ARN pattern, reusing a cached one when possible.
+    The cache is large enough to hold every arn_format in data.json.
+    :param arn_pattern: The ARN pattern to compile.
+    :type arn_pattern: str
+    :rtype: CompiledArnPattern
+    """
+    compiled = _compiled_arn_patterns.get(arn_pattern)
+    if compiled is None:
+        compiled = CompiledArnPattern(arn_pattern)
+        _compiled_arn_patterns.put(arn_pattern, compiled)
+    return compiled
 
-    if not resource.startswith("arn:"):
-        raise ValueError("Resource does not begin with 'arn:'.")
+class CompiledArnPattern(object):
+    """
+    An ARN pattern split into segments and translated into glob patterns once,
+    so it can be matched against many resources.
+    """
+    def __init__(self, arn_pattern):
+        if not arn_pattern.startswith("arn:"):
+            raise ValueError("ARN pattern does not begin with 'arn:'.")
 
-    arn_segments = arn_pattern.split(":", 5)
-    if len(arn_segments) != 6:
-        raise ValueError("Incorrect number of segments in ARN pattern.")
+        arn_segments = arn_pattern.split(":", 5)
+        if len(arn_segments) != 6:
+            raise ValueError("Incorrect number of segments in ARN pattern.")
 
-    resource_segments = resource.split(":", 5)
-    if len(resource_segments) != 6:
-        raise ValueError("Incorrect number of segments in resource.")
-
-    matches = []
-    for arn_segment, resource_segment in zip(arn_segments[1:], resource_segments[1:]):
-        arn_glob, group_names = pattern_to_glob(arn_segment, True)
-        resource_glob = pattern_to_glob(resource_segment, False)[0]
-        match = glob_intersect(arn_glob, resource_glob)
-        if match:
-            matches.extend(list(zip(group_names, match.groups)))
-        else:
-            return None
-    return Match(matches)
+        self.arn_pattern = arn_pattern
+        self.segments = []
+        self.group_names = []
+        # Message of the first segment that is not a valid pattern, if any.
+        self.error = None
+        for arn_segment in arn_segments[1:]:
+            try:
+                arn_glob, group_names = pattern_to_glob(arn_segment, True)
+            except ValueError as e:
+                # Raised by match() once the segment is reached, so resources that
+                # differ in an earlier segment still give None.
+                self.segments.append((str(e), [], _INVALID))
+                self.error = self.error or str(e)
+                continue
+            self.segments.append((arn_glob, group_names, _glob_kind(arn_glob)))
+            self.group_names.extend(group_names)
+        self.literal_regex = None
+        if self.error is None:
+            self.literal_regex = _compile_literal_regex([segment[0] for segment in self.segments])
+
+    def match(self, resource):
+        """
+        Matches a resource against the ARN pattern.
+        :param resource: The resource ARN, which may contain wildcards, or "*".
+        :type resource: str
+        :returns: A Match object with the values matched by each variable and wildcard in the pattern; otherwise, None.
+        """
+        if resource == "*":
+            resource = "arn:*:*:*:*:*"
+
+        if not resource.startswith("arn:"):
+            raise ValueError("Resource does not begin with 'arn:'.")
+
+        resource_segments = resource.split(":", 5)
+        if len(resource_segments) != 6:
+            raise ValueError("Incorrect number of segments in resource.")
+
+        if self.literal_regex is not None and _is_literal(resource):
+            literal_match = self.literal_regex.match(resource)
+            if not literal_match:
+                return None
+            return Match(list(zip(self.group_names, literal_match.groups())))
+
+        matches = []
+        for (arn_glob, group_names, kind), resource_segment in zip(self.segments, resource_segments[1:]):
+            if kind == _INVALID:
+                raise ValueError(arn_glob)
+            if _is_literal(resource_segment):
+                resource_glob = resource_segment
+                if kind == _LITERAL:
+                    # Two literals intersect only when they are equal.
+                    if arn_glob != resource_glob:
+                        return None
+                    continue
+                if kind == _PREFIX_WILDCARD:
+                    # A literal prefix followed by a wildcard matches the rest of a literal.
+                    if not resource_glob.startswith(arn_glob[:-1]):
+                        return None
+                    matches.append((group_names[0], resource_glob[len(arn_glob) - 1:]))
+                    continue
+            else:
+                resource_glob = pattern_to_glob(resource_segment, False)[0]
+
+            if kind == _WILDCARD:
+                # A lone wildcard matches the whole segment, with leading wildcards
+                # collapsed into one like glob.intersect does.
+                matches.append((group_names[0], _LEADING_WILDCARDS_SUB("*", resource_glob)))
+                continue
+
+            match = glob_intersect(arn_glob, resource_glob)
+            if match:
+                matches.extend(list(zip(group_names, match.groups)))
+            else:
+                return None
+        return Match(matches)
+
+    def match_many(self, resources):
+        """
+        Matches each resource against the ARN pattern.
+        :param resources: An iterable of resource ARNs.
+        :returns: A list with a Match object or None for each resource.
+        """
+        return [self.match(resource) for resource in resources]
+
+_LITERAL, _WILDCARD, _PREFIX_WILDCARD, _GLOB, _INVALID = range(5)
+
+_NON_LITERAL_SEARCH = re.compile(r"[*?$\\]").search
+
+_LEADING_WILDCARDS_SUB = re.compile(r"^\*+").sub
+
+def _is_literal(segment):
+    return not _NON_LITERAL_SEARCH(segment)
+
+def literal_prefix(pattern):
+    """
+    Returns the start of an ARN pattern up to its first wildcard, variable or escape.
+    Every resource the pattern matches starts with it.
+    :param pattern: The ARN pattern, or a segment of one.
+    :type pattern: str
+    :rtype: str
+    """
+    match = _NON_LITERAL_SEARCH(pattern)
+    if match is None:
+        return pattern
+    return pattern[:match.start()]
+
+def _glob_kind(glob):
+    if _is_literal(glob):
+        return _LITERAL
+    if glob == "*":
+        return _WILDCARD
+    if glob.endswith("*") and _is_literal(glob[:-1]):
+        return _PREFIX_WILDCARD
+    return _GLOB
+
+def _compile_literal_regex(arn_globs):
+    """
+    Compiles the glob of each ARN segment into one regular expression that gives the
+    same result as intersecting the globs with a resource that has no wildcards.
+    Wildcards are lazy, like the shortest-first search in glob.intersect.
+    Returns None if the globs cannot be compiled, e.g. on a trailing backslash.
+    """
+    exp = ""
+    for idx, arn_glob in enumerate(arn_globs):
+        wildcard_exp = "[^:]" if idx < 4 else "."
+        i, n = 0, len(arn_glob)
+        while i < n:
+            c = arn_glob[i]
+            i = i + 1
+            if c == "*":
+                exp += "(" + wildcard_exp + "*?)"
+            elif c == "?":
+                exp += "(" + wildcard_exp + ")"
+            elif c == "\\":
+                if i >= n:
+                    return None
+                c = arn_glob[i]
+                i = i + 1
+                # An escaped wildcard only intersects with a wildcard, never with a literal.
+                exp += "(?!)" if c == "*" or c == "?" else re.escape(c)
+            else:
+                exp += re.escape(c)
+        exp += ":" if idx < 4 else "\\Z"
+    try:
+        return re.compile("arn:" + exp, re.DOTALL)
+    except re.error:
+        return None
+
+_compiled_arn_patterns = LRUCache(maxsize=1024)
 
 def iterate_pattern(pattern):    
     """
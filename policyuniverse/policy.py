@@ -19,14 +19,65 @@
 .. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
 
 """
+from policyuniverse.action_set import ActionSet
 from policyuniverse.statement import Statement
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+
+def _statement_principals(statement):
+    return statement.principals
+
+
+def _statement_condition_entries(statement):
+    return statement.condition_entries
+
+
+def _statement_action_summary(statement):
+    return [
+        (service, group)
+        for service, groups in statement.action_summary().items()
+        for group in groups
+    ]
+
+
+def _statement_internet_accessible_actions(statement):
+    if statement.is_internet_accessible():
+        return statement.actions
+    return ()
+
+
+def _statement_whos_allowed(statement):
+    if statement.effect == "Allow":
+        return statement.whos_allowed()
+    return ()
 
 
 class Policy(object):
+    """
+    Aggregates over the statements of a policy.
+
+    Each aggregate is counted the first time it is asked for, and the counts are
+    kept up to date by add_statement(), remove_statement() and replace_statement(),
+    which only evaluate the statement that changed.
+    """
+
+    # Aggregate name -> function returning one statement's contribution.
+    _aggregate_functions = dict(
+        principals=_statement_principals,
+        condition_entries=_statement_condition_entries,
+        action_summary=_statement_action_summary,
+        internet_accessible_actions=_statement_internet_accessible_actions,
+        whos_allowed=_statement_whos_allowed,
+    )
+    # Counted together in a single pass over the statements. The others are only
+    # counted when asked for, since action_summary expands every statement's
+    # actions and internet_accessible_actions evaluates every condition.
+    _one_pass_aggregates = ("principals", "condition_entries", "whos_allowed")
+
     def __init__(self, policy):
         self.policy = policy
         self.statements = []
+        self._aggregates = dict()
 
         statement_structure = self.policy.get("Statement", [])
         if not isinstance(statement_structure, list):
@@ -35,43 +86,137 @@ class Policy(object):
         for statement in statement_structure:
             self.statements.append(Statement(statement))
 
+    def add_statement(self, statement):
+        """
+        Appends a statement dict (or Statement) to the policy.
+        Returns the added Statement.
+        """
+        statement = _as_statement(statement)
+        self.statements.append(statement)
+        self._count(statement, 1)
+        self._update_policy()
+        return statement
+
+    def remove_statement(self, index):
+        """
+        Removes the statement at index. Returns the removed Statement.
+        """
+        statement = self.statements.pop(index)
+        self._count(statement, -1)
+        self._update_policy()
+        return statement
+
+    def replace_statement(self, index, statement):
+        """
+        Replaces the statement at index with a statement dict (or Statement).
+        Returns the new Statement.
+        """
+        statement = _as_statement(statement)
+        self._count(self.statements[index], -1)
+        self.statements[index] = statement
+        self._count(statement, 1)
+        self._update_policy()
+        return statement
+
+    def _update_policy(self):
+        # A new dict, so the document passed to __init__ is never modified.
+        statements = [statement.statement for statement in self.statements]
+        self.policy = dict(self.policy)
+        self.policy["Statement"] = statements
+
+    def _aggregate(self, name):
+        counts = self._aggregates.get(name)
+        if counts is None:
+            if name in self._one_pass_aggregates:
+                names = [
+                    one_pass_name
+                    for one_pass_name in self._one_pass_aggregates
+                    if one_pass_name not in self._aggregates
+                ]
+            else:
+                names = [name]
+            aggregates = dict((new_name, Counter()) for new_name in names)
+            for statement in self.statements:
+                for new_name, new_counts in aggregates.items():
+                    new_counts.update(self._aggregate_functions[new_name](statement))
+            self._aggregates.update(aggregates)
+            counts = aggregates[name]
+        return counts
+
+    def _count(self, statement, sign):
+        for name, counts in self._aggregates.items():
+            for key in self._aggregate_functions[name](statement):
+                counts[key] += sign
+                if not counts[key]:
+                    del counts[key]
+
     @property
     def principals(self):
-        principals = set()
-        for statement in self.statements:
-            principals = principals.union(statement.principals)
-        return principals
+        return set(self._aggregate("principals"))
 
     @property
     def condition_entries(self):
-        condition_entries = set()
-        for statement in self.statements:
-            condition_entries = condition_entries.union(statement.condition_entries)
-        return condition_entries
+        return set(self._aggregate("condition_entries"))
 
     def action_summary(self):
         action_categories = defaultdict(set)
-        for statement in self.statements:
-            for service, groups in statement.action_summary().items():
-                action_categories[service] = action_categories[service].union(groups)
+        for service, group in self._aggregate("action_summary"):
+            action_categories[service].add(group)
         return action_categories
 
     def is_internet_accessible(self):
-        for statement in self.statements:
-            if statement.is_internet_accessible():
-                return True
-        return False
+        # Stops at the first public statement. Statements cache their own result.
+        return any(statement.is_internet_accessible() for statement in self.statements)
 
     def internet_accessible_actions(self):
-        actions = set()
+        return set(self._aggregate("internet_accessible_actions"))
+
+    def internet_accessible_action_set(self):
+        """
+        Unlike internet_accessible_actions(), wildcards are expanded.
+        Returns an ActionSet.
+        """
+        actions = ActionSet()
         for statement in self.statements:
             if statement.is_internet_accessible():
-                actions = actions.union(statement.actions)
+                actions = actions | statement.action_set
         return actions
 
-    def whos_allowed(self):
-        allowed = set()
+    def effective_actions(self):
+        """
+        Actions allowed by the policy after its Deny statements, as an ActionSet.
+
+        A Deny is only subtracted when it applies everywhere the Allows could: no
+        Condition, Resource "*" and, if it has one, a Principal of "*". Denies
+        limited to some resources, principals or conditions leave the actions
+        allowed, so the result never misses an action the policy may grant.
+        NotAction is inverted against the whole universe on both sides.
+        """
+        allowed = []
+        denied = []
         for statement in self.statements:
             if statement.effect == "Allow":
-                allowed = allowed.union(statement.whos_allowed())
-        return allowed
+                allowed.append(statement.action_set)
+            elif statement.effect == "Deny" and _denies_everywhere(statement):
+                denied.append(statement.action_set)
+        return ActionSet().union(*allowed).difference(*denied)
+
+    def whos_allowed(self):
+        return set(self._aggregate("whos_allowed"))
+
+
+def _denies_everywhere(statement):
+    document = statement.statement
+    if document.get("Condition") or "NotResource" in document:
+        return False
+    if statement.uses_not_principal():
+        return False
+    if "Principal" in document and statement.principals != set(["*"]):
+        return False
+    return "*" in statement.resources
+
+
+def _as_statement(statement):
+    if isinstance(statement, Statement):
+        return statement
+    return Statement(statement)
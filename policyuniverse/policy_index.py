@@ -0,0 +1,244 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.policy_index
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+Inverted index from actions to the Allow statements that grant them, across a
+corpus of policies:
+
+    index = PolicyIndex()
+    for name, policy in roles:
+        index.add_policy(name, policy)
+    index.save("roles.sqlite")
+
+    index = PolicyIndex.load("roles.sqlite")
+    index.policies_for(["iam:PassRole", "kms:Decrypt*"])
+
+Deny statements and conditions are not taken into account, so the result is
+every policy that has an Allow for the actions.
+"""
+import array
+import json
+import sqlite3
+
+from policyuniverse.action_set import ActionSet
+from policyuniverse.policy import Policy
+from policyuniverse.universe import get_universe
+
+# Statements granting more actions than this, like "*" or a NotAction, are kept
+# as a bitmask and tested on every query instead of being posted per action.
+# Most of them share a handful of masks, which are tested once per query.
+BROAD_STATEMENT_ACTIONS = 1024
+
+_SCHEMA = [
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE statements (policy_id TEXT NOT NULL, statement_index INTEGER"
+    " NOT NULL)",
+    "CREATE TABLE broad (mask TEXT NOT NULL, statements BLOB NOT NULL)",
+    "CREATE TABLE postings (position INTEGER PRIMARY KEY, statements BLOB NOT NULL)",
+    "CREATE TABLE unknown (action TEXT NOT NULL, statement INTEGER NOT NULL)",
+]
+
+if hasattr(array.array, "tobytes"):
+
+    def _array_to_bytes(numbers):
+        return numbers.tobytes()
+
+    def _array_from_bytes(buf):
+        numbers = array.array("I")
+        numbers.frombytes(bytes(buf))
+        return numbers
+
+else:  # Python 2.7
+
+    def _array_to_bytes(numbers):
+        return numbers.tostring()
+
+    def _array_from_bytes(buf):
+        numbers = array.array("I")
+        numbers.fromstring(bytes(buf))
+        return numbers
+
+
+def _numbers_to_blob(numbers):
+    return sqlite3.Binary(_array_to_bytes(array.array("I", numbers)))
+
+
+class PolicyIndex(object):
+    """
+    Maps each action of the permission universe to the (policy id, statement index)
+    of the Allow statements that grant it.
+
+    Statements are numbered in the order they are added. Each action position
+    (see ActionIndex.position()) has a posting list of statement numbers, so a
+    query for a pattern reads the posting lists of the actions it matches, plus
+    the broad statements. Actions that are not in the universe are looked up by
+    name.
+    """
+
+    def __init__(self, index=None):
+        """
+        :param index: ActionIndex, defaults to the universe's action_index
+        """
+        self.index = index or get_universe().action_index
+        # Statement number -> (policy id, statement index)
+        self._statements = []
+        self._postings = dict()
+        self._unknown = dict()
+        # Mask -> statement numbers of the broad statements
+        self._broad = dict()
+
+    def add_policy(self, policy_id, policy):
+        """
+        :param policy_id: name of the policy, like a role ARN. Must be JSON
+            serializable to save() the index.
+        :param policy: Policy or policy dict
+        """
+        if not isinstance(policy, Policy):
+            policy = Policy(policy)
+        for statement_index, statement in enumerate(policy.statements):
+            if statement.effect != "Allow":
+                continue
+            self._add_statement(policy_id, statement_index, statement.action_set)
+
+    def _add_statement(self, policy_id, statement_index, action_set):
+        if action_set.index is not self.index:
+            raise ValueError("Cannot index ActionSets built from a different index.")
+        number = len(self._statements)
+        self._statements.append((policy_id, statement_index))
+        if action_set.popcount() > BROAD_STATEMENT_ACTIONS:
+            self._broad.setdefault(action_set.mask, []).append(number)
+        else:
+            for start, stop in action_set.runs():
+                for position in range(start, stop):
+                    self._postings.setdefault(position, []).append(number)
+        for action in action_set.unknown:
+            self._unknown.setdefault(action, []).append(number)
+
+    def statements_for(self, patterns):
+        """
+        :param patterns: action pattern or list of them, like "kms:Decrypt*".
+            Case-insensitive.
+        :return: sorted list of (policy id, statement index) of the Allow
+            statements granting any matching action
+        """
+        if not isinstance(patterns, list):
+            patterns = [patterns]
+        query = ActionSet.from_patterns(patterns, self.index)
+
+        numbers = set()
+        postings = self._postings
+        for start, stop in query.runs():
+            for position in range(start, stop):
+                numbers.update(postings.get(position, ()))
+        for mask, broad_numbers in self._broad.items():
+            if mask & query.mask:
+                numbers.update(broad_numbers)
+        for action in query.unknown:
+            numbers.update(self._unknown.get(action, ()))
+
+        return sorted(self._statements[number] for number in numbers)
+
+    def policies_for(self, patterns):
+        """
+        :return: set of policy ids with an Allow statement granting any action
+            matching the patterns, see statements_for()
+        """
+        return set(policy_id for policy_id, _ in self.statements_for(patterns))
+
+    def __len__(self):
+        """Number of indexed statements."""
+        return len(self._statements)
+
+    def save(self, path):
+        """
+        Writes the index to a SQLite file, replacing any index already in it.
+        """
+        connection = sqlite3.connect(path)
+        try:
+            for table in ("meta", "statements", "broad", "postings", "unknown"):
+                connection.execute("DROP TABLE IF EXISTS {}".format(table))
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+            connection.execute(
+                "INSERT INTO meta VALUES ('digest', ?)", (get_universe().digest,)
+            )
+            connection.executemany(
+                "INSERT INTO statements VALUES (?, ?)",
+                (
+                    (json.dumps(policy_id), statement_index)
+                    for policy_id, statement_index in self._statements
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO broad VALUES (?, ?)",
+                (
+                    ("{:x}".format(mask), _numbers_to_blob(numbers))
+                    for mask, numbers in self._broad.items()
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO postings VALUES (?, ?)",
+                (
+                    (position, _numbers_to_blob(numbers))
+                    for position, numbers in self._postings.items()
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO unknown VALUES (?, ?)",
+                (
+                    (action, number)
+                    for action, numbers in self._unknown.items()
+                    for number in numbers
+                ),
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by save(). Raises ValueError if it was built with
+        another data.json, since action positions differ between them.
+        """
+        index = cls()
+        connection = sqlite3.connect(path)
+        try:
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = 'digest'"
+            ).fetchone()
+            if row is None or row[0] != get_universe().digest:
+                raise ValueError(
+                    "{} was built with another data.json, rebuild it.".format(path)
+                )
+
+            rows = connection.execute(
+                "SELECT policy_id, statement_index FROM statements ORDER BY rowid"
+            )
+            for policy_id, statement_index in rows:
+                index._statements.append((json.loads(policy_id), statement_index))
+            for mask, numbers in connection.execute("SELECT * FROM broad"):
+                index._broad[int(mask, 16)] = _array_from_bytes(numbers)
+            for position, numbers in connection.execute("SELECT * FROM postings"):
+                index._postings[position] = _array_from_bytes(numbers)
+            for action, number in connection.execute("SELECT * FROM unknown"):
+                index._unknown.setdefault(action, []).append(number)
+        finally:
+            connection.close()
+        return index
@@ -0,0 +1,130 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.principal_index
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+Index from the principals and condition values that resource policies admit to
+the policies, so that questions like "which buckets can account 012345678910
+touch" are lookups:
+
+    index = PrincipalIndex()
+    for bucket_arn, policy in bucket_policies:
+        index.add_policy(bucket_arn, policy)
+    index.policies_for("account", "012345678910")
+    index.policies_for_ip("203.0.113.7")
+
+Entries come from the whos_allowed() of each Allow statement. Principal ARNs are
+also indexed under their account or, for service principals, under "service".
+Values are looked up as written in the policy, so a wildcard like "0123*" is
+only found by the same wildcard. Statements open to everyone, see
+Statement.is_internet_accessible(), are in public_policies() instead.
+"""
+from collections import defaultdict
+
+from policyuniverse.arn import ARN
+from policyuniverse.condition import parse_cidr, parse_ip
+from policyuniverse.policy import Policy
+
+# whos_allowed() categories whose values are ARNs.
+_ARN_CATEGORIES = ("principal", "arn")
+
+
+class PrincipalIndex(object):
+    """
+    Maps (category, value) to the ids of the policies that admit it. Categories
+    are those of whos_allowed(), like "account", "org-id", "cidr" or "vpc", plus
+    "service" for service principals.
+    """
+
+    def __init__(self):
+        self._policies = defaultdict(set)
+        self._public = set()
+        # (ip version, prefix length) -> network address -> policy ids
+        self._networks = defaultdict(lambda: defaultdict(set))
+
+    def add_policy(self, policy_id, policy):
+        """
+        :param policy_id: name of the policy, like the ARN of the bucket or key
+        :param policy: Policy or policy dict
+        """
+        if not isinstance(policy, Policy):
+            policy = Policy(policy)
+        for statement in policy.statements:
+            if statement.effect != "Allow":
+                continue
+            if statement.is_internet_accessible():
+                self._public.add(policy_id)
+            for key in _index_keys(statement.whos_allowed()):
+                self._policies[key].add(policy_id)
+                if key[0] == "cidr":
+                    network = parse_cidr(key[1])
+                    if network is not None:
+                        version, low, high = network
+                        prefix = (version, (high - low).bit_length())
+                        self._networks[prefix][low].add(policy_id)
+
+    def policies_for(self, category, value):
+        """
+        :param category: "account", "org-id", "service", "principal", "cidr", ...
+        :param value: value as written in the policy, like "o-abcd1234"
+        :return: set of policy ids
+        """
+        return set(self._policies.get((category, value), ()))
+
+    def policies_for_ip(self, address):
+        """
+        :param address: IPv4 or IPv6 address
+        :return: set of policy ids with a CIDR condition containing the address
+        """
+        parsed = parse_ip(address)
+        policies = set()
+        if parsed is None:
+            return policies
+        version, number = parsed
+        for (network_version, host_bits), networks in self._networks.items():
+            if network_version == version:
+                low = number >> host_bits << host_bits
+                policies.update(networks.get(low, ()))
+        return policies
+
+    def public_policies(self):
+        """:return: set of ids of the policies with a statement open to everyone"""
+        return set(self._public)
+
+    def categories(self):
+        """:return: set of the indexed categories"""
+        return set(category for category, _ in self._policies)
+
+
+def _index_keys(whos_allowed):
+    keys = set()
+    arn_values = []
+    for entry in whos_allowed:
+        if entry.value == "*":
+            continue
+        keys.add((entry.category, entry.value))
+        if entry.category in _ARN_CATEGORIES:
+            arn_values.append(entry.value)
+
+    for value, arn in zip(arn_values, ARN.parse_many(arn_values)):
+        if arn.error:
+            continue
+        if arn.service:
+            keys.add(("service", value))
+        elif arn.account_number and "*" not in arn.account_number:
+            keys.add(("account", arn.account_number))
+    return keys
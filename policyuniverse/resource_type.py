@@ -0,0 +1,137 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.resource_type
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+from collections import defaultdict
+
+from policyuniverse import logger
+from policyuniverse.pattern import compile_arn_pattern, literal_prefix
+from policyuniverse.universe import get_universe
+
+
+class ResourceTypeIndex(object):
+    """
+    Maps concrete ARNs back to the service resource types whose arn_format they match.
+
+    Resource types are bucketed by the service segment of their arn_format, then by
+    the literal start of the resource segment (like "role/" or "job/"). Only the
+    resource types in the matching buckets are run through their compiled pattern.
+    """
+
+    def __init__(self, resource_types):
+        """
+        :param resource_types: iterable of ResourceType(prefix, name, arn_format)
+        """
+        buckets = defaultdict(lambda: defaultdict(list))
+        self._any_service = []
+        self.skipped = []
+
+        for resource_type in resource_types:
+            try:
+                compiled = compile_arn_pattern(resource_type.arn_format)
+                if compiled.error is not None:
+                    raise ValueError(compiled.error)
+            except ValueError as e:
+                logger.debug(
+                    "Skipping resource type {} ({}): {}".format(
+                        resource_type.name, resource_type.arn_format, e
+                    )
+                )
+                self.skipped.append(resource_type)
+                continue
+
+            arn_segments = resource_type.arn_format.split(":", 5)
+            service = arn_segments[2]
+            entry = (resource_type, compiled)
+            if literal_prefix(service) != service:
+                self._any_service.append(entry)
+            else:
+                buckets[service][literal_prefix(arn_segments[5])].append(entry)
+
+        # Longest literal prefix first, so the most specific resource types come
+        # first. Prefixes of the same length are ordered alphabetically.
+        self._services = dict(
+            (
+                service,
+                sorted(prefixes.items(), key=lambda item: (-len(item[0]), item[0])),
+            )
+            for service, prefixes in buckets.items()
+        )
+
+    def classify(self, arn):
+        """
+        :param arn: 'arn:aws:iam::012345678910:role/Admin'
+        :return: list of every ResourceType whose arn_format matches the ARN,
+            most specific first. Empty if nothing matches or arn cannot be parsed.
+        """
+        arn_segments = arn.split(":", 5)
+        if len(arn_segments) != 6 or arn_segments[0] != "arn":
+            return []
+
+        resource = arn_segments[5]
+        has_wildcard = "*" in resource or "?" in resource
+        if not has_wildcard and literal_prefix(arn) == arn:
+            # Concrete ARN, skip straight to each pattern's single regex.
+            matching = _matching_literal
+        else:
+            matching = _matching
+
+        resource_types = []
+        try:
+            for prefix, entries in self._services.get(arn_segments[2], ()):
+                if has_wildcard or resource.startswith(prefix):
+                    resource_types.extend(matching(entries, arn))
+            resource_types.extend(matching(self._any_service, arn))
+        except ValueError:
+            # The resource is not a valid pattern, e.g. a "$" not followed by "{".
+            return []
+        return resource_types
+
+    def classify_many(self, arns):
+        """
+        :param arns: iterable of ARNs
+        :return: list with the result of classify() for each ARN
+        """
+        return [self.classify(arn) for arn in arns]
+
+
+def _matching(entries, arn):
+    return [resource_type for resource_type, compiled in entries if compiled.match(arn)]
+
+
+def _matching_literal(entries, arn):
+    return [
+        resource_type
+        for resource_type, compiled in entries
+        if _match_literal(compiled, arn)
+    ]
+
+
+def _match_literal(compiled, arn):
+    if compiled.literal_regex is None:
+        return compiled.match(arn)
+    return compiled.literal_regex.match(arn)
+
+
+def resource_types_for_arn(arn):
+    """
+    Classifies an ARN against the resource types in data.json.
+    See ResourceTypeIndex.classify().
+    """
+    return get_universe().resource_type_index.classify(arn)
@@ -0,0 +1,430 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.simulator
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+Local evaluation of (principal, action, resource) queries against identity and
+resource policies:
+
+    simulator = Simulator()
+    simulator.add_identity_policy("arn:aws:iam::012345678910:role/App", policy)
+    simulator.add_resource_policy("arn:aws:s3:::bucket", bucket_policy)
+    simulator.simulate("arn:aws:iam::012345678910:role/App", "s3:GetObject",
+                       "arn:aws:s3:::bucket/key")
+
+Evaluation follows the same-account IAM logic: an explicit Deny in any policy
+wins, otherwise an Allow in an identity policy of the principal or in a resource
+policy allows, otherwise the request is implicitly denied. Permission boundaries,
+SCPs, session policies and the cross-account rules are not modelled.
+
+Conditions and policy variables in resources are evaluated against the request
+context passed to simulate(), plus aws:PrincipalArn and aws:PrincipalAccount
+taken from the principal. Keys missing from the context are absent from the
+request, as IAM evaluates them (see condition.CompiledCondition). A Deny whose
+resource cannot be matched, such as one with a variable missing from the
+context, applies.
+
+Statements are indexed by the service prefix of their actions and the literal
+prefix of their resources, so a query only evaluates the statements that can
+apply to it.
+"""
+import fnmatch
+from collections import defaultdict, namedtuple
+
+from policyuniverse import logger
+from policyuniverse.arn import ARN
+from policyuniverse.cache import LRUCache
+from policyuniverse.condition import _as_list
+from policyuniverse.condition import has_variables
+from policyuniverse.condition import request_context
+from policyuniverse.condition import substitute_variables
+from policyuniverse.pattern import compile_arn_pattern, literal_prefix
+from policyuniverse.statement import Statement
+
+ALLOWED = "allowed"
+EXPLICIT_DENY = "explicitDeny"
+IMPLICIT_DENY = "implicitDeny"
+
+Query = namedtuple("Query", "principal action resource")
+Decision = namedtuple("Decision", "decision policy_id statement_index")
+
+_IMPLICIT_DENY = Decision(IMPLICIT_DENY, None, None)
+_ANY_SERVICE = "*"
+_UNSET = object()
+
+
+class Simulator(object):
+    """
+    Answers access queries against the identity and resource policies added to it.
+    Queries are answered with a Decision(decision, policy_id, statement_index),
+    where decision is ALLOWED, EXPLICIT_DENY or IMPLICIT_DENY and the other fields
+    name the statement that decided it (None for an implicit deny).
+    """
+
+    def __init__(self, cache_size=65536):
+        """
+        :param cache_size: number of (service, resource) pairs whose candidate
+            statements are kept between queries
+        """
+        self._identity_indexes = defaultdict(_StatementIndex)
+        self._resource_index = _StatementIndex()
+        self._candidates = LRUCache(maxsize=cache_size)
+        self._policy_count = 0
+
+    def add_identity_policy(self, principal, policy, policy_id=None):
+        """
+        :param principal: ARN of the user, role or group the policy is attached to
+        :param policy: policy dict
+        :param policy_id: name reported in decisions, defaults to a running number
+        :return: the policy_id
+        """
+        policy_id = self._policy_id(policy_id)
+        index = self._identity_indexes[principal]
+        for statement_index, statement in enumerate(_statements(policy)):
+            index.add(_Rule(statement, policy_id, statement_index))
+        self._candidates.clear()
+        return policy_id
+
+    def add_resource_policy(self, resource, policy, policy_id=None):
+        """
+        :param resource: ARN of the resource the policy is attached to. Statements
+            with a Resource of "*", or none, apply to this resource only.
+        :param policy: policy dict
+        :param policy_id: name reported in decisions, defaults to a running number
+        :return: the policy_id
+        """
+        policy_id = self._policy_id(policy_id)
+        for statement_index, statement in enumerate(_statements(policy)):
+            rule = _Rule(statement, policy_id, statement_index, resource)
+            self._resource_index.add(rule)
+        self._candidates.clear()
+        return policy_id
+
+    def _policy_id(self, policy_id):
+        self._policy_count += 1
+        return self._policy_count - 1 if policy_id is None else policy_id
+
+    def simulate(self, principal, action, resource, context=None):
+        """
+        :param principal: ARN of the calling principal
+        :param action: "prefix:action", case-insensitive
+        :param resource: concrete resource ARN
+        :param context: optional mapping of condition key -> value or list of
+            values, like {"aws:SourceIp": "10.0.0.1"}
+        :return: Decision
+        """
+        action = action.lower()
+        service = action.split(":", 1)[0]
+        query = _QueryContext(principal, context)
+
+        allowed = None
+        identity_index = self._identity_indexes.get(principal)
+        if identity_index is not None:
+            # Identity policies differ per principal, so their candidates are not cached.
+            candidates = identity_index.candidates(service, resource)
+            for rule in candidates:
+                if (
+                    rule.matches_action(action)
+                    and rule.matches_resource_variables(resource, query)
+                    and rule.matches_condition(query)
+                ):
+                    if rule.effect == "Deny":
+                        return rule.decision
+                    allowed = allowed or rule.decision
+
+        for rule in self._resource_candidates(service, resource):
+            if (
+                rule.matches_action(action)
+                and rule.matches_resource_variables(resource, query)
+                and rule.matches_principal(principal, query.account)
+                and rule.matches_condition(query)
+            ):
+                if rule.effect == "Deny":
+                    return rule.decision
+                allowed = allowed or rule.decision
+
+        return allowed or _IMPLICIT_DENY
+
+    def simulate_many(self, queries):
+        """
+        :param queries: iterable of Query or (principal, action, resource) tuples,
+            optionally followed by a request context
+        :return: generator of Decision, in query order
+        """
+        simulate = self.simulate
+        for query in queries:
+            yield simulate(*query)
+
+    def is_allowed(self, principal, action, resource):
+        return self.simulate(principal, action, resource).decision == ALLOWED
+
+    def _resource_candidates(self, service, resource):
+        key = (service, resource)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = self._resource_index.candidates(service, resource)
+            self._candidates.put(key, candidates)
+        return candidates
+
+
+class _StatementIndex(object):
+    """
+    Rules bucketed by the service prefix of their actions, then by the literal
+    prefix of their resource patterns. A lookup tries each distinct prefix length
+    of the service's buckets, so it costs a few dict lookups however many rules
+    there are.
+    """
+
+    def __init__(self):
+        # service -> literal resource prefix -> [(rule, resource pattern)]
+        self._services = defaultdict(lambda: defaultdict(list))
+        # service -> sorted distinct prefix lengths
+        self._prefix_lengths = dict()
+
+    def add(self, rule):
+        for service in rule.services:
+            prefixes = self._services[service]
+            for pattern in rule.resource_patterns:
+                prefix = "" if pattern is None else literal_prefix(pattern)
+                prefixes[prefix].append((rule, pattern))
+            self._prefix_lengths[service] = sorted(set(map(len, prefixes)))
+
+    def candidates(self, service, resource):
+        """
+        :return: list of rules whose resources match the resource, in the order
+            they were added. The action and principal are not checked, nor the
+            resources of rules with policy variables, see
+            _Rule.matches_resource_variables().
+        """
+        matching = []
+        for bucket in (service, _ANY_SERVICE):
+            prefixes = self._services.get(bucket)
+            if prefixes is None:
+                continue
+            for length in self._prefix_lengths[bucket]:
+                if length > len(resource):
+                    break
+                for rule, pattern in prefixes.get(resource[:length], ()):
+                    if rule.resource_variables or rule.matches_resource(
+                        pattern, resource
+                    ):
+                        matching.append(rule)
+        return matching
+
+
+class _Rule(object):
+    """One statement, prepared for matching."""
+
+    __slots__ = (
+        "effect",
+        "decision",
+        "services",
+        "action_set",
+        "action_patterns",
+        "not_action",
+        "resource_patterns",
+        "excluded_resources",
+        "resource_variables",
+        "principals",
+        "condition",
+    )
+
+    def __init__(self, statement, policy_id, statement_index, attached_to=None):
+        """
+        :param statement: statement dict
+        :param attached_to: resource ARN of a resource policy, None for identity
+            policies
+        """
+        document = statement
+        statement = Statement(document)
+        self.effect = statement.effect
+        self.decision = Decision(
+            EXPLICIT_DENY if self.effect == "Deny" else ALLOWED,
+            policy_id,
+            statement_index,
+        )
+
+        self.not_action = "NotAction" in document
+        self.action_patterns = [
+            pattern.lower()
+            for pattern in _as_list(
+                document.get("NotAction", document.get("Action", []))
+            )
+        ]
+        self.action_set = statement.action_set
+        self.services = _services(self.action_patterns, self.not_action)
+
+        patterns = _as_list(document.get("NotResource", document.get("Resource", [])))
+        if attached_to is not None:
+            patterns = [attached_to if p == "*" else p for p in patterns]
+            patterns = patterns or [attached_to]
+        if "NotResource" in document:
+            # Indexed under the empty prefix, and matched against the exclusions.
+            self.resource_patterns = [None]
+            self.excluded_resources = patterns
+        else:
+            self.resource_patterns = patterns
+            self.excluded_resources = None
+        # Patterns with variables, like "arn:aws:s3:::bucket/${aws:username}/*",
+        # are indexed under the literal text before the first variable and
+        # matched once the query's context is known.
+        self.resource_variables = any(map(has_variables, patterns))
+
+        self.principals = None
+        if attached_to is not None:
+            self.principals = _PrincipalMatcher(document)
+
+        self.condition = None
+        if document.get("Condition"):
+            self.condition = statement.compiled_condition
+
+    def matches_action(self, action):
+        position = self.action_set.index.position(action)
+        if position is not None:
+            return bool(self.action_set.mask >> position & 1)
+        # Actions missing from data.json are matched against the patterns.
+        matched = any(
+            fnmatch.fnmatchcase(action, pattern) for pattern in self.action_patterns
+        )
+        return matched != self.not_action
+
+    def matches_resource(self, pattern, resource, context=None):
+        """
+        :param context: request context to substitute the pattern's variables from
+        :return: True if the pattern, or None for the NotResource, matches. A Deny
+            whose pattern cannot be matched, like one with an unknown variable,
+            applies, and an Allow does not.
+        """
+        if pattern is None:
+            excluded = [
+                _match_resource(excluded, resource, context)
+                for excluded in self.excluded_resources
+            ]
+            if any(excluded):
+                return False
+            return None not in excluded or self.effect == "Deny"
+        matched = _match_resource(pattern, resource, context)
+        if matched is None:
+            return self.effect == "Deny"
+        return matched
+
+    def matches_resource_variables(self, resource, query):
+        if not self.resource_variables:
+            return True
+        return any(
+            self.matches_resource(pattern, resource, query.context)
+            for pattern in self.resource_patterns
+        )
+
+    def matches_principal(self, principal, account):
+        return self.principals.matches(principal, account)
+
+    def matches_condition(self, query):
+        return self.condition is None or self.condition.evaluate(query.context)
+
+
+class _QueryContext(object):
+    """The principal's account and request context of a query, built on first use."""
+
+    def __init__(self, principal, context):
+        self._principal = principal
+        self._context = context
+        self._account = _UNSET
+        self._request_context = None
+
+    @property
+    def account(self):
+        if self._account is _UNSET:
+            self._account = ARN.parse_many([self._principal])[0].account_number
+        return self._account
+
+    @property
+    def context(self):
+        if self._request_context is None:
+            context = request_context(self._context or {})
+            context.setdefault("aws:principalarn", self._principal)
+            if self.account is not None:
+                context.setdefault("aws:principalaccount", self.account)
+            self._request_context = context
+        return self._request_context
+
+
+class _PrincipalMatcher(object):
+    """The Principal or NotPrincipal of a resource policy statement."""
+
+    __slots__ = ("everyone", "names", "accounts", "negate")
+
+    def __init__(self, document):
+        self.negate = "NotPrincipal" in document
+        principal = document.get("NotPrincipal", document.get("Principal"))
+        values = []
+        if isinstance(principal, dict):
+            for principal_values in principal.values():
+                values.extend(_as_list(principal_values))
+        elif principal is not None:
+            values.extend(_as_list(principal))
+
+        self.everyone = "*" in values
+        self.names = frozenset(values)
+        self.accounts = frozenset(
+            arn.account_number
+            for arn in ARN.parse_many(value for value in values if value != "*")
+            if arn.root or (arn.account_number and not arn.tech)
+        )
+
+    def matches(self, principal, account):
+        matched = self.everyone or principal in self.names or account in self.accounts
+        return matched != self.negate
+
+
+def _statements(policy):
+    statements = policy.get("Statement", [])
+    if not isinstance(statements, list):
+        statements = [statements]
+    return statements
+
+
+def _services(action_patterns, not_action):
+    services = set()
+    for pattern in action_patterns:
+        service = pattern.split(":", 1)[0]
+        if not_action or literal_prefix(service) != service:
+            return [_ANY_SERVICE]
+        services.add(service)
+    return sorted(services)
+
+
+
+def _match_resource(pattern, resource, context=None):
+    """
+    :return: True or False, or None if the pattern cannot be matched
+    """
+    if pattern == "*":
+        return True
+    if pattern == resource:
+        return True
+    if context is not None and has_variables(pattern):
+        substituted = substitute_variables(pattern, context, escape=True)
+        if substituted is None:
+            logger.debug("Missing a variable of {} in the context".format(pattern))
+            return None
+        pattern = substituted
+    try:
+        return bool(compile_arn_pattern(pattern).match(resource))
+    except ValueError as e:
+        logger.debug("Cannot match {} against {}: {}".format(resource, pattern, e))
+        return None
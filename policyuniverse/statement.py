@@ -19,6 +19,7 @@
 .. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
 
 """
+from policyuniverse.action_set import ActionSet
 from policyuniverse.arn import ARN
 from policyuniverse.expander_minimizer import (
     _expand_wildcard_action,
@@ -26,14 +27,37 @@ from policyuniverse.expander_minimizer import (
 )
 from policyuniverse import logger
 from policyuniverse.action_categories import categories_for_actions
+from policyuniverse.condition import CompiledCondition
+from policyuniverse.condition import condition_operators
 
-import re
 from collections import namedtuple
 
 
 PrincipalTuple = namedtuple("Principal", "category value")
 ConditionTuple = namedtuple("Condition", "category value")
 
+# Condition keys whose values _condition_entries() extracts, by category.
+_CONDITION_KEY_CATEGORIES = {
+    "aws:sourcearn": "arn",
+    "aws:sourceowner": "account",
+    "aws:sourceaccount": "account",
+    "aws:principalorgid": "org-id",
+    "kms:calleraccount": "account",
+    "aws:userid": "userid",
+    "aws:sourceip": "cidr",
+    "aws:sourcevpc": "vpc",
+    "aws:sourcevpce": "vpce",
+}
+
+# Operators whose values limit who is allowed. Negated operators, like
+# StringNotEquals, admit everyone except the listed values, so their values do
+# not say who is allowed.
+_ENTRY_CONDITION_OPERATORS = frozenset(
+    operator.name
+    for operator in condition_operators.values()
+    if operator.family in ("Arn", "String", "IpAddress") and not operator.negated
+)
+
 
 class Statement(object):
     def __init__(self, statement):
@@ -41,6 +65,11 @@ class Statement(object):
         self.condition_entries = self._condition_entries()
         self.principals = self._principals()
         self.actions = self._actions()
+        # Expanded on first use, then reused by action_summary() and friends.
+        self._actions_expanded = None
+        self._action_set = None
+        self._internet_accessible = None
+        self._compiled_condition = None
 
     @property
     def effect(self):
@@ -48,7 +77,31 @@ class Statement(object):
 
     @property
     def actions_expanded(self):
-        return set(get_actions_from_statement(self.statement))
+        """Returns a new set, so callers may modify it."""
+        return set(self._get_actions_expanded())
+
+    def _get_actions_expanded(self):
+        if self._actions_expanded is None:
+            self._actions_expanded = frozenset(
+                get_actions_from_statement(self.statement)
+            )
+        return self._actions_expanded
+
+    @property
+    def action_set(self):
+        """Same actions as actions_expanded, as an ActionSet."""
+        if self._action_set is None:
+            self._action_set = ActionSet.from_statement(self.statement)
+        return self._action_set
+
+    @property
+    def compiled_condition(self):
+        """The Condition block as a CompiledCondition, compiled on first use."""
+        if self._compiled_condition is None:
+            self._compiled_condition = CompiledCondition(
+                self.statement.get("Condition")
+            )
+        return self._compiled_condition
 
     def _actions(self):
         actions = self.statement.get("Action")
@@ -59,7 +112,11 @@ class Statement(object):
         return set(actions)
 
     def action_summary(self):
-        return categories_for_actions(self.actions_expanded)
+        # Wildcards and NotAction can expand to thousands of actions, which the
+        # ActionSet summarizes a service at a time instead of an action at a time.
+        if "NotAction" in self.statement or any("*" in a for a in self.actions):
+            return categories_for_actions(self.action_set)
+        return categories_for_actions(self._get_actions_expanded())
 
     def uses_not_principal(self):
         return "NotPrincipal" in self.statement
@@ -98,7 +155,7 @@ class Statement(object):
         for principal in self.principals:
             principal = PrincipalTuple(category="principal", value=principal)
             who.add(principal)
-        who = who.union(self.condition_entries)
+        who.update(self.condition_entries)
         return who
 
     def _principals(self):
@@ -167,60 +224,26 @@ class Statement(object):
         if not condition:
             return conditions
 
-        key_mapping = {
-            "aws:sourcearn": "arn",
-            "aws:sourceowner": "account",
-            "aws:sourceaccount": "account",
-            "aws:principalorgid": "org-id",
-            "kms:calleraccount": "account",
-            "aws:userid": "userid",
-            "aws:sourceip": "cidr",
-            "aws:sourcevpc": "vpc",
-            "aws:sourcevpce": "vpce",
-        }
-
-        relevant_condition_operators = [
-            re.compile(
-                "((ForAllValues|ForAnyValue):)?ARN(Equals|Like)(IfExists)?",
-                re.IGNORECASE,
-            ),
-            re.compile(
-                "((ForAllValues|ForAnyValue):)?String(Equals|Like)(IgnoreCase)?(IfExists)?",
-                re.IGNORECASE,
-            ),
-            re.compile(
-                "((ForAllValues|ForAnyValue):)?IpAddress(IfExists)?", re.IGNORECASE
-            ),
-        ]
-
-        for condition_operator in condition.keys():
-            if any(
-                regex.match(condition_operator)
-                for regex in relevant_condition_operators
-            ):
-                for key, value in condition[condition_operator].items():
-
-                    # ForAllValues and ForAnyValue must be paired with a list.
-                    # Otherwise, skip over entries.
-                    if not isinstance(
-                        value, list
-                    ) and condition_operator.lower().startswith("for"):
-                        continue
-
-                    if key.lower() in key_mapping:
-                        if isinstance(value, list):
-                            for v in value:
-                                conditions.append(
-                                    ConditionTuple(
-                                        value=v, category=key_mapping[key.lower()]
-                                    )
-                                )
-                        else:
-                            conditions.append(
-                                ConditionTuple(
-                                    value=value, category=key_mapping[key.lower()]
-                                )
-                            )
+        for condition_operator, condition_block in condition.items():
+            operator = condition_operators.get(condition_operator.lower())
+            if operator is None or operator.name not in _ENTRY_CONDITION_OPERATORS:
+                continue
+
+            for key, value in condition_block.items():
+
+                # ForAllValues and ForAnyValue must be paired with a list.
+                # Otherwise, skip over entries.
+                if not isinstance(value, list) and operator.set_operator:
+                    continue
+
+                category = _CONDITION_KEY_CATEGORIES.get(key.lower())
+                if category is None:
+                    continue
+                if isinstance(value, list):
+                    for v in value:
+                        conditions.append(ConditionTuple(value=v, category=category))
+                else:
+                    conditions.append(ConditionTuple(value=value, category=category))
 
         return conditions
 
@@ -258,6 +281,11 @@ class Statement(object):
         )
 
     def is_internet_accessible(self):
+        if self._internet_accessible is None:
+            self._internet_accessible = self._is_internet_accessible()
+        return self._internet_accessible
+
+    def _is_internet_accessible(self):
         if self.effect != "Allow":
             return False
 
@@ -305,9 +333,7 @@ class Statement(object):
     def _userid_internet_accessible(self, userid):
         # Trailing wildcards are okay for userids:
         # AROAIIIIIIIIIIIIIIIII:*
-        if userid.index("*") == len(userid) - 1:
-            return False
-        return True
+        return "*" in userid[:-1]
 
     def _arn_internet_accessible(self, arn_input):
         if "*" == arn_input:
@@ -0,0 +1,239 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.stream
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+Streaming policy audit.
+
+Records are (source, document) pairs, where the document is a policy dict or its
+JSON text. A document may also be one of the rolepolicies/grouppolicies/
+userpolicies/policy shapes that expand_minimize_over_policies() accepts, in which
+case every inline policy is audited on its own. Everything is a generator, so only
+one document is held in memory at a time:
+
+    for result in audit_json_lines("policies.jsonl"):
+        if result.internet_accessible:
+            print(result.source, result.name)
+
+From the command line, one JSON result per line:
+
+    python -m policyuniverse.stream policies.jsonl policy_dir/ ...
+"""
+from __future__ import print_function
+
+import io
+import json
+import os
+import sys
+from collections import namedtuple
+
+from policyuniverse.expander_minimizer import policy_headers
+from policyuniverse.policy import Policy
+
+PolicyResult = namedtuple(
+    "PolicyResult",
+    "source name internet_accessible whos_allowed action_summary error",
+)
+
+
+def audit_policy(policy, source=None, name=None):
+    """
+    :param policy: policy dict
+    :return: PolicyResult for the policy
+    """
+    policy = Policy(policy)
+    return PolicyResult(
+        source,
+        name,
+        policy.is_internet_accessible(),
+        policy.whos_allowed(),
+        dict(policy.action_summary()),
+        None,
+    )
+
+
+def audit(records, cache=None):
+    """
+    Audits a stream of records lazily.
+
+    :param records: iterable of (source, document) pairs. The document is a policy
+        dict, one of the policy_headers shapes, or the JSON text of either.
+    :param cache: optional fingerprint.PolicyCache or analysis_cache.AnalysisCache.
+        Policies that were seen before are not audited again, and results are
+        compact (see compact_result()).
+    :return: generator of PolicyResult. A document that cannot be parsed or audited
+        yields a single PolicyResult with only source, name and error set, and the
+        stream carries on.
+    """
+    for source, document in records:
+        try:
+            if not isinstance(document, dict):
+                document = json.loads(document)
+            for name, policy in _policies_in_document(document):
+                yield _audit_or_error(policy, source, name, cache)
+        except Exception as e:
+            # One malformed document must not end an audit over a whole dump.
+            yield _error_result(source, None, e)
+
+
+def _policies_in_document(document):
+    for header in policy_headers:
+        if header in document:
+            return list(document[header].items())
+    return [(None, document)]
+
+
+def _audit_or_error(policy, source, name, cache):
+    try:
+        if cache is not None:
+            return cache.get(policy)._replace(source=source, name=name)
+        return audit_policy(policy, source, name)
+    except Exception as e:
+        return _error_result(source, name, e)
+
+
+def _error_result(source, name, error):
+    return PolicyResult(
+        source, name, None, None, None, "{}: {}".format(type(error).__name__, error)
+    )
+
+
+def read_json_lines(json_lines, source=None):
+    """
+    :param json_lines: path or open text file with one JSON document per line.
+    :return: generator of ("source:line number", line) records. Blank lines are skipped.
+    """
+    if not hasattr(json_lines, "read"):
+        with io.open(json_lines, encoding="utf-8") as json_lines_file:
+            for record in read_json_lines(json_lines_file, source or json_lines):
+                yield record
+        return
+
+    source = source or getattr(json_lines, "name", "<stream>")
+    for line_number, line in enumerate(json_lines, 1):
+        if line.strip():
+            yield "{}:{}".format(source, line_number), line
+
+
+def read_tree(root):
+    """
+    Walks a directory tree in sorted order. Each *.json file is one document
+    and each *.jsonl file is read with read_json_lines().
+
+    :param root: directory to walk
+    :return: generator of (source, document text) records
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if filename.endswith(".jsonl"):
+                for record in read_json_lines(path):
+                    yield record
+            elif filename.endswith(".json"):
+                with io.open(path, encoding="utf-8") as json_file:
+                    yield path, json_file.read()
+
+
+def read_paths(paths):
+    """
+    :param paths: iterable of directories, JSON Lines files, and JSON files
+    :return: generator of (source, document text) records
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            records = read_tree(path)
+        elif path.endswith(".json"):
+            with io.open(path, encoding="utf-8") as json_file:
+                records = [(path, json_file.read())]
+        else:
+            records = read_json_lines(path)
+        for record in records:
+            yield record
+
+
+def audit_json_lines(json_lines):
+    """Shortcut for audit(read_json_lines(json_lines))."""
+    return audit(read_json_lines(json_lines))
+
+
+def audit_tree(root):
+    """Shortcut for audit(read_tree(root))."""
+    return audit(read_tree(root))
+
+
+def compact_result(result):
+    """
+    :param result: PolicyResult
+    :return: PolicyResult of plain tuples, cheap to pickle and compare. whos_allowed
+        becomes sorted (category, value) pairs and action_summary sorted
+        (service, categories) pairs.
+    """
+    if result.error is not None:
+        return result
+    # Compact results are compacted again unchanged.
+    whos_allowed = tuple(sorted(tuple(who) for who in result.whos_allowed))
+    action_summary = tuple(
+        sorted(
+            (service, tuple(sorted(categories, key=_category_sort_key)))
+            for service, categories in dict(result.action_summary).items()
+        )
+    )
+    return result._replace(whos_allowed=whos_allowed, action_summary=action_summary)
+
+
+def _category_sort_key(category):
+    # Unknown actions have a None category, sort it last.
+    return (category is None, category or "")
+
+
+def result_to_json(result):
+    """
+    :param result: PolicyResult
+    :return: JSON text with sets turned into sorted lists.
+    """
+    result = compact_result(result)
+    if result.action_summary is not None:
+        result = result._replace(action_summary=dict(result.action_summary))
+    return json.dumps(result._asdict(), sort_keys=True)
+
+
+def main(argv=None):
+    """
+    Audits the given files and directories, or JSON Lines on stdin,
+    and writes one JSON result per line. With --cache PATH, results are kept in
+    an analysis_cache.AnalysisCache file and reused by the next run.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    cache = None
+    if argv[:1] == ["--cache"] and len(argv) > 1:
+        from policyuniverse.analysis_cache import AnalysisCache
+
+        cache = AnalysisCache(argv[1])
+        argv = argv[2:]
+    records = read_paths(argv) if argv else read_json_lines(sys.stdin, "<stdin>")
+    try:
+        for result in audit(records, cache=cache):
+            print(result_to_json(result))
+    finally:
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
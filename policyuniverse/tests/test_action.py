@@ -0,0 +1,74 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_action
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import fnmatch
+import unittest
+
+from policyuniverse import all_permissions
+from policyuniverse.action import ActionIndex
+
+
+class ActionIndexTestCase(unittest.TestCase):
+    def test_expand_matches_fnmatch(self):
+        index = ActionIndex(all_permissions)
+        patterns = [
+            "*",
+            "*:*",
+            "s3:*",
+            "s3:get*",
+            "s3:getobject*",
+            "s3:*object*",
+            "s3:get*acl",
+            "s3:getobjec?",
+            "s3:getobject?cl",
+            "s3:?etobject",
+            "s3*",
+            "s3*:get*",
+            "*:get*",
+            "*:getobject",
+            "ec2:describe*",
+            "ec2:[dr]*instances",
+            "iam:*role*",
+            "iam:",
+            "iam*",
+            "i?m:*",
+            "thistechdoesntexist:*",
+            "s3:thispermissiondoesntexist*",
+            "s3:getobject",
+        ]
+        for pattern in patterns:
+            expected = sorted(
+                permission
+                for permission in all_permissions
+                if fnmatch.fnmatchcase(permission, pattern)
+            )
+            self.assertEqual(sorted(index.expand(pattern)), expected, pattern)
+
+    def test_expand_small_index(self):
+        index = ActionIndex(
+            ["s3:getobject", "s3:getobjectacl", "s3-outposts:getobject"]
+        )
+        self.assertEqual(index.expand("s3:get*"), ["s3:getobject", "s3:getobjectacl"])
+        self.assertEqual(index.expand("s3:*acl"), ["s3:getobjectacl"])
+        self.assertEqual(
+            sorted(index.expand("s3*:getobject")),
+            ["s3-outposts:getobject", "s3:getobject"],
+        )
+        self.assertEqual(index.expand("sqs:*"), [])
@@ -37,6 +37,37 @@ class ActionGroupTestCase(unittest.TestCase):
         self.assertEqual(groups["ec2"], {"Write"})
         self.assertEqual(groups["iam"], {u"Permissions", "List"})
 
+    def test_categories_for_action_sets(self):
+        import random
+        from collections import defaultdict
+        from policyuniverse.action_categories import categories_for_actions
+        from policyuniverse.action_set import ActionSet
+        from policyuniverse.universe import get_universe
+
+        universe = get_universe()
+        permissions = sorted(universe.permissions)
+
+        def expected_categories(actions):
+            groups = defaultdict(set)
+            for action in actions:
+                groups[action.split(":")[0]].add(universe.action_categories.get(action))
+            return groups
+
+        rng = random.Random(0)
+        samples = [permissions, [], ["madeup:action", "s3:getobject"]]
+        for _ in range(20):
+            start = rng.randrange(len(permissions))
+            samples.append(permissions[start : start + rng.randrange(500)])
+            samples.append(rng.sample(permissions, rng.randrange(50)))
+
+        for actions in samples:
+            expected = expected_categories(actions)
+            self.assertEqual(categories_for_actions(actions), expected)
+            self.assertEqual(categories_for_actions(iter(actions)), expected)
+            self.assertEqual(
+                categories_for_actions(ActionSet.from_actions(actions)), expected
+            )
+
     def test_actions_for_category(self):
         from policyuniverse.action_categories import actions_for_category
 
@@ -83,3 +114,31 @@ class ActionGroupTestCase(unittest.TestCase):
                 continue
             self.assertFalse(":get" in action)
             self.assertFalse(":describe" in action)
+
+    def test_actions_for_service_category(self):
+        from policyuniverse.action_categories import actions_for_category
+        from policyuniverse.action_categories import actions_for_service_category
+        from policyuniverse.universe import get_universe
+
+        action_categories = get_universe().action_categories
+        for category in ["Permissions", "List", "Read", "Tagging", "Write"]:
+            expected = set(
+                action
+                for action, action_category in action_categories.items()
+                if action_category == category
+            )
+            self.assertEqual(actions_for_category(category), expected)
+            self.assertEqual(
+                actions_for_service_category("iam", category),
+                set(action for action in expected if action.startswith("iam:")),
+            )
+
+        self.assertIn(
+            "iam:putrolepolicy", actions_for_service_category("iam", "Permissions")
+        )
+        self.assertEqual(actions_for_service_category("iam", "NotACategory"), set())
+        self.assertEqual(actions_for_service_category("madeup", "Read"), set())
+
+        # actions_for_category hands out copies.
+        actions_for_category("Read").clear()
+        self.assertTrue(actions_for_category("Read"))
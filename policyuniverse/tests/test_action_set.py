@@ -0,0 +1,120 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_action_set
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import copy
+import random
+import unittest
+
+from policyuniverse.action import ActionIndex
+from policyuniverse.action_set import ActionSet
+from policyuniverse.expander_minimizer import get_actions_from_statement
+from policyuniverse.policy import Policy
+from policyuniverse.universe import get_universe
+
+STATEMENTS = [
+    {"Action": "s3:GetObject"},
+    {"Action": ["s3:get*", "iam:*role*", "ec2:describeinstances"]},
+    {"Action": ["*"]},
+    {"Action": "made:up", "NotAction": []},
+    {"Action": ["madeup:*", "s3:get*"]},
+    {"NotAction": ["iam:*", "s3:put*"]},
+    {"NotAction": "madeup:*"},
+    {"Action": ["ec2:describe*"], "NotAction": ["ec2:*"]},
+]
+
+
+class ActionSetTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.permissions = sorted(get_universe().permissions)
+
+    def sample(self, rng, count):
+        actions = set(rng.sample(self.permissions, count))
+        if rng.random() < 0.5:
+            actions.add("madeup:action{}".format(rng.randrange(3)))
+        return actions
+
+    def test_set_operations(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            first = self.sample(rng, rng.randrange(200))
+            second = self.sample(rng, rng.randrange(200))
+            first_set = ActionSet.from_actions(first)
+            second_set = ActionSet.from_actions(second)
+            self.assertEqual(first_set.to_set(), first)
+            self.assertEqual(len(first_set), len(first))
+            self.assertEqual((first_set | second_set).to_set(), first | second)
+            self.assertEqual((first_set & second_set).to_set(), first & second)
+            self.assertEqual((first_set - second_set).to_set(), first - second)
+            self.assertEqual(first_set.union(second).to_set(), first | second)
+            self.assertEqual(first_set.isdisjoint(second_set), first.isdisjoint(second))
+            self.assertTrue((first_set & second_set) <= first_set)
+            self.assertEqual(first_set, ActionSet.from_actions(sorted(first)))
+            self.assertEqual(
+                hash(first_set), hash(ActionSet.from_actions(sorted(first)))
+            )
+            self.assertNotEqual(first_set, first)
+
+    def test_iteration_is_sorted(self):
+        actions = ["s3:getobject", "iam:passrole", "ec2:describeinstances"]
+        action_set = ActionSet.from_actions(actions + ["zzz:unknown", "aaa:unknown"])
+        self.assertEqual(
+            list(action_set), sorted(actions) + ["aaa:unknown", "zzz:unknown"]
+        )
+        self.assertEqual(action_set.popcount(), 3)
+        self.assertIn("iam:passrole", action_set)
+        self.assertIn("aaa:unknown", action_set)
+        self.assertNotIn("iam:getrole", action_set)
+        self.assertFalse(ActionSet())
+
+    def test_from_statement(self):
+        for statement in STATEMENTS:
+            expected = get_actions_from_statement(copy.deepcopy(statement))
+            self.assertEqual(ActionSet.from_statement(statement).to_set(), expected)
+
+    def test_mask_runs(self):
+        index = get_universe().action_index
+        for pattern in ["s3:get*", "*", "iam:*role*", "s3:getobject", "nope:*"]:
+            self.assertEqual(
+                ActionSet(index.mask(pattern)).to_set(), set(index.expand(pattern))
+            )
+
+    def test_different_indexes(self):
+        index = ActionIndex(["s3:getobject"])
+        local = ActionSet.from_actions(["s3:getobject"], index)
+        self.assertEqual(local.to_set(), set(["s3:getobject"]))
+        with self.assertRaises(ValueError):
+            local | ActionSet.from_actions(["s3:getobject"])
+
+    def test_statement_and_policy(self):
+        policy = Policy(
+            {
+                "Statement": [
+                    {"Effect": "Allow", "Principal": "*", "NotAction": "s3:*"},
+                    {"Effect": "Allow", "Principal": "*", "Action": "s3:get*"},
+                ]
+            }
+        )
+        statement = policy.statements[0]
+        self.assertEqual(statement.action_set.to_set(), statement.actions_expanded)
+        self.assertEqual(
+            policy.internet_accessible_action_set().to_set(),
+            statement.actions_expanded | policy.statements[1].actions_expanded,
+        )
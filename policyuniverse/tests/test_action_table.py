@@ -0,0 +1,93 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_action_table
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from policyuniverse.action import build_service_actions_from_service_data
+from policyuniverse.action_categories import build_action_categories_from_service_data
+from policyuniverse.action_categories import build_action_categories_from_action_table
+from policyuniverse.action_table import compile_action_table
+from policyuniverse.action_table import read_action_table
+from policyuniverse.action_table import service_data_digest
+from policyuniverse.action_table import write_action_table
+from policyuniverse.universe import load_service_data
+
+
+class ActionTableTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service_data = load_service_data()
+        cls.digest = service_data_digest()
+        cls.table = compile_action_table(cls.service_data, cls.digest)
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_shipped_table_is_current(self):
+        table = read_action_table()
+        self.assertEqual(
+            table.digest,
+            self.digest,
+            "data.idx is stale, run: python -m policyuniverse.action_table",
+        )
+        self.assertEqual(table.actions, self.table.actions)
+        self.assertEqual(bytes(table.categories), bytes(self.table.categories))
+        self.assertEqual(table.resource_types, self.table.resource_types)
+
+    def test_matches_service_data(self):
+        self.assertEqual(
+            set(self.table.actions),
+            build_service_actions_from_service_data(self.service_data),
+        )
+        self.assertEqual(list(self.table.actions), sorted(self.table.actions))
+        self.assertEqual(
+            build_action_categories_from_action_table(self.table),
+            build_action_categories_from_service_data(self.service_data),
+        )
+        self.assertIn(
+            ("s3", "bucket", "arn:${Partition}:s3:::${BucketName}"),
+            self.table.resource_types,
+        )
+
+    def test_round_trip(self):
+        path = os.path.join(self.tmpdir, "data.idx")
+        write_action_table(self.table, path)
+        table = read_action_table(path)
+        self.assertEqual(table.digest, self.table.digest)
+        self.assertEqual(table.actions, self.table.actions)
+        self.assertEqual(table.category_names, self.table.category_names)
+        self.assertEqual(table.resource_types, self.table.resource_types)
+
+    def test_read_invalid(self):
+        path = os.path.join(self.tmpdir, "data.idx")
+        with open(path, "wb") as table_file:
+            table_file.write(b"not an action table at all, not even close to one")
+        self.assertRaises(ValueError, read_action_table, path)
+
+        write_action_table(self.table, path)
+        with open(path, "rb+") as table_file:
+            table_file.truncate(1024)
+        self.assertRaises(ValueError, read_action_table, path)
@@ -0,0 +1,115 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_analysis_cache
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from policyuniverse import analysis_cache
+from policyuniverse.analysis_cache import AnalysisCache
+from policyuniverse.fingerprint import analyze_policy
+from policyuniverse.stream import audit, main
+
+policy = {
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Principal": {"AWS": "arn:aws:iam::012345678910:root"},
+            "Action": ["s3:getobject", "s3:madeup", "iam:passrole"],
+            "Resource": "*",
+            "Condition": {"StringEquals": {"aws:SourceVpc": "vpc-1"}},
+        }
+    ]
+}
+
+
+class FakeUniverse(object):
+    digest = "other data.json"
+
+
+class AnalysisCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "cache.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_results_survive_reopening(self):
+        with AnalysisCache(self.path) as cache:
+            self.assertEqual(cache.get(policy), analyze_policy(policy))
+            self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        with AnalysisCache(self.path) as cache:
+            self.assertEqual(cache.get(policy), analyze_policy(policy))
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+            self.assertEqual(cache.hit_rate(), 1.0)
+            self.assertEqual(len(cache), 1)
+
+    def test_new_service_data(self):
+        with AnalysisCache(self.path) as cache:
+            cache.get(policy)
+
+        get_universe = analysis_cache.get_universe
+        analysis_cache.get_universe = FakeUniverse
+        try:
+            with AnalysisCache(self.path) as cache:
+                cache.get(policy)
+                self.assertEqual((cache.hits, cache.misses), (0, 1))
+                self.assertEqual(len(cache), 2)
+                self.assertEqual(cache.prune(), 1)
+                self.assertEqual(len(cache), 1)
+        finally:
+            analysis_cache.get_universe = get_universe
+
+    def test_audit_with_cache(self):
+        records = [("first", policy), ("second", json.dumps(policy))]
+        with AnalysisCache(":memory:", commit_every=1) as cache:
+            results = list(audit(records, cache=cache))
+            self.assertEqual(cache.hits, 1)
+        self.assertEqual(results[0].source, "first")
+        self.assertEqual(results[1].source, "second")
+        self.assertEqual(results[0]._replace(source="second"), results[1])
+
+    def test_main_with_cache(self):
+        path = os.path.join(self.tmpdir, "policy.json")
+        text = json.dumps(policy)
+        if not isinstance(text, type(u"")):  # Python 2.7
+            text = text.decode("utf-8")
+        with io.open(path, "w", encoding="utf-8") as output:
+            output.write(text)
+
+        outputs = []
+        stdout = sys.stdout
+        try:
+            for _ in range(2):
+                sys.stdout = io.StringIO() if sys.version_info[0] > 2 else io.BytesIO()
+                main(["--cache", self.path, path])
+                outputs.append(sys.stdout.getvalue())
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(json.loads(outputs[0])["source"], path)
+        with AnalysisCache(self.path) as cache:
+            self.assertEqual(len(cache), 1)
@@ -20,7 +20,9 @@
 
 """
 from policyuniverse.arn import ARN
+from policyuniverse.arn import parse_cache
 from policyuniverse import logger
+import re
 import unittest
 
 
@@ -102,3 +104,68 @@ class ARNTestCase(unittest.TestCase):
             arn_obj = ARN(accnt)
 
             self.assertTrue(arn_obj.error)
+
+    def test_split_matches_regex(self):
+        arn_regex = re.compile(
+            r"^arn:([^:]*):([^:]*):([^:]*):(|\*|[\d]{12}|cloudfront|aws):(.+)$"
+        )
+        inputs = [
+            "arn:aws:iam::012345678910:root",
+            "arn:aws:iam::012345678910:role/path:with:colons",
+            "arn:aws:s3:::bucket",
+            "arn:aws:s3:::",
+            "arn:aws:s3:*:*:bucket",
+            "arn:aws:iam::0123456789101:root",
+            "arn:aws:iam::01234567891:root",
+            "arn:aws:iam::cloudfront:user/CloudFront",
+            "arn:aws:iam::aws:policy/ReadOnlyAccess",
+            "arn:aws:iam::awsx:policy/ReadOnlyAccess",
+            "arn:aws:iam::012345678910:root\n",
+            "arn:aws:iam::012345678910:ro\not",
+            "arn:aws:iam::012345678910",
+            "arn:events.amazonaws.com",
+        ]
+        for arn in inputs:
+            arn_obj = ARN(arn)
+            match = arn_regex.search(arn)
+            if match:
+                self.assertEqual(
+                    (
+                        arn_obj.partition,
+                        arn_obj.tech,
+                        arn_obj.region,
+                        arn_obj.account_number,
+                        arn_obj.name,
+                    ),
+                    match.groups(),
+                )
+            else:
+                self.assertIsNone(arn_obj.name)
+
+        self.assertTrue(ARN("arn:events.amazonaws.com").service)
+
+    def test_parse_many(self):
+        inputs = [
+            "arn:aws:iam::012345678910:root",
+            "012345678910",
+            "lambda.amazonaws.com",
+            "arn:aws:iam::012345678910:root",
+            "*",
+        ]
+        arns = ARN.parse_many(inputs)
+        self.assertEqual(len(arns), 5)
+        self.assertTrue(arns[0].root)
+        self.assertEqual(arns[1].account_number, "012345678910")
+        self.assertTrue(arns[2].service)
+        self.assertIs(arns[0], arns[3])
+        self.assertTrue(arns[4].error)
+
+        hits = parse_cache.hits
+        self.assertIs(ARN.parse_many(iter(["*"]))[0], arns[4])
+        self.assertEqual(parse_cache.hits, hits + 1)
+
+    def test_slots(self):
+        arn = ARN("arn:aws:iam::012345678910:root")
+        self.assertFalse(hasattr(arn, "__dict__"))
+        with self.assertRaises(AttributeError):
+            arn.unknown_attribute = True
@@ -0,0 +1,247 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_condition
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import datetime
+import unittest
+
+from policyuniverse.condition import CompiledCondition, request_context
+from policyuniverse.condition import parse_cidr, parse_ip
+from policyuniverse.statement import Statement
+
+
+class ConditionTestCase(unittest.TestCase):
+    def check(self, condition, expected):
+        """
+        :param expected: list of (context, expected result)
+        """
+        compiled = CompiledCondition(condition)
+        for context, result in expected:
+            self.assertEqual(
+                compiled.evaluate(request_context(context)),
+                result,
+                "{} with {}".format(condition, context),
+            )
+
+    def test_strings(self):
+        self.check(
+            {"StringEquals": {"aws:SourceVpc": ["vpc-1", "vpc-2"]}},
+            [
+                ({"aws:sourcevpc": "vpc-2"}, True),
+                ({"AWS:SourceVpc": "VPC-1"}, False),
+                ({"aws:SourceVpc": "vpc-3"}, False),
+                ({}, False),
+            ],
+        )
+        self.check(
+            {"StringEqualsIgnoreCase": {"aws:SourceVpc": "VPC-1"}},
+            [({"aws:SourceVpc": "vpc-1"}, True)],
+        )
+        self.check(
+            {"StringLike": {"s3:prefix": ["home/*", "docs/?.txt"]}},
+            [
+                ({"s3:prefix": "home/a/b"}, True),
+                ({"s3:prefix": "docs/a.txt"}, True),
+                ({"s3:prefix": "docs/ab.txt"}, False),
+                ({"s3:prefix": "other/home/"}, False),
+            ],
+        )
+
+    def test_negated_and_if_exists(self):
+        # A missing key never matches, which meets a negated operator.
+        self.check(
+            {"StringNotEquals": {"aws:PrincipalOrgID": "o-1"}},
+            [
+                ({"aws:PrincipalOrgID": "o-1"}, False),
+                ({"aws:PrincipalOrgID": "o-2"}, True),
+                ({}, True),
+            ],
+        )
+        self.check(
+            {"StringEqualsIfExists": {"ec2:InstanceType": "t2.micro"}},
+            [
+                ({"ec2:InstanceType": "t2.micro"}, True),
+                ({"ec2:InstanceType": "m5.large"}, False),
+                ({}, True),
+            ],
+        )
+        self.check(
+            {"Null": {"aws:TokenIssueTime": "true"}},
+            [({}, True), ({"aws:TokenIssueTime": "2019-01-01"}, False)],
+        )
+        self.check(
+            {"Null": {"aws:TokenIssueTime": "false"}},
+            [({}, False), ({"aws:TokenIssueTime": "2019-01-01"}, True)],
+        )
+
+    def test_numbers_dates_bools(self):
+        self.check(
+            {"NumericLessThanEquals": {"s3:max-keys": "10"}},
+            [
+                ({"s3:max-keys": "10"}, True),
+                ({"s3:max-keys": 11}, False),
+                ({"s3:max-keys": "ten"}, False),
+            ],
+        )
+        self.check(
+            {"DateGreaterThan": {"aws:CurrentTime": "2019-06-30T00:00:00Z"}},
+            [
+                ({"aws:CurrentTime": "2019-07-01T00:00:00Z"}, True),
+                ({"aws:CurrentTime": "2019-06-30T01:00:00+02:00"}, False),
+                ({"aws:CurrentTime": datetime.datetime(2019, 7, 1)}, True),
+                ({"aws:CurrentTime": "1561939200"}, True),
+                ({"aws:CurrentTime": "2019-06-29"}, False),
+            ],
+        )
+        self.check(
+            {"Bool": {"aws:SecureTransport": "false"}},
+            [
+                ({"aws:SecureTransport": False}, True),
+                ({"aws:SecureTransport": "TRUE"}, False),
+            ],
+        )
+
+    def test_ip_addresses(self):
+        self.check(
+            {"IpAddress": {"aws:SourceIp": ["10.0.0.0/8", "2001:db8::/32", "1.2.3.4"]}},
+            [
+                ({"aws:SourceIp": "10.255.0.1"}, True),
+                ({"aws:SourceIp": "11.0.0.1"}, False),
+                ({"aws:SourceIp": "1.2.3.4"}, True),
+                ({"aws:SourceIp": "2001:db8::1"}, True),
+                ({"aws:SourceIp": "2001:db9::1"}, False),
+                ({"aws:SourceIp": "not an address"}, False),
+            ],
+        )
+        self.check(
+            {"NotIpAddress": {"aws:SourceIp": "10.0.0.0/8"}},
+            [
+                ({"aws:SourceIp": "10.0.0.1"}, False),
+                ({"aws:SourceIp": "8.8.8.8"}, True),
+            ],
+        )
+
+    def test_parse_ip_and_cidr(self):
+        self.assertEqual(parse_ip("10.0.0.1"), (4, 0x0A000001))
+        self.assertEqual(parse_ip(" ::1 "), (6, 1))
+        self.assertIsNone(parse_ip("not an address"))
+        self.assertIsNone(parse_ip(None))
+        self.assertEqual(parse_cidr("10.0.0.0/8"), (4, 0x0A000000, 0x0AFFFFFF))
+        self.assertEqual(parse_cidr("1.2.3.4"), (4, 0x01020304, 0x01020304))
+        self.assertEqual(parse_cidr("::/0"), (6, 0, (1 << 128) - 1))
+        self.assertIsNone(parse_cidr("10.0.0.0/33"))
+        self.assertIsNone(parse_cidr("10.0.0.0/x"))
+        self.assertIsNone(parse_cidr(["10.0.0.0/8"]))
+
+    def test_arns(self):
+        self.check(
+            {"ArnLike": {"aws:SourceArn": "arn:aws:sns:*:012345678910:topic-*"}},
+            [
+                ({"aws:SourceArn": "arn:aws:sns:us-east-1:012345678910:topic-a"}, True),
+                (
+                    {"aws:SourceArn": "arn:aws:sns:us-east-1:999999999999:topic-a"},
+                    False,
+                ),
+                (
+                    {"aws:SourceArn": "arn:aws:sns:us-east-1:x:012345678910:topic-a"},
+                    False,
+                ),
+            ],
+        )
+
+    def test_set_operators(self):
+        self.check(
+            {"ForAllValues:StringEquals": {"aws:TagKeys": ["env", "team"]}},
+            [
+                ({"aws:TagKeys": ["env"]}, True),
+                ({"aws:TagKeys": ["env", "owner"]}, False),
+                ({}, True),
+            ],
+        )
+        self.check(
+            {"ForAnyValue:StringLike": {"aws:TagKeys": "team*"}},
+            [
+                ({"aws:TagKeys": ["env", "team-a"]}, True),
+                ({"aws:TagKeys": ["env"]}, False),
+                ({}, False),
+            ],
+        )
+        self.check(
+            {"ForAllValues:StringNotEquals": {"aws:TagKeys": "secret"}},
+            [
+                ({"aws:TagKeys": ["env", "team"]}, True),
+                ({"aws:TagKeys": ["env", "secret"]}, False),
+            ],
+        )
+
+    def test_variables(self):
+        self.check(
+            {"StringLike": {"s3:prefix": "home/${aws:username}/*"}},
+            [
+                ({"s3:prefix": "home/alice/x", "aws:username": "alice"}, True),
+                ({"s3:prefix": "home/bob/x", "aws:username": "alice"}, False),
+                ({"s3:prefix": "home/alice/x"}, False),
+                # The substituted value is literal, even with wildcards in it.
+                ({"s3:prefix": "home/alice/x", "aws:username": "*"}, False),
+            ],
+        )
+        self.check(
+            {"StringEquals": {"aws:PrincipalTag/team": "${aws:ResourceTag/team}"}},
+            [
+                ({"aws:PrincipalTag/team": "a", "aws:ResourceTag/team": "a"}, True),
+                ({"aws:PrincipalTag/team": "a", "aws:ResourceTag/team": "b"}, False),
+            ],
+        )
+
+    def test_every_test_must_pass(self):
+        condition = {
+            "StringEquals": {"aws:SourceVpc": "vpc-1", "aws:PrincipalOrgID": "o-1"},
+            "Bool": {"aws:SecureTransport": "true"},
+        }
+        context = {
+            "aws:SourceVpc": "vpc-1",
+            "aws:PrincipalOrgID": "o-1",
+            "aws:SecureTransport": True,
+        }
+        self.check(condition, [(context, True)])
+        for key in context:
+            partial = dict(context)
+            del partial[key]
+            self.check(condition, [(partial, False)])
+
+    def test_invalid_conditions(self):
+        self.check({}, [({}, True)])
+        self.check({"StringMadeUp": {"a": "b"}}, [({"a": "b"}, False)])
+        self.check({"StringEquals": {"a": {"b": "c"}}}, [({"a": "b"}, False)])
+        self.check({"ArnLike": {"a": "not an arn"}}, [({"a": "not an arn"}, False)])
+
+    def test_statement_compiled_condition(self):
+        statement = Statement(
+            {
+                "Effect": "Allow",
+                "Action": "s3:GetObject",
+                "Condition": {"IpAddress": {"aws:SourceIp": "10.0.0.0/8"}},
+            }
+        )
+        compiled = statement.compiled_condition
+        self.assertIs(statement.compiled_condition, compiled)
+        self.assertTrue(
+            compiled.evaluate(request_context({"aws:SourceIp": "10.1.1.1"}))
+        )
+        self.assertTrue(Statement({"Effect": "Allow"}).compiled_condition.evaluate({}))
@@ -21,6 +21,7 @@
 """
 import unittest
 import copy
+import random
 from policyuniverse.expander_minimizer import expand_policy
 from policyuniverse.expander_minimizer import minimize_policy
 from policyuniverse.expander_minimizer import expand_minimize_over_policies
@@ -30,6 +31,9 @@ from policyuniverse.expander_minimizer import minimize_statement_actions
 from policyuniverse.expander_minimizer import _get_prefixes_for_action
 from policyuniverse.expander_minimizer import _expand_wildcard_action
 from policyuniverse.expander_minimizer import _get_desired_actions_from_statement
+from policyuniverse.expander_minimizer import expand_action
+from policyuniverse.expander_minimizer import expansion_cache
+from policyuniverse import universe
 
 
 WILDCARD_ACTION_1 = "swf:res*"
@@ -136,6 +140,35 @@ AUTOSCALING_PERMISSIONS = sorted(
 )
 
 
+def reference_minimize_statement_actions(statement, minchars=None):
+    """
+    The original set-based minimizer, kept to check the trie-based one against.
+    """
+    desired_actions = _get_desired_actions_from_statement(statement)
+    denied_prefixes = set()
+    for denied_action in all_permissions.difference(desired_actions):
+        denied_prefixes.update(_get_prefixes_for_action(denied_action))
+
+    minimized_actions = set()
+    for action in desired_actions:
+        if action in denied_prefixes:
+            minimized_actions.add(action)
+            continue
+        prefixes = _get_prefixes_for_action(action)
+        for prefix in prefixes:
+            permission = prefix.split(":")[1]
+            if minchars and len(permission) < int(minchars) and permission != "":
+                continue
+            if prefix not in denied_prefixes:
+                if prefix not in desired_actions:
+                    prefix = "{}*".format(prefix)
+                minimized_actions.add(prefix)
+                break
+        else:
+            minimized_actions.add(prefixes[-1])
+    return sorted(minimized_actions)
+
+
 def dc(o):
     """
     Some of the testing methods modify the datastructure you pass into them.
@@ -199,6 +232,36 @@ class TestMethods(unittest.TestCase):
         result = _expand_wildcard_action("ec2:DescribeInstances")
         self.assertEqual(result, ["ec2:describeinstances"])
 
+    def test_expand_action_cache(self):
+        expansion_cache.clear()
+        hits = expansion_cache.hits
+        result = expand_action("AutoScaling:*")
+        self.assertIsInstance(result, frozenset)
+        self.assertEqual(sorted(result), AUTOSCALING_PERMISSIONS)
+        self.assertIn("autoscaling:*", expansion_cache)
+        self.assertIs(expand_action("autoscaling:*"), result)
+        self.assertEqual(expansion_cache.hits, hits + 1)
+
+        universe.reload()
+        self.assertNotIn("autoscaling:*", expansion_cache)
+
+    def test_expand_added_permission(self):
+        from policyuniverse.statement import Statement
+
+        statement = {"Effect": "Allow", "NotAction": "iam:get*", "Resource": "*"}
+        try:
+            self.assertEqual(expand_action("iam:zzz*"), frozenset(["iam:zzz*"]))
+            all_permissions.add("iam:zzznewthing")
+            self.assertEqual(expand_action("iam:zzz*"), frozenset(["iam:zzznewthing"]))
+            actions = get_actions_from_statement(statement)
+            self.assertIn("iam:zzznewthing", actions)
+            self.assertEqual(Statement(statement).action_set.to_set(), actions)
+
+            all_permissions.discard("iam:zzznewthing")
+            self.assertEqual(expand_action("iam:zzz*"), frozenset(["iam:zzz*"]))
+        finally:
+            universe.reload()
+
     def test_get_desired_actions_from_statement(self):
         result = _get_desired_actions_from_statement(
             dc(WILDCARD_POLICY_1["Statement"][0])
@@ -228,3 +291,36 @@ class TestMethods(unittest.TestCase):
     def test_minimize_statement_actions(self):
         statement = dict(Effect="Deny")
         self.assertRaises(Exception, minimize_statement_actions, statement)
+
+    def test_minimize_added_permission(self):
+        statement = {"Effect": "Allow", "Action": ["iam:zzznewthing"]}
+        # Builds the iam trie before the permission is added.
+        minimize_statement_actions({"Effect": "Allow", "Action": ["iam:listroles"]})
+        try:
+            all_permissions.add("iam:zzznewthing")
+            self.assertEqual(minimize_statement_actions(statement), ["iam:z*"])
+        finally:
+            universe.reload()
+
+    def test_minimize_statement_actions_matches_reference(self):
+        rng = random.Random(1234)
+        permissions = sorted(all_permissions)
+        ec2_permissions = [p for p in permissions if p.startswith("ec2:")]
+        action_lists = [
+            ["ec2:*"],
+            ["swf:res*"],
+            ["iam:*role*"],
+            ["s3:getobject", "s3:getobjectacl", "s3:putobject"],
+            ["s3:getobject"],
+            rng.sample(ec2_permissions, len(ec2_permissions) // 2),
+            rng.sample(permissions, 200),
+        ]
+        for actions in action_lists:
+            for minchars in [None, 3]:
+                statement = dict(Effect="Allow", Action=actions, Resource="*")
+                self.assertEqual(
+                    minimize_statement_actions(dc(statement), minchars=minchars),
+                    reference_minimize_statement_actions(
+                        dc(statement), minchars=minchars
+                    ),
+                )
@@ -0,0 +1,117 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_fingerprint
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import copy
+import unittest
+
+from policyuniverse.fingerprint import PolicyCache
+from policyuniverse.fingerprint import analyze_policy
+from policyuniverse.fingerprint import fingerprint
+from policyuniverse.stream import audit
+
+policy = {
+    "Version": "2012-10-17",
+    "Statement": {
+        "Effect": "Allow",
+        "Principal": {"AWS": "arn:aws:iam::012345678910:root"},
+        "Action": "s3:GetObject",
+        "Resource": "arn:aws:s3:::bucket/*",
+        "Condition": {
+            "StringEquals": {"aws:SourceVpc": "vpc-1"},
+            "ForAnyValue:StringLike": {"aws:PrincipalOrgID": "o-1"},
+        },
+    },
+}
+
+# The same policy with different key order, lists, duplicates and action case.
+equivalent_policy = {
+    "Statement": [
+        {
+            "Condition": {
+                "ForAnyValue:StringLike": {"aws:PrincipalOrgID": "o-1"},
+                "StringEquals": {"aws:SourceVpc": ["vpc-1", "vpc-1"]},
+            },
+            "Resource": ["arn:aws:s3:::bucket/*"],
+            "Action": ["S3:getobject", "s3:GETOBJECT"],
+            "Principal": {"AWS": ["arn:aws:iam::012345678910:root"]},
+            "Effect": "Allow",
+        }
+    ],
+    "Version": "2012-10-17",
+}
+
+
+class FingerprintTestCase(unittest.TestCase):
+    def test_equivalent_policies(self):
+        original = copy.deepcopy(policy)
+        self.assertEqual(fingerprint(policy), fingerprint(equivalent_policy))
+        self.assertEqual(analyze_policy(policy), analyze_policy(equivalent_policy))
+        self.assertEqual(policy, original)
+
+    def test_different_policies(self):
+        fingerprints = set([fingerprint(policy)])
+        changes = [
+            ("Effect", "Deny"),
+            ("Action", "s3:PutObject"),
+            ("Resource", "*"),
+            ("Principal", "*"),
+            ("Sid", "Named"),
+            # ForAnyValue with a single value is ignored by the analysis.
+            ("Condition", {"ForAnyValue:StringLike": {"aws:PrincipalOrgID": ["o-1"]}}),
+        ]
+        for key, value in changes:
+            changed = copy.deepcopy(policy)
+            changed["Statement"][key] = value
+            fingerprints.add(fingerprint(changed))
+        self.assertEqual(len(fingerprints), len(changes) + 1)
+
+        two_statements = {"Statement": [{"Action": "a:b"}, {"Action": "c:d"}]}
+        reordered = {"Statement": [{"Action": "c:d"}, {"Action": "a:b"}]}
+        self.assertNotEqual(fingerprint(two_statements), fingerprint(reordered))
+
+    def test_unusual_values(self):
+        odd = {"Statement": [{"Action": [7, {"a": 1}], "Resource": None}], "X": [1]}
+        self.assertEqual(fingerprint(odd), fingerprint(copy.deepcopy(odd)))
+
+    def test_policy_cache(self):
+        calls = []
+
+        def analyze(document):
+            calls.append(document)
+            return len(calls)
+
+        cache = PolicyCache(maxsize=1, analyze=analyze)
+        self.assertEqual(cache.get(policy), 1)
+        self.assertEqual(cache.get(equivalent_policy), 1)
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+        self.assertEqual(cache.get({"Statement": []}), 2)
+        self.assertEqual(cache.get(policy), 3)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions), (1, 3, 2))
+        self.assertEqual(len(cache), 1)
+
+    def test_audit_with_cache(self):
+        cache = PolicyCache()
+        records = [("first", policy), ("second", equivalent_policy)]
+        results = list(audit(records, cache=cache))
+        self.assertEqual([result.source for result in results], ["first", "second"])
+        self.assertEqual(results[0]._replace(source="second"), results[1])
+        self.assertEqual(cache.stats().hits, 1)
@@ -1,3 +1,4 @@
+import time
 import unittest
 from policyuniverse.glob import intersect
 from policyuniverse.glob import Match
@@ -137,6 +138,34 @@ class TestIntersect(unittest.TestCase):
         with self.assertRaises(IndexError):        
             match[5]
 
+class TestIntersectAdversarial(unittest.TestCase):
+    """
+    Patterns that made the unmemoized backtracking search take exponential time.
+    Each case has to finish well inside the time budget.
+    """
+    TIME_BUDGET = 2.0
+
+    def assertFast(self, pattern1, pattern2, expected):
+        start = time.time()
+        match = intersect(pattern1, pattern2)
+        elapsed = time.time() - start
+        self.assertEqual(bool(match), expected)
+        self.assertLess(elapsed, self.TIME_BUDGET)
+        return match
+
+    def test_stars_against_literal(self):
+        for n in [8, 16, 32]:
+            self.assertFast("*a" * n + "*b", "a" * (3 * n), False)
+
+    def test_stars_against_stars(self):
+        for n in [8, 16, 32]:
+            self.assertFast("a*" * n + "c", "*a" * n + "*b", False)
+
+    def test_stars_match(self):
+        match = self.assertFast("*a" * 32 + "*", "a" * 64, True)
+        self.assertEqual(len(match.groups), 33)
+        self.assertEqual("".join(match.groups), "a" * 32)
+
 class TestMatch(unittest.TestCase):
     def test_init(self):
         grouplist = [("a", "b")]
@@ -0,0 +1,66 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_parallel
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import json
+import sys
+import unittest
+
+from policyuniverse import parallel
+from policyuniverse.parallel import audit_parallel
+from policyuniverse.stream import audit
+from policyuniverse.stream import compact_result
+
+
+def records(count):
+    for idx in range(count):
+        statement = {
+            "Effect": "Allow",
+            "Principal": "*" if idx % 3 else {"AWS": "{:012d}".format(idx)},
+            "Action": ["s3:get*", "sqs:sendmessage"][: idx % 2 + 1],
+            "Resource": "*",
+        }
+        yield "policy{}".format(idx), json.dumps({"Statement": [statement]})
+    yield "broken", "{"
+
+
+class ParallelTestCase(unittest.TestCase):
+    def setUp(self):
+        self.expected = [compact_result(result) for result in audit(records(20))]
+
+    def test_in_process(self):
+        results = list(audit_parallel(records(20), workers=1, chunksize=3))
+        self.assertEqual(results, self.expected)
+        self.assertEqual(results[-1].source, "broken")
+        self.assertTrue(results[-1].error)
+
+    @unittest.skipIf(sys.version_info < (3, 7), "worker processes need Python 3.7+")
+    def test_workers(self):
+        results = list(audit_parallel(records(20), workers=2, chunksize=3))
+        self.assertEqual(results, self.expected)
+        self.assertEqual(results[1].whos_allowed, (("principal", "*"),))
+
+    def test_without_pool_initializer(self):
+        has_pool_initializer = parallel._HAS_POOL_INITIALIZER
+        parallel._HAS_POOL_INITIALIZER = False
+        try:
+            results = list(audit_parallel(records(20), workers=2, chunksize=3))
+        finally:
+            parallel._HAS_POOL_INITIALIZER = has_pool_initializer
+        self.assertEqual(results, self.expected)
@@ -4,6 +4,9 @@ from policyuniverse.pattern import arn_pattern_to_regex
 from policyuniverse.pattern import pattern_to_glob
 from policyuniverse.pattern import match_arn_pattern
 from policyuniverse.pattern import iterate_pattern
+from policyuniverse.pattern import compile_arn_pattern
+from policyuniverse.pattern import CompiledArnPattern
+from policyuniverse.pattern import literal_prefix
 
 class TestPatternToRegex(unittest.TestCase):
     def test_pattern_to_regex_empty_pattern(self):
@@ -176,6 +179,114 @@ class TestMatchArnPattern(unittest.TestCase):
             match = match_arn_pattern(a, b)
             self.assertFalse(match)
 
+class TestCompiledArnPattern(unittest.TestCase):
+    def test_invalid_arn_pattern_valueerror(self):
+        with self.assertRaises(ValueError):
+            CompiledArnPattern("a1:b2:c3:d4:e5:f6")
+        with self.assertRaises(ValueError):
+            CompiledArnPattern("arn:")
+
+    def test_invalid_resource_valueerror(self):
+        compiled = CompiledArnPattern("arn:aws:appsync:us-west-2:123123123:bucket_name")
+        with self.assertRaises(ValueError):
+            compiled.match("a1:b2:c3:d4:e5:f6")
+        with self.assertRaises(ValueError):
+            compiled.match("arn:")
+
+    def test_match_same_as_match_arn_pattern(self):
+        patterns = [
+            "arn:${Partition}:s3:${Region}:${Account}:${Bucket}",
+            "arn:${Partition}:s3:${Region}:${Account}:${Bucket}/${Object}",
+            "arn:*:kms:*:*:key/*",
+            "arn:${Partition}:kinesis:${Region}:${Account}:stream/${StreamName}",
+            "arn:aws:iam::123456789012:role/Admin",
+        ]
+        resources = [
+            "*",
+            "arn:aws:s*:::bucket_name",
+            "arn:aws:s3:us-east-1:123123123:bucket_name/resource_name",
+            "arn:aws:s3:us-east-1:123123123:bucket_name",
+            "arn:aws:s3?:us-east-1:123123123:bucket_name",
+            "arn:aws:kms:*:693621191777:key/*",
+            "arn:aws:kinesis:us-east-1:693621191777:*",
+            "arn:aws:iam::123456789012:role/Admin",
+            "arn:aws:iam::123456789012:role/Admin2",
+            "arn:aws:iam::*:role/*",
+        ]
+        for pattern in patterns:
+            compiled = CompiledArnPattern(pattern)
+            matches = compiled.match_many(resources)
+            self.assertEqual(len(matches), len(resources))
+            for resource, match in zip(resources, matches):
+                expected = match_arn_pattern(pattern, resource)
+                self.assertEqual(bool(match), bool(expected))
+                if expected:
+                    self.assertEqual(match.grouplist, expected.grouplist)
+                    self.assertEqual(compiled.match(resource).grouplist, expected.grouplist)
+
+    def test_literal_segments(self):
+        compiled = CompiledArnPattern("arn:aws:iam::123456789012:role/Admin")
+        self.assertEqual(compiled.match("arn:aws:iam::123456789012:role/Admin").grouplist, [])
+        self.assertIsNone(compiled.match("arn:aws:iam::123456789013:role/Admin"))
+        self.assertTrue(compiled.match("arn:aws:iam::123456789012:role/*"))
+
+    def test_literal_regex_same_as_segments(self):
+        from policyuniverse.universe import get_universe
+        resources = [
+            "arn:aws:iam::123456789012:role/service-role/Admin",
+            "arn:aws:s3:::bucket_name/logs/2019/01.gz",
+            "arn:aws:s3:::bucket_name",
+            "arn:aws:ec2:us-east-1:123456789012:instance/i-0123456789abcdef0",
+            "arn:aws:lambda:us-west-2:123456789012:function:handler:1",
+            "arn:aws:sqs:us-east-1:123456789012:queue",
+            "arn:aws:kms:us-east-1:123456789012:key/1234abcd-12ab-34cd-56ef",
+            "arn:aws:dynamodb:us-east-1:123456789012:table/table/stream/2019",
+            "arn:aws:ram:us-east-1:123456789012:permission/name",
+            "arn:aws:ram::#{Account}:resource-share/share",
+        ]
+        for resource_type in get_universe().action_table.resource_types:
+            compiled = CompiledArnPattern(resource_type.arn_format)
+            if compiled.error is not None:
+                continue
+            self.assertIsNotNone(compiled.literal_regex, resource_type.arn_format)
+            by_segment = CompiledArnPattern(resource_type.arn_format)
+            by_segment.literal_regex = None
+            for resource in resources:
+                match = compiled.match(resource)
+                expected = by_segment.match(resource)
+                self.assertEqual(bool(match), bool(expected))
+                if expected:
+                    self.assertEqual(match.grouplist, expected.grouplist)
+
+    def test_invalid_variable_name_raises_when_reached(self):
+        compiled = CompiledArnPattern("arn:${Partition}:a4b:${Region}:${Account}:contact/${Resource_id}")
+        self.assertIsNone(compiled.match("arn:aws:iam::123456789012:role/Admin"))
+        self.assertIsNone(match_arn_pattern(compiled.arn_pattern, "arn:aws:iam::123456789012:role/Admin"))
+        with self.assertRaises(ValueError):
+            compiled.match("arn:aws:a4b:us-east-1:123456789012:contact/name")
+        with self.assertRaises(ValueError):
+            compiled.match("*")
+        self.assertIsNotNone(compiled.error)
+        self.assertIsNone(CompiledArnPattern("arn:aws:s3:::${Bucket}").error)
+
+    def test_wildcard_segment_same_as_glob_intersect(self):
+        compiled = CompiledArnPattern("arn:aws:s3:::*")
+        self.assertEqual(compiled.match("arn:aws:s3:::**").grouplist, [("*", "*")])
+        self.assertEqual(compiled.match("arn:aws:s3:::***a**").grouplist, [("*", "*a**")])
+        self.assertEqual(compiled.match("arn:aws:s3:::a**").grouplist, [("*", "a**")])
+
+    def test_literal_prefix(self):
+        self.assertEqual(literal_prefix("arn:aws:s3:::bucket"), "arn:aws:s3:::bucket")
+        self.assertEqual(literal_prefix("arn:aws:s3:::bucket/*"), "arn:aws:s3:::bucket/")
+        self.assertEqual(literal_prefix("arn:aws:s3:::b?/*"), "arn:aws:s3:::b")
+        self.assertEqual(literal_prefix("arn:aws:s3:::${aws:username}"), "arn:aws:s3:::")
+        self.assertEqual(literal_prefix("arn:aws:s3:::a\\b"), "arn:aws:s3:::a")
+
+    def test_compile_arn_pattern_cache(self):
+        pattern = "arn:${Partition}:s3:::${BucketName}"
+        self.assertIs(compile_arn_pattern(pattern), compile_arn_pattern(pattern))
+        self.assertEqual(compile_arn_pattern(pattern).arn_pattern, pattern)
+
 class TestIteratePattern(unittest.TestCase):
     def test_iterate_pattern_empty_pattern(self):
         result = list(iterate_pattern(""))
@@ -238,3 +238,191 @@ class PolicyTestCase(unittest.TestCase):
 
         policy = Policy(json.loads(SQS_NOTIFICATION_POLICY))
         self.assertTrue(policy.is_internet_accessible())
+
+    def test_statement_edits(self):
+        import copy
+
+        aggregates = [
+            lambda policy: policy.principals,
+            lambda policy: policy.condition_entries,
+            lambda policy: policy.action_summary(),
+            lambda policy: policy.is_internet_accessible(),
+            lambda policy: policy.internet_accessible_actions(),
+            lambda policy: policy.whos_allowed(),
+        ]
+
+        def assert_current(policy):
+            rebuilt = Policy(policy.policy)
+            for aggregate in aggregates:
+                self.assertEqual(aggregate(policy), aggregate(rebuilt))
+
+        original = copy.deepcopy(policy03)
+        policy = Policy(original)
+        for aggregate in aggregates:
+            aggregate(policy)
+
+        policy.add_statement(policy01["Statement"])
+        assert_current(policy)
+        self.assertTrue(policy.is_internet_accessible())
+
+        policy.replace_statement(0, policy02["Statement"][0])
+        assert_current(policy)
+
+        removed = policy.remove_statement(len(policy.statements) - 1)
+        self.assertEqual(removed.statement, policy01["Statement"])
+        assert_current(policy)
+
+        while policy.statements:
+            policy.remove_statement(0)
+        assert_current(policy)
+        self.assertFalse(policy.is_internet_accessible())
+        self.assertEqual(policy.principals, set())
+        self.assertEqual(policy.action_summary(), {})
+
+        self.assertEqual(original, policy03)
+
+    def test_statement_edits_only_evaluate_changed_statement(self):
+        policy = Policy(policy03)
+        policy.action_summary()
+        calls = []
+
+        def counting(summary):
+            def action_summary():
+                calls.append(1)
+                return summary
+
+            return action_summary
+
+        for statement in policy.statements:
+            statement.action_summary = counting(statement.action_summary())
+
+        policy.add_statement(policy01["Statement"])
+        self.assertEqual(calls, [])
+        self.assertEqual(
+            policy.action_summary(), Policy(policy.policy).action_summary()
+        )
+
+        # Removing a statement takes its contribution back out.
+        policy.remove_statement(0)
+        self.assertEqual(calls, [1])
+        self.assertEqual(
+            policy.action_summary(), Policy(policy.policy).action_summary()
+        )
+
+    def test_aggregates_one_pass(self):
+        class CountingList(list):
+            iterations = 0
+
+            def __iter__(self):
+                CountingList.iterations += 1
+                return list.__iter__(self)
+
+        policy = Policy(policy03)
+        policy.statements = CountingList(policy.statements)
+        for _ in range(3):
+            policy.principals
+            policy.condition_entries
+            policy.whos_allowed()
+        self.assertEqual(CountingList.iterations, 1)
+        self.assertEqual(policy.whos_allowed(), Policy(policy03).whos_allowed())
+
+    def test_aggregates_without_internet_accessible(self):
+        from policyuniverse.statement import ConditionTuple
+
+        # A userid without a wildcard limits the wildcard principal.
+        policy = Policy(
+            {
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Principal": "*",
+                        "Action": "s3:GetObject",
+                        "Resource": "*",
+                        "Condition": {"StringEquals": {"aws:userid": "AIDAEXAMPLE"}},
+                    }
+                ]
+            }
+        )
+        self.assertEqual(policy.principals, set(["*"]))
+        self.assertEqual(
+            policy.condition_entries,
+            set([ConditionTuple(category="userid", value="AIDAEXAMPLE")]),
+        )
+        policy.whos_allowed()
+        self.assertFalse(policy.is_internet_accessible())
+
+    def test_internet_accessible_stops_at_first_public_statement(self):
+        policy = Policy(
+            {
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Principal": "*",
+                        "Action": "s3:GetObject",
+                        "Resource": "*",
+                    },
+                    {
+                        "Effect": "Allow",
+                        "Principal": "*",
+                        "Action": "s3:PutObject",
+                        "Resource": "*",
+                        "Condition": {"StringEquals": {"aws:userid": "AIDAEXAMPLE"}},
+                    },
+                ]
+            }
+        )
+        self.assertTrue(policy.is_internet_accessible())
+
+    def test_effective_actions(self):
+        def statement(effect, **kwargs):
+            kwargs.setdefault("Resource", "*")
+            return dict(Effect=effect, **kwargs)
+
+        policy = Policy(
+            {
+                "Statement": [
+                    statement("Allow", Action=["s3:get*", "iam:passrole"]),
+                    statement("Allow", NotAction="ec2:*"),
+                    statement("Deny", Action="s3:getobject"),
+                    statement("Deny", NotAction=["s3:*", "iam:*", "sqs:*"]),
+                    # Denies that do not apply everywhere are not subtracted.
+                    statement("Deny", Action="iam:passrole", Resource="arn:aws:iam::*"),
+                    statement(
+                        "Deny",
+                        Action="s3:getobjectacl",
+                        Condition={"Bool": {"aws:SecureTransport": "false"}},
+                    ),
+                    statement(
+                        "Deny", Action="sqs:*", Principal={"AWS": "arn:aws:iam::1:root"}
+                    ),
+                    statement(
+                        "Deny", Action="s3:getbucketacl", NotResource="arn:aws:s3:::b"
+                    ),
+                ]
+            }
+        )
+        effective = policy.effective_actions()
+        self.assertIn("iam:passrole", effective)
+        self.assertIn("s3:getobjectacl", effective)
+        self.assertIn("s3:getbucketacl", effective)
+        self.assertIn("sqs:sendmessage", effective)
+        self.assertNotIn("s3:getobject", effective)
+        self.assertNotIn("ec2:describeinstances", effective)
+        self.assertNotIn("lambda:invokefunction", effective)
+
+        expected = set()
+        for allow in policy.statements[:2]:
+            expected |= allow.actions_expanded
+        for deny in policy.statements[2:4]:
+            expected -= deny.actions_expanded
+        self.assertEqual(effective.to_set(), expected)
+
+        deny_all = Policy(
+            {
+                "Statement": [
+                    statement("Allow", Action="*"),
+                    statement("Deny", Action="*", Principal="*"),
+                ]
+            }
+        )
+        self.assertFalse(deny_all.effective_actions())
@@ -0,0 +1,105 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_policy_index
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from policyuniverse.policy import Policy
+from policyuniverse.policy_index import PolicyIndex
+
+policies = {
+    "deployer": {
+        "Statement": [
+            {"Effect": "Allow", "Action": "iam:PassRole", "Resource": "*"},
+            {"Effect": "Allow", "Action": ["s3:Get*", "kms:Decrypt"], "Resource": "*"},
+        ]
+    },
+    "admin": {"Statement": {"Effect": "Allow", "Action": "*", "Resource": "*"}},
+    "not-iam": {
+        "Statement": [
+            {"Effect": "Deny", "Action": "kms:*", "Resource": "*"},
+            {"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"},
+        ]
+    },
+    "reader": {
+        "Statement": {
+            "Effect": "Allow",
+            "Action": ["s3:GetObject", "madeup:DoThing"],
+            "Resource": "*",
+        }
+    },
+}
+
+
+class PolicyIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = PolicyIndex()
+        for policy_id, policy in sorted(policies.items()):
+            self.index.add_policy(policy_id, policy)
+
+    def check_queries(self, index):
+        self.assertEqual(
+            index.statements_for("iam:passrole"), [("admin", 0), ("deployer", 0)]
+        )
+        self.assertEqual(
+            index.policies_for("KMS:Decrypt*"), set(["admin", "deployer", "not-iam"])
+        )
+        self.assertEqual(
+            index.policies_for(["iam:PassRole", "s3:GetObject"]),
+            set(["admin", "deployer", "not-iam", "reader"]),
+        )
+        self.assertEqual(index.policies_for("madeup:DoThing"), set(["reader"]))
+        self.assertEqual(index.policies_for("madeup:Other"), set())
+
+    def test_queries(self):
+        self.check_queries(self.index)
+        self.assertEqual(len(self.index), 5)
+
+    def test_same_as_expanding_every_policy(self):
+        for pattern in ["iam:passrole", "kms:decrypt*", "s3:*object", "*"]:
+            expected = set()
+            for policy_id, policy in policies.items():
+                for statement_index, statement in enumerate(Policy(policy).statements):
+                    if (
+                        statement.effect == "Allow"
+                        and statement.actions_expanded
+                        & set(self.index.index.expand(pattern))
+                    ):
+                        expected.add((policy_id, statement_index))
+            self.assertEqual(set(self.index.statements_for(pattern)), expected)
+
+    def test_save_and_load(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "index.sqlite")
+            self.index.save(path)
+            self.index.save(path)
+            self.check_queries(PolicyIndex.load(path))
+
+            connection = sqlite3.connect(path)
+            connection.execute("UPDATE meta SET value = 'other' WHERE key = 'digest'")
+            connection.commit()
+            connection.close()
+            self.assertRaises(ValueError, PolicyIndex.load, path)
+        finally:
+            shutil.rmtree(tmpdir)
@@ -0,0 +1,143 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_principal_index
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import unittest
+
+from policyuniverse.principal_index import PrincipalIndex
+
+policies = {
+    "arn:aws:s3:::shared": {
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {
+                    "AWS": ["arn:aws:iam::111111111111:root", "222222222222"]
+                },
+                "Action": "s3:GetObject",
+                "Resource": "arn:aws:s3:::shared/*",
+            },
+            {
+                "Effect": "Deny",
+                "Principal": {"AWS": "arn:aws:iam::333333333333:root"},
+                "Action": "s3:*",
+                "Resource": "arn:aws:s3:::shared/*",
+            },
+        ]
+    },
+    "arn:aws:s3:::org": {
+        "Statement": {
+            "Effect": "Allow",
+            "Principal": "*",
+            "Action": "s3:GetObject",
+            "Resource": "arn:aws:s3:::org/*",
+            "Condition": {
+                "StringEquals": {"aws:PrincipalOrgID": "o-abcd1234"},
+                "IpAddress": {"aws:SourceIp": ["10.0.0.0/8", "2001:db8::/32"]},
+            },
+        }
+    },
+    "arn:aws:kms:us-east-1:111111111111:key/k": {
+        "Statement": {
+            "Effect": "Allow",
+            "Principal": {"Service": "logs.amazonaws.com"},
+            "Action": "kms:Decrypt",
+            "Resource": "*",
+            "Condition": {
+                "ArnLike": {
+                    "aws:SourceArn": "arn:aws:logs:us-east-1:444444444444:log-group:*"
+                }
+            },
+        }
+    },
+    "arn:aws:s3:::user": {
+        "Statement": {
+            "Effect": "Allow",
+            "Principal": "*",
+            "Action": "s3:GetObject",
+            "Resource": "arn:aws:s3:::user/*",
+            "Condition": {"StringEquals": {"aws:userid": "AIDAEXAMPLE"}},
+        }
+    },
+    "arn:aws:sqs:us-east-1:111111111111:public": {
+        "Statement": {
+            "Effect": "Allow",
+            "Principal": "*",
+            "Action": "sqs:SendMessage",
+            "Resource": "*",
+        }
+    },
+}
+
+
+class PrincipalIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = PrincipalIndex()
+        for policy_id, policy in policies.items():
+            self.index.add_policy(policy_id, policy)
+
+    def test_accounts(self):
+        self.assertEqual(
+            self.index.policies_for("account", "111111111111"),
+            set(["arn:aws:s3:::shared"]),
+        )
+        self.assertEqual(
+            self.index.policies_for("account", "222222222222"),
+            set(["arn:aws:s3:::shared"]),
+        )
+        # Deny statements do not admit anyone.
+        self.assertEqual(self.index.policies_for("account", "333333333333"), set())
+        # Accounts of ARNs in conditions are indexed too.
+        self.assertEqual(
+            self.index.policies_for("account", "444444444444"),
+            set(["arn:aws:kms:us-east-1:111111111111:key/k"]),
+        )
+
+    def test_other_categories(self):
+        self.assertEqual(
+            self.index.policies_for("org-id", "o-abcd1234"), set(["arn:aws:s3:::org"])
+        )
+        self.assertEqual(
+            self.index.policies_for("service", "logs.amazonaws.com"),
+            set(["arn:aws:kms:us-east-1:111111111111:key/k"]),
+        )
+        self.assertEqual(
+            self.index.policies_for("cidr", "10.0.0.0/8"), set(["arn:aws:s3:::org"])
+        )
+        self.assertEqual(
+            self.index.policies_for("userid", "AIDAEXAMPLE"), set(["arn:aws:s3:::user"])
+        )
+        self.assertIn("org-id", self.index.categories())
+
+    def test_ip_addresses(self):
+        self.assertEqual(
+            self.index.policies_for_ip("10.1.2.3"), set(["arn:aws:s3:::org"])
+        )
+        self.assertEqual(
+            self.index.policies_for_ip("2001:db8::7"), set(["arn:aws:s3:::org"])
+        )
+        self.assertEqual(self.index.policies_for_ip("11.1.2.3"), set())
+        self.assertEqual(self.index.policies_for_ip("not an address"), set())
+
+    def test_public_policies(self):
+        # The org policy has a wildcard principal, but its conditions limit it.
+        self.assertEqual(
+            self.index.public_policies(),
+            set(["arn:aws:sqs:us-east-1:111111111111:public"]),
+        )
@@ -0,0 +1,120 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_resource_type
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import unittest
+
+from policyuniverse.action_table import ResourceType
+from policyuniverse.pattern import match_arn_pattern
+from policyuniverse.resource_type import ResourceTypeIndex
+from policyuniverse.resource_type import resource_types_for_arn
+from policyuniverse.universe import get_universe
+
+RESOURCE_TYPES = [
+    ResourceType(
+        "iam", "role", "arn:${Partition}:iam::${Account}:role/${RoleNameWithPath}"
+    ),
+    ResourceType(
+        "iam", "user", "arn:${Partition}:iam::${Account}:user/${UserNameWithPath}"
+    ),
+    ResourceType("s3", "bucket", "arn:${Partition}:s3:::${BucketName}"),
+    ResourceType("s3", "object", "arn:${Partition}:s3:::${BucketName}/${ObjectName}"),
+    ResourceType("s3", "job", "arn:${Partition}:s3:${Region}:${Account}:job/${JobId}"),
+    ResourceType(
+        "a4b", "room", "arn:${Partition}:a4b:${Region}:${Account}:room/${Resource_id}"
+    ),
+]
+
+
+def names(resource_types):
+    return [
+        (resource_type.prefix, resource_type.name) for resource_type in resource_types
+    ]
+
+
+class ResourceTypeIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = ResourceTypeIndex(RESOURCE_TYPES)
+
+    def test_classify(self):
+        self.assertEqual(
+            names(self.index.classify("arn:aws:iam::012345678910:role/Admin")),
+            [("iam", "role")],
+        )
+        self.assertEqual(
+            names(self.index.classify("arn:aws:s3:us-east-1:012345678910:job/1")),
+            [("s3", "job")],
+        )
+        self.assertEqual(
+            names(self.index.classify("arn:aws:s3:::bucket/key")),
+            [("s3", "bucket"), ("s3", "object")],
+        )
+        self.assertEqual(
+            names(self.index.classify("arn:aws:s3:::bucket")), [("s3", "bucket")]
+        )
+
+    def test_classify_wildcards(self):
+        self.assertEqual(
+            names(self.index.classify("arn:aws:iam::*:*")),
+            [("iam", "role"), ("iam", "user")],
+        )
+
+    def test_classify_nonmatch(self):
+        self.assertEqual(
+            self.index.classify("arn:aws:iam::012345678910:group/Admins"), []
+        )
+        self.assertEqual(
+            self.index.classify("arn:aws:sqs:us-east-1:012345678910:queue"), []
+        )
+        self.assertEqual(self.index.classify("arn:aws:s3:::bucket/$"), [])
+        self.assertEqual(self.index.classify("012345678910"), [])
+        self.assertEqual(self.index.classify("*"), [])
+
+    def test_skipped(self):
+        self.assertEqual(names(self.index.skipped), [("a4b", "room")])
+
+    def test_classify_many(self):
+        self.assertEqual(
+            [
+                names(result)
+                for result in self.index.classify_many(["arn:aws:s3:::bucket", "x"])
+            ],
+            [[("s3", "bucket")], []],
+        )
+
+    def test_same_as_match_arn_pattern(self):
+        index = get_universe().resource_type_index
+        skipped = set(index.skipped)
+        arns = [
+            "arn:aws:iam::012345678910:role/Admin",
+            "arn:aws:ec2:us-east-1:012345678910:instance/i-0123456789",
+            "arn:aws:lambda:us-east-1:012345678910:function:handler",
+            "arn:aws:kinesis:us-east-1:012345678910:stream/events",
+            "arn:aws:s3:::bucket/key",
+            "arn:aws:sqs:us-east-1:012345678910:queue",
+        ]
+        for arn in arns:
+            expected = set(
+                resource_type
+                for resource_type in get_universe().action_table.resource_types
+                if resource_type not in skipped
+                and match_arn_pattern(resource_type.arn_format, arn)
+            )
+            self.assertTrue(expected)
+            self.assertEqual(set(resource_types_for_arn(arn)), expected)
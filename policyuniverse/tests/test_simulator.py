@@ -0,0 +1,268 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_simulator
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import unittest
+
+from policyuniverse.simulator import ALLOWED, EXPLICIT_DENY, IMPLICIT_DENY
+from policyuniverse.simulator import Decision, Query, Simulator
+
+role = "arn:aws:iam::012345678910:role/App"
+other_role = "arn:aws:iam::012345678910:role/Other"
+outsider = "arn:aws:iam::999999999999:role/Outsider"
+bucket = "arn:aws:s3:::bucket"
+
+identity_policy = {
+    "Statement": [
+        {"Effect": "Allow", "Action": "s3:Get*", "Resource": bucket + "/*"},
+        {"Effect": "Allow", "Action": "sqs:*", "Resource": "*"},
+        {"Effect": "Deny", "Action": "s3:GetObject", "Resource": bucket + "/secret/*"},
+        {
+            "Effect": "Allow",
+            "Action": "s3:PutObject",
+            "Resource": bucket + "/*",
+            "Condition": {"Bool": {"aws:SecureTransport": "true"}},
+        },
+        {"Effect": "Allow", "NotAction": "iam:*", "NotResource": bucket + "/*"},
+    ]
+}
+
+bucket_policy = {
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Principal": {"AWS": "arn:aws:iam::012345678910:root"},
+            "Action": "s3:ListBucket",
+            "Resource": bucket,
+        },
+        {
+            "Effect": "Deny",
+            "NotPrincipal": {"AWS": [role]},
+            "Action": "s3:DeleteObject",
+            "Resource": bucket + "/*",
+        },
+    ]
+}
+
+queue_policy = {
+    "Statement": {
+        "Effect": "Allow",
+        "Principal": "*",
+        "Action": "sqs:SendMessage",
+        "Resource": "*",
+    }
+}
+
+
+class SimulatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.simulator = Simulator()
+        self.simulator.add_identity_policy(role, identity_policy, "identity")
+        self.simulator.add_resource_policy(bucket, bucket_policy, "bucket")
+        queue = "arn:aws:sqs:us-east-1:012345678910:queue"
+        self.simulator.add_resource_policy(queue, queue_policy)
+
+    def decision(self, principal, action, resource):
+        return self.simulator.simulate(principal, action, resource).decision
+
+    def test_identity_policy(self):
+        self.assertEqual(
+            self.simulator.simulate(role, "s3:GetObject", bucket + "/key"),
+            Decision(ALLOWED, "identity", 0),
+        )
+        self.assertEqual(
+            self.simulator.simulate(role, "S3:GetObject", bucket + "/secret/key"),
+            Decision(EXPLICIT_DENY, "identity", 2),
+        )
+        self.assertEqual(
+            self.decision(role, "s3:GetObjectAcl", bucket + "/secret/key"), ALLOWED
+        )
+        self.assertEqual(
+            self.decision(other_role, "s3:GetObject", bucket + "/key"), IMPLICIT_DENY
+        )
+        # The condition is not met without a request context.
+        self.assertEqual(
+            self.decision(role, "s3:PutObject", bucket + "/key"), IMPLICIT_DENY
+        )
+
+    def test_not_action_not_resource(self):
+        table = "arn:aws:dynamodb:us-east-1:012345678910:table/t"
+        self.assertEqual(self.decision(role, "dynamodb:GetItem", table), ALLOWED)
+        self.assertEqual(self.decision(role, "iam:PassRole", table), IMPLICIT_DENY)
+        self.assertEqual(
+            self.decision(role, "s3:PutObject", bucket + "/key"), IMPLICIT_DENY
+        )
+        # Actions missing from data.json are matched against the patterns.
+        self.assertEqual(self.decision(role, "madeup:DoThing", table), ALLOWED)
+
+    def test_resource_policy(self):
+        self.assertEqual(
+            self.simulator.simulate(other_role, "s3:ListBucket", bucket),
+            Decision(ALLOWED, "bucket", 0),
+        )
+        self.assertEqual(
+            self.decision(outsider, "s3:ListBucket", bucket), IMPLICIT_DENY
+        )
+        self.assertEqual(
+            self.decision(other_role, "s3:DeleteObject", bucket + "/key"),
+            EXPLICIT_DENY,
+        )
+        # Not denied to the role, but nothing allows it either.
+        self.assertEqual(
+            self.decision(role, "s3:DeleteObject", bucket + "/key"), IMPLICIT_DENY
+        )
+
+        # Resource "*" in a resource policy means the resource it is attached to.
+        queue = "arn:aws:sqs:us-east-1:012345678910:queue"
+        other_queue = "arn:aws:sqs:us-east-1:012345678910:other"
+        self.assertEqual(self.decision(outsider, "sqs:SendMessage", queue), ALLOWED)
+        self.assertEqual(
+            self.decision(outsider, "sqs:SendMessage", other_queue), IMPLICIT_DENY
+        )
+
+    def test_simulate_many(self):
+        queries = [
+            Query(role, "s3:GetObject", bucket + "/key"),
+            (outsider, "s3:ListBucket", bucket),
+            (other_role, "s3:ListBucket", bucket),
+        ] * 3
+        decisions = list(self.simulator.simulate_many(queries))
+        self.assertEqual(
+            decisions, [self.simulator.simulate(*query) for query in queries]
+        )
+        self.assertEqual(
+            [decision.decision for decision in decisions[:3]],
+            [ALLOWED, IMPLICIT_DENY, ALLOWED],
+        )
+        self.assertTrue(self.simulator.is_allowed(role, "sqs:SendMessage", "x"))
+
+    def test_adding_policies_clears_candidates(self):
+        self.assertEqual(
+            self.decision(outsider, "s3:ListBucket", bucket), IMPLICIT_DENY
+        )
+        self.simulator.add_resource_policy(
+            bucket,
+            {
+                "Statement": {
+                    "Effect": "Allow",
+                    "Principal": {"AWS": "999999999999"},
+                    "Action": "s3:List*",
+                    "Resource": "*",
+                }
+            },
+        )
+        self.assertEqual(self.decision(outsider, "s3:ListBucket", bucket), ALLOWED)
+
+    def test_conditions(self):
+        self.assertEqual(
+            self.simulator.simulate(
+                role, "s3:PutObject", bucket + "/key", {"aws:SecureTransport": True}
+            ),
+            Decision(ALLOWED, "identity", 3),
+        )
+        self.simulator.add_resource_policy(
+            bucket,
+            {
+                "Statement": {
+                    "Effect": "Deny",
+                    "Principal": "*",
+                    "Action": "s3:*",
+                    "Resource": bucket + "/*",
+                    "Condition": {
+                        "StringNotEquals": {"aws:PrincipalAccount": "012345678910"}
+                    },
+                }
+            },
+            "deny outsiders",
+        )
+        queries = [
+            (role, "s3:GetObject", bucket + "/key"),
+            (outsider, "s3:GetObject", bucket + "/key"),
+            (
+                outsider,
+                "s3:GetObject",
+                bucket + "/key",
+                {"aws:PrincipalAccount": "012345678910"},
+            ),
+        ]
+        self.assertEqual(
+            [decision.decision for decision in self.simulator.simulate_many(queries)],
+            [ALLOWED, EXPLICIT_DENY, IMPLICIT_DENY],
+        )
+
+    def test_resource_variables(self):
+        home = bucket + "/${aws:username}/*"
+        simulator = Simulator()
+        simulator.add_identity_policy(
+            role,
+            {"Statement": {"Effect": "Allow", "Action": "s3:*", "Resource": home}},
+        )
+        simulator.add_identity_policy(
+            other_role,
+            {
+                "Statement": [
+                    {"Effect": "Allow", "Action": "s3:*", "Resource": "*"},
+                    {"Effect": "Deny", "Action": "s3:DeleteObject", "Resource": home},
+                ]
+            },
+        )
+        alice = {"aws:username": "alice"}
+        queries = [
+            (role, "s3:GetObject", bucket + "/alice/key", alice),
+            (role, "s3:GetObject", bucket + "/bob/key", alice),
+            # The substituted value is literal, not a wildcard.
+            (role, "s3:GetObject", bucket + "/bob/key", {"aws:username": "*"}),
+            (role, "s3:GetObject", bucket + "/alice/key"),
+            (other_role, "s3:DeleteObject", bucket + "/alice/key", alice),
+            (other_role, "s3:DeleteObject", bucket + "/bob/key", alice),
+            # A Deny that cannot be matched without the variable applies.
+            (other_role, "s3:DeleteObject", bucket + "/bob/key"),
+        ]
+        self.assertEqual(
+            [decision.decision for decision in simulator.simulate_many(queries)],
+            [
+                ALLOWED,
+                IMPLICIT_DENY,
+                IMPLICIT_DENY,
+                IMPLICIT_DENY,
+                EXPLICIT_DENY,
+                ALLOWED,
+                EXPLICIT_DENY,
+            ],
+        )
+
+    def test_resource_variables_in_resource_policy(self):
+        self.simulator.add_resource_policy(
+            bucket,
+            {
+                "Statement": {
+                    "Effect": "Deny",
+                    "Principal": "*",
+                    "Action": "s3:GetObject",
+                    "NotResource": bucket + "/${aws:PrincipalAccount}/*",
+                }
+            },
+            "own prefix only",
+        )
+        own = bucket + "/012345678910/key"
+        self.assertEqual(self.decision(role, "s3:GetObject", own), ALLOWED)
+        self.assertEqual(
+            self.simulator.simulate(role, "s3:GetObject", bucket + "/other/key"),
+            Decision(EXPLICIT_DENY, "own prefix only", 0),
+        )
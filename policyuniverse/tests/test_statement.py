@@ -349,6 +349,63 @@ class StatementTestCase(unittest.TestCase):
         statement = Statement(statement26)
         self.assertEqual(statement.action_summary(), {"iam": {"Permissions", "List"}})
 
+    def test_statement_expansion_cached(self):
+        import policyuniverse.statement
+        from policyuniverse.action_categories import categories_for_actions
+        from policyuniverse.action_set import ActionSet
+        from policyuniverse.policy import Policy
+
+        calls = []
+        original = policyuniverse.statement.get_actions_from_statement
+
+        def counting(statement):
+            calls.append(statement)
+            return original(statement)
+
+        class CountingActionSet(object):
+            @staticmethod
+            def from_statement(statement):
+                calls.append(statement)
+                return ActionSet.from_statement(statement)
+
+        statement_dict = dict(
+            Effect="Allow", Action=["ec2:runinstances", "iam:getrole"]
+        )
+        wildcard_dict = dict(Effect="Allow", Action="ec2:authorize*", NotAction="s3:*")
+        policyuniverse.statement.get_actions_from_statement = counting
+        policyuniverse.statement.ActionSet = CountingActionSet
+        try:
+            statement = Statement(statement_dict)
+            statement.action_summary()
+            expanded = statement.actions_expanded
+            statement.action_summary()
+            self.assertEqual(len(calls), 1)
+
+            policy = Policy(dict(Statement=[dict(statement_dict) for _ in range(50)]))
+            policy.action_summary()
+            policy.action_summary()
+            self.assertEqual(len(calls), 51)
+
+            wildcard = Statement(wildcard_dict)
+            wildcard.action_summary()
+            wildcard.action_summary()
+            self.assertEqual(len(calls), 52)
+        finally:
+            policyuniverse.statement.get_actions_from_statement = original
+            policyuniverse.statement.ActionSet = ActionSet
+
+        self.assertEqual(
+            wildcard_dict,
+            dict(Effect="Allow", Action="ec2:authorize*", NotAction="s3:*"),
+        )
+        self.assertEqual(
+            wildcard.action_summary(),
+            categories_for_actions(wildcard.actions_expanded),
+        )
+        # Callers get their own copy of the cached expansion.
+        expanded.clear()
+        self.assertIn("iam:getrole", statement.actions_expanded)
+
     def test_statement_principals(self):
         statement = Statement(statement02)
         self.assertEqual(statement.principals, set(["arn:aws:iam::012345678910:root"]))
@@ -480,3 +537,42 @@ class StatementTestCase(unittest.TestCase):
 
         # AWS:PrincipalOrgID Wildcard
         self.assertTrue(Statement(statement30).is_internet_accessible())
+
+    def test_condition_operators(self):
+        import re
+        from policyuniverse.statement import condition_operators
+
+        # The per-statement regexes the table replaced.
+        legacy_operators = [
+            re.compile(
+                "((ForAllValues|ForAnyValue):)?ARN(Equals|Like)(IfExists)?",
+                re.IGNORECASE,
+            ),
+            re.compile(
+                "((ForAllValues|ForAnyValue):)?String(Equals|Like)(IgnoreCase)?(IfExists)?",
+                re.IGNORECASE,
+            ),
+            re.compile(
+                "((ForAllValues|ForAnyValue):)?IpAddress(IfExists)?", re.IGNORECASE
+            ),
+        ]
+        self.assertEqual(len(condition_operators), 157)
+        for name, operator in condition_operators.items():
+            self.assertEqual(name, operator.name.lower())
+            condition = {operator.name: {"aws:SourceAccount": ["012345678910"]}}
+            statement = Statement(dict(Effect="Allow", Condition=condition))
+            self.assertEqual(
+                bool(statement.condition_accounts),
+                any(regex.match(operator.name) for regex in legacy_operators),
+                operator.name,
+            )
+
+        operator = condition_operators["forallvalues:stringnotequalsignorecaseifexists"]
+        self.assertEqual(operator.family, "String")
+        self.assertEqual(operator.test, "Equals")
+        self.assertTrue(operator.negated)
+        self.assertTrue(operator.ignore_case)
+        self.assertTrue(operator.if_exists)
+        self.assertEqual(operator.set_operator, "ForAllValues")
+        self.assertTrue(condition_operators["notipaddress"].negated)
+        self.assertEqual(condition_operators["null"].family, "Null")
@@ -0,0 +1,172 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_stream
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+from policyuniverse.policy import Policy
+from policyuniverse.statement import PrincipalTuple
+from policyuniverse.stream import audit
+from policyuniverse.stream import audit_json_lines
+from policyuniverse.stream import audit_policy
+from policyuniverse.stream import audit_tree
+from policyuniverse.stream import compact_result
+from policyuniverse.stream import read_paths
+from policyuniverse.stream import result_to_json
+
+public_policy = {
+    "Statement": [
+        {"Effect": "Allow", "Principal": "*", "Action": "s3:GetObject", "Resource": "*"}
+    ]
+}
+
+private_policy = {
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Principal": {"AWS": "arn:aws:iam::012345678910:root"},
+            "Action": ["iam:passrole", "s3:put*"],
+            "Resource": "*",
+        }
+    ]
+}
+
+
+class StreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        if not isinstance(text, type(u"")):  # Python 2.7
+            text = text.decode("utf-8")
+        with io.open(path, "w", encoding="utf-8") as output:
+            output.write(text)
+        return path
+
+    def test_audit_policy(self):
+        result = audit_policy(private_policy, "source", "name")
+        policy = Policy(private_policy)
+        self.assertEqual(result.source, "source")
+        self.assertEqual(result.name, "name")
+        self.assertFalse(result.internet_accessible)
+        self.assertEqual(result.whos_allowed, policy.whos_allowed())
+        self.assertEqual(result.action_summary, dict(policy.action_summary()))
+        self.assertIsNone(result.error)
+
+    def test_audit_is_lazy(self):
+        def records():
+            yield "first", public_policy
+            raise AssertionError("read past the first record")
+
+        results = audit(records())
+        self.assertIsInstance(results, types.GeneratorType)
+        self.assertTrue(next(results).internet_accessible)
+
+    def test_audit_policy_headers(self):
+        document = {
+            "rolepolicies": {"public": public_policy, "private": private_policy}
+        }
+        results = dict((result.name, result) for result in audit([("role", document)]))
+        self.assertEqual(set(results), set(["public", "private"]))
+        self.assertTrue(results["public"].internet_accessible)
+        self.assertFalse(results["private"].internet_accessible)
+        self.assertEqual(results["private"].source, "role")
+
+    def test_audit_errors(self):
+        results = list(
+            audit(
+                [
+                    ("bad json", "{not json"),
+                    ("bad policy", '{"Statement": [{"Effect": "Allow", "Action": 7}]}'),
+                    ("good", json.dumps(public_policy)),
+                ]
+            )
+        )
+        self.assertEqual(
+            [result.source for result in results], ["bad json", "bad policy", "good"]
+        )
+        self.assertTrue(results[0].error)
+        self.assertTrue(results[1].error)
+        self.assertIsNone(results[1].internet_accessible)
+        self.assertIsNone(results[2].error)
+
+    def test_audit_json_lines(self):
+        path = self.write(
+            "policies.jsonl",
+            "\n".join([json.dumps(public_policy), "", json.dumps(private_policy)]),
+        )
+        results = list(audit_json_lines(path))
+        self.assertEqual(
+            [result.source for result in results],
+            ["{}:1".format(path), "{}:3".format(path)],
+        )
+        self.assertEqual(
+            [result.internet_accessible for result in results], [True, False]
+        )
+
+    def test_audit_tree(self):
+        first = self.write("a/first.json", json.dumps(public_policy))
+        second = self.write("b/second.jsonl", json.dumps(private_policy) + "\n")
+        self.write("b/notes.txt", "not a policy")
+        results = list(audit_tree(self.tmpdir))
+        self.assertEqual(
+            [result.source for result in results], [first, "{}:1".format(second)]
+        )
+        self.assertEqual(
+            [result.source for result in audit(read_paths([first, second]))],
+            [first, "{}:1".format(second)],
+        )
+
+    def test_result_to_json(self):
+        result = json.loads(result_to_json(audit_policy(public_policy)))
+        self.assertEqual(
+            result["whos_allowed"], [list(PrincipalTuple("principal", "*"))]
+        )
+        self.assertEqual(result["action_summary"], {"s3": ["Read"]})
+        self.assertTrue(result["internet_accessible"])
+
+    def test_compact_result_unknown_action(self):
+        policy = {
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Action": ["s3:getobject", "s3:madeup"],
+                    "Resource": "*",
+                }
+            ]
+        }
+        result = audit_policy(policy)
+        self.assertEqual(
+            compact_result(result).action_summary, (("s3", ("Read", None)),)
+        )
+        self.assertEqual(
+            json.loads(result_to_json(result))["action_summary"], {"s3": ["Read", None]}
+        )
@@ -0,0 +1,133 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_universe
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import subprocess
+import sys
+import unittest
+
+from policyuniverse import universe
+
+
+def run_python(code):
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return output.decode("utf-8").strip()
+
+
+class UniverseTestCase(unittest.TestCase):
+    def test_import_does_not_load_service_data(self):
+        code = "\n".join(
+            [
+                "from policyuniverse.arn import ARN",
+                "from policyuniverse import universe",
+                "ARN('arn:aws:iam::012345678910:root')",
+                "print(universe.is_loaded())",
+            ]
+        )
+        self.assertEqual(run_python(code), "False")
+
+    def test_first_access_loads_service_data(self):
+        code = "\n".join(
+            [
+                "from policyuniverse import all_permissions, universe",
+                "print(universe.is_loaded())",
+                "print('iam:putrolepolicy' in all_permissions)",
+                "print(universe.is_loaded())",
+            ]
+        )
+        self.assertEqual(run_python(code).split(), ["False", "True", "True"])
+
+    def test_all_permissions(self):
+        from policyuniverse import all_permissions
+
+        self.assertIn("iam:putrolepolicy", all_permissions)
+        self.assertNotIn("iam:thispermissiondoesntexist", all_permissions)
+        self.assertEqual(len(all_permissions), len(set(all_permissions)))
+        self.assertEqual(
+            all_permissions.difference(["iam:putrolepolicy"]),
+            set(all_permissions) - {"iam:putrolepolicy"},
+        )
+        self.assertEqual(
+            set(all_permissions) & {"iam:putrolepolicy"}, {"iam:putrolepolicy"}
+        )
+
+    def test_action_categories(self):
+        from policyuniverse import _action_categories
+
+        self.assertEqual(_action_categories["iam:putrolepolicy"], "Permissions")
+        self.assertEqual(_action_categories.get("iam:listroles"), "List")
+        self.assertIsNone(_action_categories.get("iam:thispermissiondoesntexist"))
+
+    def test_service_data(self):
+        import policyuniverse
+
+        prefixes = [body["prefix"] for body in policyuniverse.service_data.values()]
+        self.assertIn("s3", prefixes)
+
+    def test_all_permissions_add(self):
+        from policyuniverse import all_permissions
+        from policyuniverse.action_categories import categories_for_actions
+
+        digest = universe.get_universe().digest
+        try:
+            all_permissions.add("iam:thispermissiondoesntexist")
+            all_permissions.update(["iam:norisone", "iam:northisone"])
+            self.assertIn("iam:thispermissiondoesntexist", all_permissions)
+            self.assertIn("iam:northisone", all_permissions)
+            all_permissions.discard("iam:northisone")
+            self.assertNotIn("iam:northisone", all_permissions)
+            self.assertNotEqual(universe.get_universe().digest, digest)
+            self.assertEqual(
+                categories_for_actions(["iam:norisone", "iam:listroles"]),
+                {"iam": set([None, "List"])},
+            )
+        finally:
+            universe.reload()
+        self.assertNotIn("iam:thispermissiondoesntexist", all_permissions)
+        self.assertEqual(universe.get_universe().digest, digest)
+
+    def test_reload(self):
+        from policyuniverse import all_permissions
+
+        calls = []
+        callback = universe.on_reload(lambda: calls.append(True))
+        try:
+            self.assertIn("iam:putrolepolicy", all_permissions)
+            universe.reload()
+            self.assertFalse(universe.is_loaded())
+            self.assertEqual(calls, [True])
+            self.assertIn("iam:putrolepolicy", all_permissions)
+            self.assertTrue(universe.is_loaded())
+        finally:
+            universe._reload_callbacks.remove(callback)
+
+    def test_load_universe_without_action_table(self):
+        from policyuniverse import action_table
+
+        shipped_path = action_table.action_table_path
+        action_table.action_table_path = shipped_path + ".missing"
+        try:
+            fallback = universe.load_universe()
+        finally:
+            action_table.action_table_path = shipped_path
+
+        compiled = universe.load_universe()
+        self.assertEqual(fallback.digest, compiled.digest)
+        self.assertEqual(fallback.permissions, compiled.permissions)
+        self.assertEqual(fallback.action_categories, compiled.action_categories)
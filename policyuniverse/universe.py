@@ -0,0 +1,332 @@
+#     Copyright 2019 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.universe
+    :platform: Unix
+
+.. version:: $$VERSION$$
+
+"""
+import hashlib
+import json
+import os
+import threading
+
+try:
+    from collections.abc import Mapping, MutableSet
+except ImportError:  # Python 2.7
+    from collections import Mapping, MutableSet
+
+
+service_data_path = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "data.json"
+)
+
+_lock = threading.RLock()
+_universe = None
+_reload_callbacks = []
+
+
+class Universe(object):
+    """Everything policyuniverse derives from the service data."""
+
+    def __init__(self, action_table, service_data=None):
+        from policyuniverse.action import build_service_actions_from_action_table
+        from policyuniverse.action_categories import (
+            build_action_categories_from_action_table,
+        )
+
+        self.action_table = action_table
+        self.permissions = build_service_actions_from_action_table(action_table)
+        self.action_categories = build_action_categories_from_action_table(action_table)
+        self._service_data = service_data
+        self._digest = None
+        self._action_index = None
+        self._category_index = None
+        self._resource_type_index = None
+
+    @property
+    def digest(self):
+        """
+        Digest of data.json. Once permissions were added or removed through
+        all_permissions, it also covers them, so results computed before do not
+        match.
+        """
+        if self._digest is None:
+            digest = self.action_table.digest
+            if self.permissions != set(self.action_table.actions):
+                text = "\n".join([digest] + sorted(self.permissions))
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            self._digest = digest
+        return self._digest
+
+    @property
+    def action_index(self):
+        if self._action_index is None:
+            from policyuniverse.action import ActionIndex
+
+            self._action_index = ActionIndex(self.permissions)
+        return self._action_index
+
+    @property
+    def category_index(self):
+        if self._category_index is None:
+            from policyuniverse.action_categories import ActionCategoryIndex
+
+            # Every permission of the action_index, in the same order.
+            actions = self.action_index.expand("*")
+            self._category_index = ActionCategoryIndex(self.action_table, actions)
+        return self._category_index
+
+    def permissions_changed(self):
+        """Drops everything built from the permissions."""
+        self._digest = None
+        self._action_index = None
+        self._category_index = None
+
+    @property
+    def resource_type_index(self):
+        if self._resource_type_index is None:
+            from policyuniverse.resource_type import ResourceTypeIndex
+
+            self._resource_type_index = ResourceTypeIndex(
+                self.action_table.resource_types
+            )
+        return self._resource_type_index
+
+    @property
+    def service_data(self):
+        """The full contents of data.json, only read when asked for."""
+        if self._service_data is None:
+            self._service_data = load_service_data()
+        return self._service_data
+
+
+def load_service_data(path=None):
+    with open(path or service_data_path, "r") as service_data_file:
+        return json.load(service_data_file)
+
+
+def load_universe():
+    """
+    Builds a Universe from the compiled action table (data.idx), falling back to
+    compiling data.json in memory when the table is missing or stale.
+    """
+    from policyuniverse import logger
+    from policyuniverse.action_table import (
+        compile_action_table,
+        read_action_table,
+        service_data_digest,
+    )
+
+    digest = service_data_digest()
+    try:
+        action_table = read_action_table()
+    except (IOError, OSError, ValueError):
+        action_table = None
+
+    if action_table is not None and action_table.digest == digest:
+        return Universe(action_table)
+
+    logger.warning(
+        "Action table is missing or stale, reading data.json instead. "
+        "Rebuild it with: python -m policyuniverse.action_table"
+    )
+    service_data = load_service_data()
+    return Universe(compile_action_table(service_data, digest), service_data)
+
+
+def get_universe():
+    """
+    Returns the loaded Universe, reading the service data on first use.
+    """
+    global _universe
+    universe = _universe
+    if universe is None:
+        with _lock:
+            if _universe is None:
+                _universe = load_universe()
+            universe = _universe
+    return universe
+
+
+def is_loaded():
+    return _universe is not None
+
+
+def reload():
+    """
+    Discards the loaded Universe so the next access re-reads the service data.
+    Every callback registered with on_reload() is called afterwards.
+    """
+    global _universe
+    with _lock:
+        _universe = None
+    for callback in list(_reload_callbacks):
+        callback()
+
+
+def on_reload(callback):
+    """
+    Registers a callback to run whenever the Universe is reloaded, or its
+    permissions are changed through all_permissions.
+    Anything cached from the service data should be dropped by the callback.
+    """
+    _reload_callbacks.append(callback)
+    return callback
+
+
+class LazyPermissions(MutableSet):
+    """
+    Set of every known "service:action" permission.
+    The service data is not read until the set is first used. Permissions added
+    to it are expanded from wildcards like those of data.json, and kept until
+    the Universe is reloaded. Changing it drops every cached expansion.
+    """
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def __contains__(self, permission):
+        return permission in get_universe().permissions
+
+    def __iter__(self):
+        return iter(get_universe().permissions)
+
+    def __len__(self):
+        return len(get_universe().permissions)
+
+    def __repr__(self):
+        if not is_loaded():
+            return "<LazyPermissions (not loaded)>"
+        return "<LazyPermissions ({} permissions)>".format(len(self))
+
+    def add(self, permission):
+        self.update([permission])
+
+    def discard(self, permission):
+        permissions = get_universe().permissions
+        if permission in permissions:
+            permissions.discard(permission)
+            _permissions_changed()
+
+    def update(self, *others):
+        permissions = get_universe().permissions
+        count = len(permissions)
+        permissions.update(*others)
+        if len(permissions) != count:
+            _permissions_changed()
+
+    def copy(self):
+        return set(get_universe().permissions)
+
+    def difference(self, *others):
+        return get_universe().permissions.difference(*others)
+
+    def intersection(self, *others):
+        return get_universe().permissions.intersection(*others)
+
+    def union(self, *others):
+        return get_universe().permissions.union(*others)
+
+    def issubset(self, other):
+        return get_universe().permissions.issubset(other)
+
+    def issuperset(self, other):
+        return get_universe().permissions.issuperset(other)
+
+
+def _permissions_changed():
+    with _lock:
+        get_universe().permissions_changed()
+    for callback in list(_reload_callbacks):
+        callback()
+
+
+class LazyActionCategories(Mapping):
+    """
+    Mapping of "service:action" permissions to their action category.
+    The service data is not read until the mapping is first used.
+    """
+
+    def __getitem__(self, permission):
+        return get_universe().action_categories[permission]
+
+    def __contains__(self, permission):
+        return permission in get_universe().action_categories
+
+    def __iter__(self):
+        return iter(get_universe().action_categories)
+
+    def __len__(self):
+        return len(get_universe().action_categories)
+
+    def __repr__(self):
+        if not is_loaded():
+            return "<LazyActionCategories (not loaded)>"
+        return "<LazyActionCategories ({} permissions)>".format(len(self))
+
+    def get(self, permission, default=None):
+        return get_universe().action_categories.get(permission, default)
+
+    def items(self):
+        return get_universe().action_categories.items()
+
+    def keys(self):
+        return get_universe().action_categories.keys()
+
+    def values(self):
+        return get_universe().action_categories.values()
+
+
+class LazyServiceData(Mapping):
+    """
+    Mapping of service names to their body in data.json.
+    The file is not read until the mapping is first used.
+    """
+
+    def __getitem__(self, service_name):
+        return get_universe().service_data[service_name]
+
+    def __contains__(self, service_name):
+        return service_name in get_universe().service_data
+
+    def __iter__(self):
+        return iter(get_universe().service_data)
+
+    def __len__(self):
+        return len(get_universe().service_data)
+
+    def __repr__(self):
+        if not is_loaded():
+            return "<LazyServiceData (not loaded)>"
+        return "<LazyServiceData ({} services)>".format(len(self))
+
+    def get(self, service_name, default=None):
+        return get_universe().service_data.get(service_name, default)
+
+    def items(self):
+        return get_universe().service_data.items()
+
+    def keys(self):
+        return get_universe().service_data.keys()
+
+    def values(self):
+        return get_universe().service_data.values()
+
+
+all_permissions = LazyPermissions()
+action_categories = LazyActionCategories()
+service_data = LazyServiceData()
@@ -28,7 +28,7 @@ setup(
         "wildcard",
     ],
     packages=["policyuniverse"],
-    package_data={"policyuniverse": ["data.json"]},
+    package_data={"policyuniverse": ["data.json", "data.idx"]},
     include_package_data=True,
     zip_safe=False,
     extras_require={"tests": tests_require, "dev": dev_require},